@@ -1,7 +1,19 @@
+import sys
+import time
+
+_START = time.perf_counter()
+
+from utils.startup import StartupTimer
+
+startup = StartupTimer(_START)
 from ui.app_root import FlexibleDuctApp
+startup.mark("imports")
+
 
 def main():
-    app = FlexibleDuctApp()
+    app = FlexibleDuctApp(startup)
+    if "--startup-report" in sys.argv[1:]:
+        app.after_idle(startup.print_report)
     app.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+# benchmarks/
+# Performance suite for the calculation core and GUI startup, with stored
+# baselines and a regression report. Run with:  python -m benchmarks
@@ -0,0 +1,126 @@
+# benchmarks/__main__.py
+#
+#   python -m benchmarks                       run everything, compare to baseline.json
+#   python -m benchmarks --quick --only core   smaller sizes, single repeats
+#   python -m benchmarks --save-baseline       run and store as the new reference
+#
+# Exits with status 1 when any metric is worse than the baseline by more
+# than --threshold (relative), or was measured but has no baseline (e.g.
+# the GUI suite on a machine that recorded none), so the suite can gate a
+# build.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import core_bench, gui_bench
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.20
+SUITES = {"core": core_bench.run, "gui": gui_bench.run}
+
+
+def higher_is_better(metric: str) -> bool:
+    return "per_s" in metric
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Rows of (metric, baseline, current, change, regressed). change is the
+    relative change in the "worse" direction: +0.25 means 25 % slower (or
+    25 % less throughput). A measured metric without a (non-zero) baseline
+    has baseline and change None and counts as regressed, so it cannot
+    pass unchecked; baseline metrics that were not measured are skipped.
+    """
+    rows = []
+    for metric, current in results.items():
+        reference = baseline.get(metric)
+        if not reference:
+            rows.append((metric, None, current, None, True))
+            continue
+        if higher_is_better(metric):
+            change = reference / current - 1.0
+        else:
+            change = current / reference - 1.0
+        rows.append((metric, reference, current, change, change > threshold))
+    return rows
+
+
+def format_report(rows, threshold: float) -> str:
+    lines = [f"{'metric':<32}{'baseline':>14}{'current':>14}{'change':>10}"]
+    for metric, reference, current, change, regressed in rows:
+        if reference is None:
+            lines.append(f"{metric:<32}{'-':>14}{current:>14.4g}{'-':>10}  NO BASELINE")
+            continue
+        flag = "  REGRESSION" if regressed else ""
+        lines.append(f"{metric:<32}{reference:>14.4g}{current:>14.4g}{change:>+10.1%}{flag}")
+    regressions = sum(1 for row in rows if row[4] and row[1] is not None)
+    missing = sum(1 for row in rows if row[1] is None)
+    lines.append(f"{regressions} regression(s) beyond {threshold:.0%} (positive change = worse)")
+    if missing:
+        lines.append(f"{missing} metric(s) without a baseline; record them with --save-baseline "
+                     "(e.g. --only gui on a machine with a display or Xvfb)")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks and compare against a baseline.")
+    parser.add_argument("--only", choices=tuple(SUITES), nargs="+", help="suites to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and single repeats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON (default benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"relative slowdown flagged as a regression (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or SUITES:
+        start = time.perf_counter()
+        results.update(SUITES[name](quick=args.quick))
+        print(f"{name} suite: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    record = {"environment": environment(), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    if args.save_baseline:
+        # Keep metrics of suites that were not run this time
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                record["results"] = dict(json.load(f)["results"], **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results, indent=2))
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.", file=sys.stderr)
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment", {}).get("platform") != record["environment"]["platform"]:
+        print("Note: baseline was recorded on a different platform; compare with care.", file=sys.stderr)
+    rows = compare(results, baseline["results"], args.threshold)
+    print(format_report(rows, args.threshold))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
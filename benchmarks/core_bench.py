@@ -0,0 +1,73 @@
+# benchmarks/core_bench.py
+# Scalar latency, batch throughput and memory per row of the calculation core.
+import math
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.calculations import calculate_flexible_duct
+
+BATCH_SIZES = (1_000, 100_000, 1_000_000)
+MEMORY_ROWS = 100_000
+REPEAT_SECONDS = 0.05  # target length of one timed repeat
+
+_SCALAR_ARGS = dict(
+    duct_diameter_in=6.0, air_flow_cfm=1000.0, duct_length_ft=10.0,
+    bend_counts={"45": 1, "90": 2, "180": 0}, roughness_value=0.009,
+    compression_percent=10.0, safety_factor=1.1,
+)
+
+
+def synthetic_schedule(n_rows: int, seed: int = 0) -> tuple:
+    """Positional arguments for calculate_flexible_duct_batch (fixed seed, so runs are comparable)."""
+    rng = np.random.default_rng(seed)
+    return (
+        rng.choice([4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 14.0, 16.0], n_rows),
+        rng.uniform(50, 2000, n_rows),
+        rng.uniform(1, 100, n_rows),
+        {"45": rng.integers(0, 3, n_rows), "90": rng.integers(0, 4, n_rows), "180": rng.integers(0, 2, n_rows)},
+        rng.choice([0.003, 0.009, 0.015], n_rows),
+        rng.uniform(0, 30, n_rows),
+        np.full(n_rows, 1.1),
+    )
+
+
+def scalar_latency_us(repeat: int = 7, number: int = 20_000) -> float:
+    """Best-of-repeat mean time of one calculate_flexible_duct call, in µs."""
+    timer = timeit.Timer(lambda: calculate_flexible_duct(**_SCALAR_ARGS))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def batch_rows_per_s(n_rows: int, repeat: int = 7, repeat_seconds: float = REPEAT_SECONDS) -> float:
+    """
+    Rows per second of one calculate_flexible_duct_batch call: best of
+    repeat runs, each timing enough calls to last about repeat_seconds.
+    """
+    args = synthetic_schedule(n_rows)
+    timer = timeit.Timer(lambda: calculate_flexible_duct_batch(*args))
+    once = min(timer.repeat(repeat=3, number=1))
+    number = max(1, math.ceil(repeat_seconds / once))
+    return n_rows * number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def batch_bytes_per_row(n_rows: int = MEMORY_ROWS) -> float:
+    """Peak memory allocated by one batch call (inputs excluded), per row."""
+    args = synthetic_schedule(n_rows)
+    tracemalloc.start()
+    try:
+        calculate_flexible_duct_batch(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / n_rows
+
+
+def run(quick: bool = False) -> dict:
+    sizes = BATCH_SIZES[:2] if quick else BATCH_SIZES
+    results = {"scalar_latency_us": scalar_latency_us(number=2_000 if quick else 20_000)}
+    for n_rows in sizes:
+        results[f"batch_rows_per_s_{n_rows:.0e}".replace("+0", "")] = batch_rows_per_s(n_rows, 5 if quick else 7)
+    results["batch_bytes_per_row"] = batch_bytes_per_row()
+    return results
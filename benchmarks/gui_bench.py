@@ -0,0 +1,94 @@
+# benchmarks/gui_bench.py
+# Cold start of FlexibleDuctApp in a fresh interpreter, on a virtual X
+# display (Xvfb) when no display is available.
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CHILD = [sys.executable, "-m", "benchmarks.gui_bench", "--child"]
+
+
+def _child():
+    # Mirrors app.py: the timer starts before the GUI modules are imported
+    start = time.perf_counter()
+    from utils.startup import StartupTimer
+    startup = StartupTimer(start)
+    from ui.app_root import FlexibleDuctApp, PAGES
+    startup.mark("imports")
+    app = FlexibleDuctApp(startup)
+    app.update()  # processes the pending redraw and the first_paint mark
+    for page_name in PAGES:
+        app.show_frame(page_name)
+        app.update_idletasks()
+    app.destroy()
+    print(json.dumps(startup.report()))
+
+
+class _VirtualDisplay:
+    """Xvfb on a free display number (chosen by Xvfb itself via -displayfd)."""
+
+    def __init__(self):
+        self.process = None
+        self.display = None
+
+    def __enter__(self):
+        read_fd, write_fd = os.pipe()
+        self.process = subprocess.Popen(
+            ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            number = f.readline().strip()
+        if not number:
+            self.process.kill()
+            raise RuntimeError("Xvfb did not start")
+        self.display = f":{number}"
+        return self.display
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait()
+
+
+def _measure(env, repeat: int) -> list:
+    reports = []
+    for _ in range(repeat):
+        out = subprocess.run(_CHILD, cwd=_PROJECT_ROOT, env=env, capture_output=True, text=True, check=True)
+        reports.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return reports
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Best-of-N cold start timings (N = 1 when quick). Returns {} with a
+    message on stderr when there is neither a display nor Xvfb.
+    """
+    repeat = 1 if quick else 5
+    env = dict(os.environ)
+    if os.name == "posix" and sys.platform != "darwin" and not env.get("DISPLAY"):
+        if shutil.which("Xvfb") is None:
+            print("GUI benchmarks skipped: no DISPLAY and Xvfb is not installed", file=sys.stderr)
+            return {}
+        with _VirtualDisplay() as display:
+            env["DISPLAY"] = display
+            reports = _measure(env, repeat)
+    else:
+        reports = _measure(env, repeat)
+
+    results = {}
+    for key in ("imports_s", "window_s", "first_paint_s"):
+        values = [r[key] for r in reports if r[key] is not None]
+        if values:
+            results[f"gui_{key}"] = min(values)
+    for page_name in reports[0]["page_build_s"]:
+        results[f"gui_build_{page_name}_s"] = min(r["page_build_s"][page_name] for r in reports)
+    return results
+
+
+if __name__ == "__main__" and "--child" in sys.argv[1:]:
+    _child()
@@ -0,0 +1,147 @@
+# cli.py
+# Headless batch rating of duct schedules, no Tk required.
+#
+#   python cli.py schedule.csv -o results.csv
+#   type schedule.jsonl | python cli.py - --input-format jsonl --output-format jsonl
+#   python cli.py schedule.csv --project runs.ductproj
+import argparse
+import os
+import sys
+import time
+
+from core.friction import DEFAULT_FRICTION_SOLVER, FRICTION_SOLVERS
+from core.friction_cache import default_cache
+from core.instrument import Instrumentation
+from core.project import DuctProject, append_schedule
+from core.result_cache import ResultCache
+from core.schedule import DEFAULT_CHUNK_SIZE, INPUT_FIELDS, rate_schedule
+
+
+def _guess_format(path: str, default: str = "csv") -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    return default
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rate a flexible duct schedule (CSV or JSON Lines) without the GUI.",
+        epilog="Input columns: " + ", ".join(INPUT_FIELDS) + ". "
+               "The first three are required (for shape rectangular or flat_oval, width_in and height_in "
+               "replace duct_diameter_in); the rest default as in the calculator.",
+    )
+    parser.add_argument("input", help="schedule file, or - for stdin")
+    parser.add_argument("-o", "--output", help="results file, or - for stdout (default unless --project)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from file extension, else csv")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from file extension, else csv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows rated per vectorized pass (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="processes used to parse and rate chunks (default 1)")
+    parser.add_argument("--friction-solver", choices=tuple(FRICTION_SOLVERS), default=DEFAULT_FRICTION_SOLVER,
+                        help=f"friction-factor model (default {DEFAULT_FRICTION_SOLVER})")
+    parser.add_argument("--friction-cache", action="store_true",
+                        help="interpolate Colebrook f from per-(roughness, diameter) tables, built for "
+                             "pairs with many rows")
+    parser.add_argument("--result-cache", metavar="DIR",
+                        help="reuse results of unchanged rows from earlier runs (persistent cache in DIR; "
+                             "single worker only)")
+    parser.add_argument("--project", metavar="DIR",
+                        help="append the inputs and results of valid rows to a project (created if missing); "
+                             "results are only written to --output when it is given")
+    parser.add_argument("--instrument", metavar="FILE",
+                        help="write per-stage timings as JSON to FILE (- for stderr); stages are only "
+                             "fully timed with --workers 1")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile and include the top functions in the --instrument report "
+                             "(or print them to stderr)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report rejected rows on stderr")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.chunk_size < 1 or args.workers < 1:
+        print("error: --chunk-size and --workers must be at least 1", file=sys.stderr)
+        return 2
+    if args.result_cache and args.workers > 1:
+        print("error: --result-cache needs --workers 1", file=sys.stderr)
+        return 2
+    if args.project and (args.workers > 1 or args.result_cache or args.output):
+        print("error: --project cannot be combined with --workers, --result-cache or --output", file=sys.stderr)
+        return 2
+    in_fmt = args.input_format or _guess_format(args.input)
+
+    def report(line, message):
+        if not args.quiet:
+            print(f"line {line}: {message}", file=sys.stderr)
+
+    in_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    if args.project:
+        return _append_to_project(args, in_stream, in_fmt, report)
+    args.output = args.output or "-"
+    out_fmt = args.output_format or _guess_format(args.output)
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    start = time.perf_counter()
+    instrument = Instrumentation() if args.instrument or args.profile else None
+    result_cache = ResultCache(args.result_cache, args.friction_solver) if args.result_cache else None
+    run_args = (in_stream, out_stream, in_fmt, out_fmt, args.chunk_size, report,
+                args.workers, args.friction_solver, args.friction_cache, instrument, result_cache)
+    try:
+        if args.profile:
+            total, rejected = instrument.profile_call(rate_schedule, *run_args)
+        else:
+            total, rejected = rate_schedule(*run_args)
+    except BrokenPipeError:
+        # The reader of stdout went away (e.g. "| head"): stop quietly. The
+        # interpreter flushes stdout once more on exit, so point it at devnull.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+        if result_cache is not None:
+            result_cache.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Rated {total - rejected} of {total} rows in {elapsed:.2f} s ({rejected} rejected)", file=sys.stderr)
+    if args.friction_cache and args.workers == 1:
+        stats = default_cache().stats()
+        print(f"Friction cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['tables']} tables ({stats['builds']} built), max interpolation error {stats['max_rel_error']:.1e}", file=sys.stderr)
+    if result_cache is not None:
+        stats = result_cache.stats()
+        print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} entries, {stats['evictions']} evicted", file=sys.stderr)
+    if args.instrument == "-" or (args.profile and not args.instrument):
+        print(instrument.to_json() if args.instrument else instrument.profile_text, file=sys.stderr)
+    elif args.instrument:
+        with open(args.instrument, "w", encoding="utf-8") as f:
+            f.write(instrument.to_json())
+    return 1 if rejected else 0
+
+
+def _append_to_project(args, in_stream, in_fmt, report) -> int:
+    start = time.perf_counter()
+    try:
+        project = DuctProject.open_or_create(args.project, {"source": args.input})
+        before = len(project)
+        total, rejected = append_schedule(project, in_stream, in_fmt, args.chunk_size, args.friction_solver, report)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+    elapsed = time.perf_counter() - start
+    print(f"Added {len(project) - before} of {total} rows to {args.project} in {elapsed:.2f} s "
+          f"({rejected} rejected, {len(project)} runs in project)", file=sys.stderr)
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
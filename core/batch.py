@@ -0,0 +1,329 @@
+# core/batch.py
+import numpy as np
+
+from core.air import RE_COEFFICIENT, RHO_AIR, STANDARD_AIR, air_properties as lookup_air_properties
+from core.calculations import STANDARD_FLEX_DIAMETERS_IN
+from core.fittings import FLEX_BEND_IDS, default_catalog
+from core.friction import (
+    DEFAULT_FRICTION_SOLVER, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, check_solver,
+)
+
+# Column names returned by calculate_flexible_duct_batch, mapped to the
+# detail labels used by calculate_flexible_duct for the same quantity.
+BATCH_COLUMNS = {
+    "area_ft2": "Area (ft²)",
+    "velocity_fpm": "Velocity (FPM)",
+    "air_density": "Air Density (lb/ft³)",
+    "re_number": "Reynolds Number",
+    "f_factor": "Friction Factor (f)",
+    "leq_ft": "Equivalent Length (ft)",
+    "pf": "Raw Pf (in.w.g.)",
+    "pdcf": "PDCF",
+    "safety_factor": "Safety Factor",
+    "total_pressure_loss": "Total ΔP (in.w.g.)",
+    "f_iterations": "Friction Iterations",
+}
+
+_LN10 = np.log(10.0)
+_FLEX_BENDS = frozenset(FLEX_BEND_IDS)
+
+
+def _as_column(value, n: int) -> np.ndarray:
+    arr = np.asarray(value, dtype=np.float64)
+    if arr.ndim == 0:
+        return np.full(n, float(arr))
+    if arr.shape != (n,):
+        raise ValueError(f"Expected a scalar or an array of length {n}, got shape {arr.shape}.")
+    return arr
+
+
+def _batch_length(*values) -> int:
+    lengths = {np.size(v) for v in values if np.ndim(v) > 0}
+    if len(lengths) > 1:
+        raise ValueError(f"Batch inputs must have equal lengths, got {sorted(lengths)}.")
+    return lengths.pop() if lengths else 1
+
+
+def _swamee_jain_v(re_number, roughness_value, duct_diameter_in):
+    return 0.25 / np.log10(roughness_value / (3.7 * duct_diameter_in) + 5.74 / re_number ** 0.9) ** 2
+
+
+def _haaland_v(re_number, roughness_value, duct_diameter_in):
+    rel_roughness = roughness_value / duct_diameter_in
+    return (-1.8 * np.log10((rel_roughness / 3.7) ** 1.11 + 6.9 / re_number)) ** -2
+
+
+def _churchill_v(re_number, roughness_value, duct_diameter_in):
+    rel_roughness = roughness_value / duct_diameter_in
+    a = (2.457 * np.log(1.0 / ((7.0 / re_number) ** 0.9 + 0.27 * rel_roughness))) ** 16
+    b = (37530.0 / re_number) ** 16
+    return 8.0 * ((8.0 / re_number) ** 12 + (a + b) ** -1.5) ** (1.0 / 12.0)
+
+
+_EXPLICIT_V = {"swamee_jain": _swamee_jain_v, "haaland": _haaland_v, "churchill": _churchill_v}
+
+
+def friction_factor_batch(
+    re_number: np.ndarray,
+    roughness_value: np.ndarray,
+    duct_diameter_in: np.ndarray,
+    solver: str = DEFAULT_FRICTION_SOLVER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    f_start: np.ndarray = None,
+):
+    """
+    Vectorized friction_factor. Returns (f_factor, iterations, converged)
+    arrays; invalid rows have f = 0.0 and converged False.
+
+    Colebrook is solved by Newton iteration on all unconverged rows at once,
+    warm-started from f_start when given (e.g. results of a neighbouring
+    sweep step or a previous revision of the same rows) and from Swamee–Jain
+    otherwise, so typical rows converge in 2–3 iterations.
+    """
+    check_solver(solver)
+    re_number = np.asarray(re_number, dtype=np.float64)
+    n = re_number.shape
+    iterations = np.zeros(n, dtype=np.int32)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        roughness_value = np.broadcast_to(np.asarray(roughness_value, dtype=np.float64), n)
+        duct_diameter_in = np.broadcast_to(np.asarray(duct_diameter_in, dtype=np.float64), n)
+        domain = (duct_diameter_in > 0) & (re_number > 0) & np.isfinite(re_number)
+        if solver != "colebrook":
+            f_factor = _EXPLICIT_V[solver](re_number, roughness_value, duct_diameter_in)
+            valid = domain & np.isfinite(f_factor) & (f_factor > 0)
+            return np.where(valid, f_factor, 0.0), iterations, valid
+
+        start = _swamee_jain_v(re_number, roughness_value, duct_diameter_in)
+        if f_start is not None:
+            f_start = np.broadcast_to(np.asarray(f_start, dtype=np.float64), n)
+            start = np.where(np.isfinite(f_start) & (f_start > 0), f_start, start)
+        valid = domain & np.isfinite(start) & (start > 0)
+        a = roughness_value / duct_diameter_in / 3.7
+        b = 2.51 / re_number
+        x = np.where(valid, 1.0 / np.sqrt(start), 1.0)
+        converged = np.zeros(n, dtype=bool)
+        active = np.flatnonzero(valid)
+        for iteration in range(1, max_iterations + 1):
+            if active.size == 0:
+                break
+            xa, aa, ba = x[active], a[active], b[active]
+            inner = aa + ba * xa
+            step = (xa + 2.0 * np.log10(inner)) / (1.0 + 2.0 * ba / (_LN10 * inner))
+            xa = xa - step
+            x[active] = xa
+            iterations[active] = iteration
+            done = np.abs(step) <= tolerance * np.abs(xa)
+            converged[active[done]] = True
+            active = active[~done & np.isfinite(xa)]
+        f_factor = 1.0 / (x * x)
+        ok = valid & np.isfinite(f_factor) & (f_factor > 0)
+        return np.where(ok, f_factor, 0.0), iterations, converged & ok
+
+
+def calculate_flexible_duct_batch(
+    duct_diameter_in,
+    air_flow_cfm,
+    duct_length_ft,
+    bend_counts: dict,
+    roughness_value,
+    compression_percent,
+    safety_factor,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    friction_cache=None,
+    instrument=None,
+    fitting_losses=None,
+    altitude_ft=0.0,
+    air_temperature_f=70.0,
+    relative_humidity_pct=0.0,
+    air_properties=None,
+) -> dict:
+    """
+    Vectorized counterpart of calculate_flexible_duct.
+
+    Every argument may be a scalar or a 1-D array; scalars are broadcast to
+    the batch length. bend_counts maps fitting ids of the fittings catalog
+    (core/fittings.py; "45"/"90"/"180" are the flex bends) to counts
+    (scalar or array), resolved for all rows in one lookup; a pre-resolved
+    (Leq ft, K) pair of columns may be passed as fitting_losses instead.
+    altitude_ft, air_temperature_f and relative_humidity_pct set the air
+    density and Reynolds coefficient from the shared tables of
+    core/air.py; a pre-resolved (density, Re coefficient) pair may be
+    passed as air_properties instead. Returns a dict of columns keyed as in BATCH_COLUMNS plus the boolean
+    "f_converged". Zero-area rows get an infinite velocity and rows
+    whose friction factor cannot be evaluated get f = 0.0 with f_converged
+    False, exactly as in the scalar function. A FrictionFactorCache
+    (core/friction_cache.py) may be passed to interpolate f from
+    precomputed tables instead of evaluating the solver for every row.
+    instrument (core/instrument.py) records the friction and details
+    stages with the row count.
+    """
+    if instrument is not None:
+        start = instrument.clock()
+    bend_counts = bend_counts or {}
+    n = _batch_length(
+        duct_diameter_in, air_flow_cfm, duct_length_ft, roughness_value,
+        compression_percent, safety_factor, *bend_counts.values(), *(fitting_losses or ()),
+        altitude_ft, air_temperature_f, relative_humidity_pct, *(air_properties or ()),
+    )
+    if air_properties is None:
+        # Standard air (core/air.py) needs no lookup, as in calculate_flexible_duct
+        conditions = (altitude_ft, air_temperature_f, relative_humidity_pct)
+        if all(isinstance(c, (int, float)) for c in conditions) and conditions == STANDARD_AIR:
+            air_properties = (RHO_AIR, RE_COEFFICIENT)
+        else:
+            air_properties = lookup_air_properties(*conditions)
+    rho_air, re_coefficient = air_properties
+    d_in = _as_column(duct_diameter_in, n)
+    cfm = _as_column(air_flow_cfm, n)
+    length_ft = _as_column(duct_length_ft, n)
+    roughness = _as_column(roughness_value, n)
+    kc = _as_column(compression_percent, n)
+    sf = _as_column(safety_factor, n)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        dh_ft = d_in / 12.0
+        a_duct = np.pi * (dh_ft ** 2) / 4.0
+        velocity_fpm = np.where(a_duct > 0, cfm / a_duct, np.inf)
+
+        re_number = re_coefficient * d_in * velocity_fpm
+
+    if instrument is not None:
+        friction_start = instrument.clock()
+    if friction_cache is not None:
+        f_factor, f_iterations, f_converged = friction_cache.friction_factor_batch(
+            re_number, roughness, d_in, friction_solver, tolerance, max_iterations,
+        )
+    else:
+        f_factor, f_iterations, f_converged = friction_factor_batch(
+            re_number, roughness, d_in, friction_solver, tolerance, max_iterations,
+        )
+    if instrument is not None:
+        friction_seconds = instrument.clock() - friction_start
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+
+        if fitting_losses is not None:
+            leq, k_total = (_as_column(v, n) for v in fitting_losses)
+        elif bend_counts.keys() <= _FLEX_BENDS:
+            # Flex bends only (the usual run): Leq alone, no K column
+            leq, k_total = default_catalog().flex_bend_leq(bend_counts, d_in), None
+        else:
+            leq, k_total = default_catalog().resolve_batch(bend_counts, d_in)
+        if k_total is not None and k_total.any():
+            leq = leq + np.where(f_factor > 0, k_total * d_in / (12 * f_factor), 0.0)
+
+        pf = (
+            (12 * f_factor * (length_ft + leq)) / d_in
+        ) * rho_air * ((velocity_fpm / 1097) ** 2)
+
+        pdcf = 1 + 0.58 * kc * np.exp(-0.126 * d_in)
+
+        total_pressure_loss = pf * pdcf * sf
+
+    if instrument is not None:
+        instrument.add("friction", friction_seconds, n)
+        instrument.add("details", instrument.clock() - start - friction_seconds, n)
+    return {
+        "area_ft2": a_duct,
+        "velocity_fpm": velocity_fpm,
+        # One condition for the whole batch is a read-only broadcast, not a copy
+        "air_density": np.broadcast_to(np.asarray(rho_air, dtype=np.float64), (n,)),
+        "re_number": re_number,
+        "f_factor": f_factor,
+        "leq_ft": leq,
+        "pf": pf,
+        "pdcf": pdcf,
+        "safety_factor": sf,
+        "total_pressure_loss": total_pressure_loss,
+        "f_iterations": f_iterations,
+        "f_converged": f_converged,
+    }
+
+
+def size_flexible_duct_batch(
+    air_flow_cfm,
+    duct_length_ft,
+    bend_counts: dict,
+    roughness_value,
+    compression_percent,
+    safety_factor,
+    max_pressure_loss=None,
+    max_friction_rate=None,
+    max_velocity_fpm=None,
+    diameters=STANDARD_FLEX_DIAMETERS_IN,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    altitude_ft=0.0,
+    air_temperature_f=70.0,
+    relative_humidity_pct=0.0,
+) -> dict:
+    """
+    Vectorized counterpart of size_flexible_duct.
+
+    All rows are bisected over the sorted standard sizes together, so the
+    batch kernel runs about log2(len(diameters)) + 1 times regardless of
+    the number of rows. Limits may be scalars, arrays or None. Returns the
+    batch columns at the selected size plus "duct_diameter_in", which is
+    NaN for rows that fail even at the largest size (their other columns
+    describe that largest size).
+    """
+    if max_pressure_loss is None and max_friction_rate is None and max_velocity_fpm is None:
+        raise ValueError("At least one sizing limit is required.")
+    sizes = np.array(sorted(diameters), dtype=np.float64)
+    if sizes.size == 0:
+        raise ValueError("No candidate diameters given.")
+    bend_counts = bend_counts or {}
+    n = _batch_length(
+        air_flow_cfm, duct_length_ft, roughness_value, compression_percent, safety_factor,
+        max_pressure_loss if max_pressure_loss is not None else 0,
+        max_friction_rate if max_friction_rate is not None else 0,
+        max_velocity_fpm if max_velocity_fpm is not None else 0,
+        *bend_counts.values(), altitude_ft, air_temperature_f, relative_humidity_pct,
+    )
+    # Air properties are looked up once for every bisection step
+    air = {"air_properties": lookup_air_properties(altitude_ft, air_temperature_f, relative_humidity_pct)}
+    args = (
+        _as_column(air_flow_cfm, n),
+        _as_column(duct_length_ft, n),
+        {angle: _as_column(count, n) for angle, count in bend_counts.items()},
+        _as_column(roughness_value, n),
+        _as_column(compression_percent, n),
+        _as_column(safety_factor, n),
+        friction_solver,
+    )
+    length_ft = args[1]
+
+    def passes(out):
+        ok = ~np.isnan(out["total_pressure_loss"])
+        if max_pressure_loss is not None:
+            ok &= out["total_pressure_loss"] <= max_pressure_loss
+        if max_friction_rate is not None:
+            effective_length = length_ft + out["leq_ft"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(effective_length > 0,
+                                out["total_pressure_loss"] * 100.0 / effective_length, 0.0)
+            ok &= rate <= max_friction_rate
+        if max_velocity_fpm is not None:
+            ok &= out["velocity_fpm"] <= max_velocity_fpm
+        return ok
+
+    lo = np.zeros(n, dtype=np.intp)
+    hi = np.full(n, sizes.size - 1, dtype=np.intp)
+    largest = calculate_flexible_duct_batch(sizes[hi], *args, **air)
+    feasible = passes(largest)
+    # Infeasible rows are parked at lo == hi so the loop leaves them alone
+    lo[~feasible] = hi[~feasible]
+    while True:
+        active = lo < hi
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        ok = passes(calculate_flexible_duct_batch(sizes[mid], *args, **air))
+        hi = np.where(active & ok, mid, hi)
+        lo = np.where(active & ~ok, mid + 1, lo)
+
+    result = calculate_flexible_duct_batch(sizes[hi], *args, **air)
+    result["duct_diameter_in"] = np.where(feasible, sizes[hi], np.nan)
+    return result
@@ -1,5 +1,26 @@
 import math
 
+from core.friction import (
+    DEFAULT_FRICTION_SOLVER, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, FRICTION_SOLVERS, friction_factor,
+)
+
+# Nominal flexible duct sizes (in), ascending
+STANDARD_FLEX_DIAMETERS_IN = (4, 5, 6, 7, 8, 9, 10, 12, 14, 16, 18, 20, 22, 24)
+
+# core.air and core.fittings need NumPy, which the GUI only loads with the
+# first page that uses it (ui/app_root.py): both are bound on the first
+# calculation rather than imported here, or per call (an import statement
+# costs about as much as the rest of a scalar calculation).
+_air = _fittings = None
+
+
+def _load_dependencies():
+    global _air, _fittings
+    import core.air
+    import core.fittings
+    _air, _fittings = core.air, core.fittings
+
+
 def calculate_flexible_duct(
     duct_diameter_in: float,
     air_flow_cfm: float,
@@ -8,30 +29,52 @@ def calculate_flexible_duct(
     roughness_value: float,
     compression_percent: float,
     safety_factor: float,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    friction_cache=None,
+    instrument=None,
+    altitude_ft: float = 0.0,
+    air_temperature_f: float = 70.0,
+    relative_humidity_pct: float = 0.0,
 ):
+    if _fittings is None:
+        _load_dependencies()
+    air = _air
+    if instrument is not None:
+        start = instrument.clock()
+    # Standard air (core/air.py) unless the conditions say otherwise
+    conditions = (altitude_ft, air_temperature_f, relative_humidity_pct)
+    if conditions == air.STANDARD_AIR:
+        rho_air, re_coefficient = air.RHO_AIR, air.RE_COEFFICIENT
+    else:
+        rho_air, re_coefficient = air.air_properties(*conditions)
     dh_ft = duct_diameter_in / 12.0
     a_duct = math.pi * (dh_ft ** 2) / 4.0
     velocity_fpm = air_flow_cfm / a_duct if a_duct > 0 else float("inf")
 
-    re_number = 8.50 * duct_diameter_in * velocity_fpm
-
-    try:
-        f_factor = 0.25 / (
-            math.log10(
-                (roughness_value / (3.7 * duct_diameter_in))
-                + (5.74 / (re_number ** 0.9))
-            )
-        ) ** 2
-    except (ValueError, ZeroDivisionError):
-        f_factor = 0.0
-
-    leq = (
-        bend_counts.get("45", 0) * 10
-        + bend_counts.get("90", 0) * 20
-        + bend_counts.get("180", 0) * 40
-    )
-
-    rho_air = 0.075
+    re_number = re_coefficient * duct_diameter_in * velocity_fpm
+
+    if instrument is not None:
+        friction_start = instrument.clock()
+    if friction_cache is not None:
+        friction = friction_cache.friction_factor(
+            re_number, roughness_value, duct_diameter_in, friction_solver, tolerance, max_iterations
+        )
+    else:
+        friction = friction_factor(
+            re_number, roughness_value, duct_diameter_in, friction_solver, tolerance, max_iterations
+        )
+    f_factor = friction.f_factor
+    if instrument is not None:
+        friction_seconds = instrument.clock() - friction_start
+
+    # bend_counts maps fitting ids (core/fittings.py; "45"/"90"/"180" are
+    # the flex bends) to counts. K fittings become an equivalent length K·D/f.
+    leq, k_total = _fittings.default_catalog().resolve(bend_counts, duct_diameter_in)
+    if k_total and f_factor > 0:
+        leq += k_total * duct_diameter_in / (12 * f_factor)
+
     pf = (
         (12 * f_factor * (duct_length_ft + leq)) / duct_diameter_in
     ) * rho_air * ((velocity_fpm / 1097) ** 2)
@@ -44,8 +87,12 @@ def calculate_flexible_duct(
     details = {
         "Area (ft²)": a_duct,
         "Velocity (FPM)": velocity_fpm,
+        "Air Density (lb/ft³)": rho_air,
         "Reynolds Number": re_number,
         "Friction Factor (f)": f_factor,
+        "Friction Solver": FRICTION_SOLVERS[friction_solver],
+        "Friction Iterations": friction.iterations,
+        "Friction Status": friction.message or "OK",
         "Equivalent Length (ft)": leq,
         "Raw Pf (in.w.g.)": pf,
         "PDCF": pdcf,
@@ -53,4 +100,86 @@ def calculate_flexible_duct(
         "Total ΔP (in.w.g.)": total_pressure_loss,
     }
 
+    if instrument is not None:
+        instrument.add("friction", friction_seconds)
+        instrument.add("details", instrument.clock() - start - friction_seconds)
     return velocity_fpm, total_pressure_loss, details
+
+
+def friction_rate_per_100ft(total_pressure_loss: float, duct_length_ft: float, leq_ft: float) -> float:
+    """ΔP per 100 ft of total (straight + equivalent) length, in.w.g./100 ft."""
+    effective_length = duct_length_ft + leq_ft
+    return total_pressure_loss * 100.0 / effective_length if effective_length > 0 else 0.0
+
+
+def _meets_limits(details: dict, duct_length_ft: float, max_pressure_loss, max_friction_rate, max_velocity_fpm):
+    dp = details["Total ΔP (in.w.g.)"]
+    velocity = details["Velocity (FPM)"]
+    if math.isnan(dp):
+        return False
+    if max_pressure_loss is not None and not dp <= max_pressure_loss:
+        return False
+    if max_friction_rate is not None:
+        rate = friction_rate_per_100ft(dp, duct_length_ft, details["Equivalent Length (ft)"])
+        if not rate <= max_friction_rate:
+            return False
+    if max_velocity_fpm is not None and not velocity <= max_velocity_fpm:
+        return False
+    return True
+
+
+def size_flexible_duct(
+    air_flow_cfm: float,
+    duct_length_ft: float,
+    bend_counts: dict,
+    roughness_value: float,
+    compression_percent: float,
+    safety_factor: float,
+    max_pressure_loss: float = None,
+    max_friction_rate: float = None,
+    max_velocity_fpm: float = None,
+    diameters=STANDARD_FLEX_DIAMETERS_IN,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    altitude_ft: float = 0.0,
+    air_temperature_f: float = 70.0,
+    relative_humidity_pct: float = 0.0,
+):
+    """
+    Smallest standard diameter whose total ΔP (in.w.g.), friction rate
+    (in.w.g./100 ft) and velocity (FPM) are all within the given limits;
+    a limit of None is not checked.
+
+    ΔP and velocity fall monotonically with diameter, so the sizes are
+    bisected rather than scanned. Returns (diameter_in, velocity_fpm,
+    total_pressure_loss, details); diameter_in is None when even the
+    largest size fails, and the other values then describe that size.
+    """
+    if max_pressure_loss is None and max_friction_rate is None and max_velocity_fpm is None:
+        raise ValueError("At least one sizing limit is required.")
+    diameters = sorted(diameters)
+    if not diameters:
+        raise ValueError("No candidate diameters given.")
+
+    def evaluate(index):
+        result = calculate_flexible_duct(
+            diameters[index], air_flow_cfm, duct_length_ft, bend_counts,
+            roughness_value, compression_percent, safety_factor, friction_solver,
+            altitude_ft=altitude_ft, air_temperature_f=air_temperature_f,
+            relative_humidity_pct=relative_humidity_pct,
+        )
+        ok = _meets_limits(result[2], duct_length_ft, max_pressure_loss, max_friction_rate, max_velocity_fpm)
+        return ok, result
+
+    lo, hi = 0, len(diameters) - 1
+    ok, best = evaluate(hi)
+    if not ok:
+        return (None,) + best
+    # Invariant: diameters[hi] passes, everything below lo fails
+    while lo < hi:
+        mid = (lo + hi) // 2
+        ok, result = evaluate(mid)
+        if ok:
+            hi, best = mid, result
+        else:
+            lo = mid + 1
+    return (diameters[hi],) + best
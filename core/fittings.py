@@ -0,0 +1,358 @@
+# core/fittings.py
+# Fittings catalog: equivalent length (ft) or loss coefficient K of each
+# fitting as a function of duct diameter, indexed once into dense tables so
+# that runs listing many fittings are resolved in one vectorized lookup.
+#
+# A fitting is either
+#   "leq" - an equivalent length of straight duct, added to the run length;
+#   "k"   - a loss coefficient on the duct velocity pressure, turned into an
+#           equivalent length K·D/f with the run's own friction factor.
+# Values are interpolated linearly in diameter between the tabulated sizes
+# and held constant outside them.
+#
+# The built-in values are typical published magnitudes (ASHRAE fitting
+# data for elbows, representative values for boots, takeoffs, wyes and
+# transitions); projects with their own data can load a catalog CSV with
+# load_catalog(). The ids "45", "90" and "180" are the calculator's
+# flexible duct bends (10/20/40 ft), so bend counts keep their meaning.
+import bisect
+import csv
+import hashlib
+import json
+
+import numpy as np
+
+FITTING_KINDS = ("leq", "k")
+CATALOG_FIELDS = ("id", "category", "label", "kind", "diameter_in", "value")
+FLEX_BEND_IDS = ("45", "90", "180")
+
+# ASHRAE CD3-1 (smooth radius round elbow): K for 90° by r/D, and the
+# factor applied for other angles
+_ELBOW_K90 = {0.75: 0.33, 1.0: 0.22, 1.5: 0.15, 2.0: 0.13}
+_ELBOW_ANGLE_FACTOR = {30: 0.45, 45: 0.60, 60: 0.78, 90: 1.00}
+
+
+def _elbows():
+    for angle, factor in _ELBOW_ANGLE_FACTOR.items():
+        for ratio, k90 in _ELBOW_K90.items():
+            yield (f"elbow_{angle}_r{ratio:g}", "Elbows, smooth radius", f"{angle}° elbow, r/D {ratio:g}",
+                   "k", {3: round(k90 * factor, 3)})
+
+
+# id, category, label, kind, {diameter_in: value}
+DEFAULT_FITTINGS = (
+    ("45", "Flexible duct bends", "45° flex bend", "leq", {4: 10.0}),
+    ("90", "Flexible duct bends", "90° flex bend", "leq", {4: 20.0}),
+    ("180", "Flexible duct bends", "180° flex bend", "leq", {4: 40.0}),
+    *_elbows(),
+    ("elbow_90_gored5", "Elbows, gored", "90° 5-gore elbow, r/D 1.5", "k",
+     {4: 0.42, 6: 0.35, 8: 0.30, 10: 0.27, 12: 0.25, 16: 0.22, 20: 0.20, 24: 0.19}),
+    ("elbow_90_gored3", "Elbows, gored", "90° 3-gore elbow, r/D 1.5", "k",
+     {4: 0.55, 6: 0.46, 8: 0.40, 10: 0.36, 12: 0.34, 16: 0.30, 20: 0.28, 24: 0.26}),
+    ("elbow_90_pleated", "Elbows, gored", "90° pleated elbow, r/D 1.5", "k",
+     {4: 0.57, 6: 0.43, 8: 0.34, 10: 0.28, 12: 0.26, 16: 0.25, 24: 0.25}),
+    ("elbow_45_gored3", "Elbows, gored", "45° 3-gore elbow, r/D 1.5", "k",
+     {4: 0.33, 6: 0.28, 8: 0.24, 10: 0.22, 12: 0.20, 16: 0.18, 24: 0.16}),
+    ("boot_straight", "Boots", "End boot, straight", "k", {4: 0.80, 8: 0.70, 14: 0.60}),
+    ("boot_90", "Boots", "Angle boot, 90°", "k", {4: 1.30, 8: 1.10, 14: 1.00}),
+    ("boot_ceiling", "Boots", "Ceiling boot / diffuser box", "k", {4: 1.60, 8: 1.40, 14: 1.20}),
+    ("takeoff_straight", "Takeoffs", "Straight collar takeoff", "k", {4: 1.20, 8: 1.00, 16: 0.90}),
+    ("takeoff_conical", "Takeoffs", "Conical (bellmouth) takeoff", "k", {4: 0.60, 8: 0.50, 16: 0.45}),
+    ("takeoff_45_entry", "Takeoffs", "45° entry takeoff", "k", {4: 0.70, 8: 0.60, 16: 0.50}),
+    ("takeoff_damper", "Takeoffs", "Straight takeoff with open damper", "k",
+     {4: 1.70, 6: 1.45, 8: 1.30, 12: 1.15, 16: 1.05}),
+    ("wye_45_branch", "Wyes and tees", "45° wye, branch", "k", {4: 0.50, 8: 0.40, 16: 0.35}),
+    ("wye_45_straight", "Wyes and tees", "45° wye, straight through", "k", {4: 0.15, 8: 0.12, 16: 0.10}),
+    ("tee_branch", "Wyes and tees", "Tee, branch", "k", {4: 1.20, 8: 1.00, 16: 0.90}),
+    ("tee_straight", "Wyes and tees", "Tee, straight through", "k", {4: 0.25, 8: 0.20, 16: 0.18}),
+    ("reducer_gradual", "Transitions", "Gradual reducer (≤ 30°)", "k", {4: 0.05}),
+    ("reducer_abrupt", "Transitions", "Abrupt reducer", "k", {4: 0.35}),
+    ("increaser_gradual", "Transitions", "Gradual increaser (≤ 20°)", "k", {4: 0.15}),
+    ("increaser_abrupt", "Transitions", "Abrupt increaser", "k", {4: 0.60}),
+)
+
+
+def _interp_scalar(grid: list, values: list, x: float) -> float:
+    # np.interp for one point without the NumPy call overhead
+    if x <= grid[0]:
+        return values[0]
+    if x >= grid[-1]:
+        return values[-1]
+    i = bisect.bisect_right(grid, x)
+    w = (x - grid[i - 1]) / (grid[i] - grid[i - 1])
+    return values[i - 1] + w * (values[i] - values[i - 1])
+
+
+class FittingsCatalog:
+    """
+    Fittings indexed onto one diameter grid, the sorted union of every
+    fitting's tabulated diameters. Each fitting has one row of Leq (ft)
+    and one of K on that grid, so interpolating between grid points is
+    exact for every fitting's own piecewise-linear table.
+    """
+
+    def __init__(self, fittings=DEFAULT_FITTINGS):
+        self.ids = []
+        self.categories = {}
+        self.labels = {}
+        self.kinds = {}
+        tables = []
+        for fitting_id, category, label, kind, table in fittings:
+            fitting_id = str(fitting_id)
+            if fitting_id in self.labels:
+                raise ValueError(f"Duplicate fitting id '{fitting_id}'.")
+            if kind not in FITTING_KINDS:
+                raise ValueError(f"Fitting '{fitting_id}': kind must be one of {', '.join(FITTING_KINDS)}.")
+            if not table or any(d <= 0 or v < 0 for d, v in table.items()):
+                raise ValueError(f"Fitting '{fitting_id}' needs positive diameters and non-negative values.")
+            self.ids.append(fitting_id)
+            self.categories[fitting_id] = category
+            self.labels[fitting_id] = label
+            self.kinds[fitting_id] = kind
+            tables.append(sorted((float(d), float(v)) for d, v in table.items()))
+        if not self.ids:
+            raise ValueError("A fittings catalog needs at least one fitting.")
+
+        self.index = {fitting_id: i for i, fitting_id in enumerate(self.ids)}
+        self.grid = np.unique([d for table in tables for d, _ in table])
+        self.leq_table = np.zeros((len(self.ids), self.grid.size))
+        self.k_table = np.zeros((len(self.ids), self.grid.size))
+        for i, (fitting_id, table) in enumerate(zip(self.ids, tables)):
+            d, v = zip(*table)
+            row = self.leq_table if self.kinds[fitting_id] == "leq" else self.k_table
+            row[i] = np.interp(self.grid, d, v)
+        # Fittings whose table is one straight line in diameter (constants
+        # such as the flex bends and the transitions) are a + b·D with D
+        # clamped to their own range, without the grid lookup
+        self.linear = {}
+        for fitting_id, table in zip(self.ids, tables):
+            d, v = (np.array(column) for column in zip(*table))
+            b = (v[-1] - v[0]) / (d[-1] - d[0]) if d.size > 1 else 0.0
+            a = v[0] - b * d[0]
+            if np.allclose(a + b * d, v, rtol=1e-12, atol=1e-12):
+                self.linear[fitting_id] = (self.kinds[fitting_id], float(a), float(b), float(d[0]), float(d[-1]))
+        # Flex bends that are straight Leq lines over one shared range (the
+        # built-in constants) are resolved by flex_bend_leq as one a + b·D
+        flex = [self.linear.get(f) for f in FLEX_BEND_IDS]
+        self._flex_lines = self._flex_range = None
+        if all(line and line[0] == "leq" for line in flex) and len({line[3:] for line in flex}) == 1:
+            self._flex_lines = {f: line[1:3] for f, line in zip(FLEX_BEND_IDS, flex)}
+            self._flex_range = flex[0][3:]
+        self._grid_list = self.grid.tolist()
+        self._leq_lists = self.leq_table.tolist()
+        self._k_lists = self.k_table.tolist()
+        self.fingerprint = hashlib.sha1(json.dumps(
+            [self.ids, [self.kinds[i] for i in self.ids], self._grid_list, self._leq_lists, self._k_lists],
+        ).encode()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, fitting_id) -> bool:
+        return fitting_id in self.index
+
+    def check(self, fitting_ids):
+        unknown = [f for f in fitting_ids if f not in self.index]
+        if unknown:
+            raise ValueError(f"Unknown fitting(s): {', '.join(map(str, unknown))}.")
+
+    def by_category(self) -> dict:
+        groups = {}
+        for fitting_id in self.ids:
+            groups.setdefault(self.categories[fitting_id], []).append(fitting_id)
+        return groups
+
+    def value(self, fitting_id: str, duct_diameter_in: float):
+        """(kind, value) of one fitting at a diameter."""
+        i = self.index[fitting_id]
+        kind = self.kinds[fitting_id]
+        table = self._leq_lists[i] if kind == "leq" else self._k_lists[i]
+        return kind, _interp_scalar(self._grid_list, table, duct_diameter_in)
+
+    def resolve(self, counts: dict, duct_diameter_in: float):
+        """Total (Leq ft, K) of fitting counts in one duct."""
+        if self._flex_lines is not None:
+            # Flex bends only, as in flex_bend_leq
+            leq = slope = 0.0
+            for fitting_id, count in counts.items():
+                line = self._flex_lines.get(fitting_id)
+                if line is None:
+                    break
+                leq += count * line[0]
+                slope += count * line[1]
+            else:
+                if not slope:
+                    return leq, 0.0
+                lo, hi = self._flex_range
+                d = duct_diameter_in
+                return leq + slope * (lo if d < lo else hi if d > hi else d), 0.0
+        leq = k = 0.0
+        for fitting_id, count in counts.items():
+            if not count:
+                continue
+            line = self.linear.get(fitting_id)
+            if line is not None:
+                kind, a, b, lo, hi = line
+                value = a + b * min(max(duct_diameter_in, lo), hi) if b else a
+                if kind == "leq":
+                    leq += count * value
+                else:
+                    k += count * value
+                continue
+            i = self.index.get(fitting_id)
+            if i is None:
+                self.check([fitting_id])
+            if self.kinds[fitting_id] == "leq":
+                leq += count * _interp_scalar(self._grid_list, self._leq_lists[i], duct_diameter_in)
+            else:
+                k += count * _interp_scalar(self._grid_list, self._k_lists[i], duct_diameter_in)
+        return leq, k
+
+    def resolve_batch(self, counts: dict, duct_diameter_in: np.ndarray):
+        """
+        Vectorized resolve: counts maps fitting id to a count column (or
+        scalar) for the rows in duct_diameter_in. Linear fittings are
+        summed into one count-weighted a + b·D per clamp range; for the
+        others every row is
+        located on the diameter grid once and their Leq and K rows are
+        interpolated together and contracted with the count matrix.
+        """
+        d = np.asarray(duct_diameter_in, dtype=np.float64)
+        n = d.shape[0]
+        used = [f for f, c in counts.items() if np.ndim(c) > 0 or c]
+        self.check(used)
+        totals = {"leq": np.zeros(n), "k": np.zeros(n)}
+        varying = []
+        slopes = {}
+        for fitting_id in used:
+            line = self.linear.get(fitting_id)
+            if line is None:
+                varying.append(fitting_id)
+                continue
+            kind, a, b, lo, hi = line
+            if a:
+                totals[kind] += np.multiply(counts[fitting_id], a)
+            if b:
+                slope = np.multiply(counts[fitting_id], b)
+                key = (kind, lo, hi)
+                slopes[key] = slopes[key] + slope if key in slopes else slope
+        for (kind, lo, hi), slope in slopes.items():
+            # fmax/fmin map a NaN diameter to lo, like the grid lookup below
+            totals[kind] += slope * np.fmin(np.fmax(d, lo), hi)
+        if not varying:
+            return totals["leq"], totals["k"]
+
+        rows = [self.index[f] for f in varying]
+        count_matrix = np.empty((n, len(varying)))
+        for j, fitting_id in enumerate(varying):
+            count_matrix[:, j] = counts[fitting_id]
+        grid = self.grid
+        with np.errstate(invalid="ignore"):
+            x = np.clip(np.nan_to_num(d, nan=grid[0]), grid[0], grid[-1])
+        lo = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, grid.size - 2)
+        hi = lo + 1
+        w = (x - grid[lo]) / (grid[hi] - grid[lo])
+        for kind, table in (("leq", self.leq_table), ("k", self.k_table)):
+            sub = table[rows]
+            if not sub.any():
+                continue
+            values = sub[:, lo].T * (1.0 - w)[:, None] + sub[:, hi].T * w[:, None]
+            totals[kind] += np.einsum("ij,ij->i", count_matrix, values)
+        return totals["leq"], totals["k"]
+
+    def flex_bend_leq(self, counts: dict, duct_diameter_in: np.ndarray) -> np.ndarray:
+        """
+        Total Leq (ft) of counts holding flex bends only: the Leq column of
+        resolve_batch, bit for bit, without the K column or grid lookup.
+        """
+        if self._flex_lines is None:
+            return self.resolve_batch(counts, duct_diameter_in)[0]
+        leq = np.zeros(np.shape(duct_diameter_in))
+        slope = 0.0
+        for fitting_id, count in counts.items():
+            a, b = self._flex_lines[fitting_id]
+            if a:
+                leq += np.multiply(count, a)
+            if b:
+                slope = slope + np.multiply(count, b)
+        if np.ndim(slope) or slope:
+            lo, hi = self._flex_range
+            leq += slope * np.fmin(np.fmax(duct_diameter_in, lo), hi)
+        return leq
+
+    def to_rows(self):
+        """Catalog as CATALOG_FIELDS rows, one per fitting and grid diameter."""
+        for i, fitting_id in enumerate(self.ids):
+            table = self.leq_table if self.kinds[fitting_id] == "leq" else self.k_table
+            for d, v in zip(self._grid_list, table[i].tolist()):
+                yield (fitting_id, self.categories[fitting_id], self.labels[fitting_id],
+                       self.kinds[fitting_id], d, v)
+
+
+def load_catalog(path: str) -> FittingsCatalog:
+    """
+    Read a catalog CSV with the columns in CATALOG_FIELDS, one row per
+    fitting and tabulated diameter.
+    """
+    fittings = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in CATALOG_FIELDS if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Fittings catalog is missing column(s): {', '.join(missing)}.")
+        for row in reader:
+            try:
+                diameter, value = float(row["diameter_in"]), float(row["value"])
+            except ValueError:
+                raise ValueError(f"Line {reader.line_num}: diameter_in and value must be numbers.")
+            entry = fittings.setdefault(row["id"], (row["id"], row["category"], row["label"], row["kind"], {}))
+            entry[4][diameter] = value
+    return FittingsCatalog(fittings.values())
+
+
+_default_catalog = None
+
+
+def default_catalog() -> FittingsCatalog:
+    """The catalog used by the calculations, built on first use."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = FittingsCatalog()
+    return _default_catalog
+
+
+def parse_fittings(text, catalog: FittingsCatalog = None) -> dict:
+    """
+    Parse fitting counts written as "id:count; id:count" (or a mapping of
+    id to count, e.g. from JSON). A bare id counts once.
+    """
+    catalog = catalog or default_catalog()
+    if text is None or text == "":
+        return {}
+    if isinstance(text, dict):
+        items = text.items()
+    else:
+        items = []
+        for part in str(text).replace(",", ";").split(";"):
+            part = part.strip()
+            if part:
+                fitting_id, _, count = part.partition(":")
+                items.append((fitting_id.strip(), count.strip() or "1"))
+    counts = {}
+    for fitting_id, count in items:
+        fitting_id = str(fitting_id)
+        catalog.check([fitting_id])
+        try:
+            if isinstance(count, float) and not count.is_integer():
+                raise ValueError
+            count = int(count)
+        except (TypeError, ValueError):
+            raise ValueError(f"Count for fitting '{fitting_id}' must be a whole number.")
+        if count < 0:
+            raise ValueError(f"Count for fitting '{fitting_id}' must be non-negative.")
+        counts[fitting_id] = counts.get(fitting_id, 0) + count
+    return counts
+
+
+def format_fittings(counts: dict) -> str:
+    return "; ".join(f"{fitting_id}:{count}" for fitting_id, count in counts.items() if count)
@@ -0,0 +1,104 @@
+# core/friction.py
+# Darcy friction-factor solvers. The vectorized counterparts live in
+# core/batch.py (friction_factor_batch) so this module stays NumPy-free.
+#
+# Relative roughness is roughness_value / duct_diameter_in, as in the
+# original Swamee–Jain expression of calculate_flexible_duct. Every solver
+# reports how many iterations it took and whether it produced a usable
+# value; rows outside the solver's domain get f = 0.0 with converged False
+# instead of being silently zeroed.
+import math
+from collections import namedtuple
+
+FrictionResult = namedtuple("FrictionResult", "f_factor iterations converged message")
+
+FRICTION_SOLVERS = {
+    "swamee_jain": "Swamee–Jain (explicit)",
+    "haaland": "Haaland (explicit)",
+    "churchill": "Churchill (explicit, all regimes)",
+    "colebrook": "Colebrook–White (iterative)",
+}
+DEFAULT_FRICTION_SOLVER = "swamee_jain"
+DEFAULT_TOLERANCE = 1e-10
+DEFAULT_MAX_ITERATIONS = 50
+
+_LN10 = math.log(10.0)
+
+
+def check_solver(solver: str):
+    if solver not in FRICTION_SOLVERS:
+        raise ValueError(f"Unknown friction solver '{solver}'. Choose from: {', '.join(FRICTION_SOLVERS)}.")
+
+
+# -----------------------------
+# Scalar solvers
+# -----------------------------
+def _swamee_jain(re_number, roughness_value, duct_diameter_in):
+    return 0.25 / math.log10(roughness_value / (3.7 * duct_diameter_in) + 5.74 / re_number ** 0.9) ** 2
+
+
+def _haaland(re_number, roughness_value, duct_diameter_in):
+    rel_roughness = roughness_value / duct_diameter_in
+    return (-1.8 * math.log10((rel_roughness / 3.7) ** 1.11 + 6.9 / re_number)) ** -2
+
+
+def _churchill(re_number, roughness_value, duct_diameter_in):
+    rel_roughness = roughness_value / duct_diameter_in
+    a = (2.457 * math.log(1.0 / ((7.0 / re_number) ** 0.9 + 0.27 * rel_roughness))) ** 16
+    b = (37530.0 / re_number) ** 16
+    return 8.0 * ((8.0 / re_number) ** 12 + (a + b) ** -1.5) ** (1.0 / 12.0)
+
+
+def _colebrook(re_number, rel_roughness, f_start, tolerance, max_iterations):
+    # Newton on x = 1/sqrt(f): g(x) = x + 2 log10(e/3.7 + 2.51 x / Re) = 0
+    a = rel_roughness / 3.7
+    b = 2.51 / re_number
+    x = 1.0 / math.sqrt(f_start)
+    for iteration in range(1, max_iterations + 1):
+        inner = a + b * x
+        if not inner > 0:
+            return math.nan, iteration, False
+        step = (x + 2.0 * math.log10(inner)) / (1.0 + 2.0 * b / (_LN10 * inner))
+        x -= step
+        if abs(step) <= tolerance * abs(x):
+            return 1.0 / (x * x), iteration, True
+    return 1.0 / (x * x), max_iterations, False
+
+
+_EXPLICIT = {"swamee_jain": _swamee_jain, "haaland": _haaland, "churchill": _churchill}
+
+
+def friction_factor(
+    re_number: float,
+    roughness_value: float,
+    duct_diameter_in: float,
+    solver: str = DEFAULT_FRICTION_SOLVER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+) -> FrictionResult:
+    check_solver(solver)
+    if not duct_diameter_in > 0:
+        return FrictionResult(0.0, 0, False, "Diameter must be positive")
+    if not (re_number > 0 and math.isfinite(re_number)):
+        return FrictionResult(0.0, 0, False, "Reynolds number must be positive and finite")
+    rel_roughness = roughness_value / duct_diameter_in
+    try:
+        if solver == "colebrook":
+            f_start = _swamee_jain(re_number, roughness_value, duct_diameter_in)
+            if not (f_start > 0 and math.isfinite(f_start)):
+                return FrictionResult(0.0, 0, False, "No valid starting value for Colebrook")
+            f_factor, iterations, converged = _colebrook(
+                re_number, rel_roughness, f_start, tolerance, max_iterations
+            )
+            if not converged:
+                if not (f_factor > 0 and math.isfinite(f_factor)):
+                    return FrictionResult(0.0, iterations, False, "Colebrook diverged")
+                return FrictionResult(f_factor, iterations, False,
+                                      f"Colebrook did not converge in {max_iterations} iterations")
+        else:
+            f_factor, iterations = _EXPLICIT[solver](re_number, roughness_value, duct_diameter_in), 0
+    except (ValueError, ZeroDivisionError, OverflowError) as e:
+        return FrictionResult(0.0, 0, False, f"{FRICTION_SOLVERS[solver]} failed: {e}")
+    if not (f_factor > 0 and math.isfinite(f_factor)):
+        return FrictionResult(0.0, iterations, False, f"{FRICTION_SOLVERS[solver]} gave no valid value")
+    return FrictionResult(f_factor, iterations, True, "")
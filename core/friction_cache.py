@@ -0,0 +1,288 @@
+# core/friction_cache.py
+# Optional friction-factor lookup tables for repeated (roughness, diameter)
+# pairs. Only the Reynolds number varies between runs of the same duct, so
+# f(Re) is tabulated once per (solver, roughness, diameter) over log-spaced
+# Re and interpolated afterwards; values outside the table fall back to the
+# exact solver.
+#
+# A table costs a few milliseconds of Colebrook iterations (a couple of
+# thousand nodes plus refinement), while interpolation saves only a fraction
+# of a microsecond per batch row, so a table is only built for a pair that
+# has already spent about that much in the exact solver (see
+# min_rows_to_build; a scalar lookup counts as _SCALAR_ROW_WEIGHT rows).
+# Until then, and for one-off pairs such as continuous or rectangular
+# equivalent diameters, rows go straight to the exact solver. The explicit
+# solvers are cheaper to evaluate than to interpolate and are never
+# tabulated.
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from core.batch import friction_factor_batch
+from core.friction import (
+    DEFAULT_FRICTION_SOLVER, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, FrictionResult, check_solver,
+    friction_factor,
+)
+
+DEFAULT_RE_RANGE = (1e3, 1e7)
+DEFAULT_MAX_TABLES = 64
+DEFAULT_MAX_REL_ERROR = 1e-6
+DEFAULT_MIN_ROWS_TO_BUILD = 16384
+TABULATED_SOLVERS = ("colebrook",)
+# A scalar exact solve costs about as much as this many batch rows
+_SCALAR_ROW_WEIGHT = 16
+# A table lookup costs more than interpolation saves on fewer rows than
+# this, so smaller groups of one batch are solved exactly
+_MIN_PAIR_ROWS = 32
+# Pairs whose rows are counted towards min_rows_to_build, per table kept
+_PENDING_PER_TABLE = 16
+_INITIAL_POINTS_PER_DECADE = 32
+_MAX_POINTS_PER_DECADE = 4096
+_FACTORIZE_SAMPLE = 4096
+
+
+class _Table:
+    __slots__ = ("log_re", "f_factor", "nodes", "max_rel_error")
+
+    def __init__(self, log_re, f_factor, max_rel_error):
+        self.log_re = log_re
+        self.f_factor = f_factor
+        self.nodes = f_factor.tolist()  # for the scalar path, avoids NumPy per call
+        self.max_rel_error = max_rel_error
+
+
+class FrictionFactorCache:
+    """
+    LRU cache of f(Re) tables keyed by (solver, roughness, diameter,
+    tolerance, max_iterations).
+
+    A table is built once min_rows_to_build rows of its pair have been
+    solved exactly (0 builds on first sight). Each table is refined
+    (doubling the points per decade) until linear interpolation in
+    log10(Re) stays within max_rel_error of the exact solver at every
+    interval midpoint, where the interpolation error of a smooth curve
+    peaks. At most max_tables tables are kept; the least recently used one
+    is evicted. Only rows interpolated from an existing table are hits;
+    exact rows, including those of a pair whose table is built by the same
+    call, are misses.
+    """
+
+    def __init__(self, re_range=DEFAULT_RE_RANGE, max_tables: int = DEFAULT_MAX_TABLES,
+                 max_rel_error: float = DEFAULT_MAX_REL_ERROR,
+                 min_rows_to_build: int = DEFAULT_MIN_ROWS_TO_BUILD):
+        if max_tables < 1:
+            raise ValueError("max_tables must be at least 1.")
+        if min_rows_to_build < 0:
+            raise ValueError("min_rows_to_build must be non-negative.")
+        self.re_min, self.re_max = float(re_range[0]), float(re_range[1])
+        if not 0 < self.re_min < self.re_max:
+            raise ValueError("re_range must be two increasing positive values.")
+        self.max_tables = max_tables
+        self.max_rel_error = max_rel_error
+        self.min_rows_to_build = min_rows_to_build
+        self._tables = OrderedDict()
+        # key -> rows solved exactly so far, for pairs without a table
+        self._pending = OrderedDict()
+        self.clear_stats()
+
+    # -----------------------------
+    # Statistics
+    # -----------------------------
+    def clear_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tables": len(self._tables),
+            "builds": self.builds,
+            "evictions": self.evictions,
+            "max_rel_error": max((t.max_rel_error for t in self._tables.values() if t), default=0.0),
+        }
+
+    def clear(self):
+        self._tables.clear()
+        self._pending.clear()
+
+    # -----------------------------
+    # Tables
+    # -----------------------------
+    def _build(self, solver: str, roughness_value: float, duct_diameter_in: float,
+               tolerance: float, max_iterations: int):
+        lo, hi = np.log10(self.re_min), np.log10(self.re_max)
+        decades = hi - lo
+        points = _INITIAL_POINTS_PER_DECADE
+        while True:
+            log_re = np.linspace(lo, hi, int(np.ceil(decades * points)) + 1)
+            f_nodes, _, ok = friction_factor_batch(10.0 ** log_re, roughness_value, duct_diameter_in, solver,
+                                                   tolerance, max_iterations)
+            if not ok.all():
+                # The solver is not valid over the whole range: never tabulate
+                return None
+            mid = 0.5 * (log_re[1:] + log_re[:-1])
+            f_mid, _, _ = friction_factor_batch(10.0 ** mid, roughness_value, duct_diameter_in, solver,
+                                                tolerance, max_iterations)
+            error = np.max(np.abs(0.5 * (f_nodes[1:] + f_nodes[:-1]) - f_mid) / f_mid)
+            if error <= self.max_rel_error or points >= _MAX_POINTS_PER_DECADE:
+                return _Table(log_re, f_nodes, float(error))
+            points *= 2
+
+    def _table(self, key: tuple, rows: int):
+        """
+        (table, existed) for key = (solver, roughness, diameter, tolerance,
+        max_iterations), where rows is the number of rows about to be
+        solved for it. The table is None while the pair has not earned one
+        (or the solver is not valid over the Re range); it is built here
+        once the pair's exact rows reach min_rows_to_build.
+        """
+        try:
+            table = self._tables[key]
+            self._tables.move_to_end(key)
+            return table, True
+        except KeyError:
+            pass
+        if key[0] not in TABULATED_SOLVERS:
+            return None, False
+        seen = self._pending.pop(key, 0) + rows
+        if seen < self.min_rows_to_build:
+            self._pending[key] = seen
+            if len(self._pending) > _PENDING_PER_TABLE * self.max_tables:
+                self._pending.popitem(last=False)
+            return None, False
+        table = self._build(*key)
+        self.builds += 1
+        self._tables[key] = table
+        if len(self._tables) > self.max_tables:
+            self._tables.popitem(last=False)
+            self.evictions += 1
+        return table, False
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def friction_factor(self, re_number: float, roughness_value: float, duct_diameter_in: float,
+                        solver: str = DEFAULT_FRICTION_SOLVER, tolerance: float = DEFAULT_TOLERANCE,
+                        max_iterations: int = DEFAULT_MAX_ITERATIONS) -> FrictionResult:
+        """Scalar lookup with the same result type as core.friction.friction_factor."""
+        check_solver(solver)
+        if self.re_min <= re_number <= self.re_max and duct_diameter_in > 0:
+            key = (solver, float(roughness_value), float(duct_diameter_in), tolerance, max_iterations)
+            table, existed = self._table(key, _SCALAR_ROW_WEIGHT)
+            if table is not None and existed:
+                intervals = len(table.nodes) - 1
+                lo, hi = math.log10(self.re_min), math.log10(self.re_max)
+                pos = (math.log10(re_number) - lo) * intervals / (hi - lo)
+                i = min(int(pos), intervals - 1)
+                f0, f1 = table.nodes[i], table.nodes[i + 1]
+                self.hits += 1
+                return FrictionResult(f0 + (f1 - f0) * (pos - i), 0, True, "")
+        self.misses += 1
+        return friction_factor(re_number, roughness_value, duct_diameter_in, solver, tolerance, max_iterations)
+
+    def friction_factor_batch(self, re_number, roughness_value, duct_diameter_in,
+                              solver: str = DEFAULT_FRICTION_SOLVER, tolerance: float = DEFAULT_TOLERANCE,
+                              max_iterations: int = DEFAULT_MAX_ITERATIONS):
+        """
+        Drop-in replacement for core.batch.friction_factor_batch. Rows
+        inside the tabulated Re range whose (roughness, diameter) pair
+        already had a valid table are interpolated (hits, iterations 0);
+        the rest use the exact solver (misses) and count towards building
+        their pair's table.
+        """
+        check_solver(solver)
+        re_number = np.asarray(re_number, dtype=np.float64)
+        n = re_number.shape[0]
+        roughness = np.broadcast_to(np.asarray(roughness_value, dtype=np.float64), (n,))
+        diameter = np.broadcast_to(np.asarray(duct_diameter_in, dtype=np.float64), (n,))
+        f_factor = np.zeros(n)
+        iterations = np.zeros(n, dtype=np.int32)
+        converged = np.zeros(n, dtype=bool)
+
+        in_range = (re_number >= self.re_min) & (re_number <= self.re_max) & (diameter > 0)
+        if solver not in TABULATED_SOLVERS or in_range.sum() < _MIN_PAIR_ROWS:
+            in_range[:] = False
+        exact = ~in_range
+        if in_range.any():
+            # Index arrays only when some rows must be skipped
+            rows = slice(None) if in_range.all() else np.flatnonzero(in_range)
+            r_codes, r_values = _factorize(roughness[rows])
+            d_codes, d_values = _factorize(diameter[rows])
+            pair_codes = r_codes * len(d_values) + d_codes
+            # Gather the tables of every pair present into one flat array so
+            # all rows interpolate in a single vectorized pass
+            offsets, steps, flat = [], [], []
+            table_of_pair = np.full(len(r_values) * len(d_values), -1)
+            size = 0
+            counts = np.bincount(pair_codes)
+            for code in np.flatnonzero(counts >= _MIN_PAIR_ROWS).tolist():
+                rough, d = r_values[code // len(d_values)], d_values[code % len(d_values)]
+                table, existed = self._table((solver, rough, d, tolerance, max_iterations), int(counts[code]))
+                if table is None or not existed:
+                    # No table yet, or built just now from these rows: the
+                    # rows that paid for it are solved exactly
+                    continue
+                table_of_pair[code] = len(offsets)
+                offsets.append(size)
+                steps.append(table.log_re.size - 1)
+                flat.append(table.f_factor)
+                size += table.f_factor.size
+            which = table_of_pair[pair_codes]
+            tabulated = which >= 0
+            if not tabulated.all():
+                rows = np.arange(n)[rows]
+                exact[rows[~tabulated]] = True
+                rows, which = rows[tabulated], which[tabulated]
+            if flat and which.size:
+                flat = np.concatenate(flat)
+                intervals = np.asarray(steps)[which]
+                lo, hi = np.log10(self.re_min), np.log10(self.re_max)
+                pos = (np.log10(re_number[rows]) - lo) * (intervals / (hi - lo))
+                i = np.minimum(pos.astype(np.intp), intervals - 1)
+                t = pos - i
+                i += np.asarray(offsets)[which]
+                f_factor[rows] = flat[i] + (flat[i + 1] - flat[i]) * t
+                converged[rows] = True
+                self.hits += which.size
+
+        if exact.any():
+            rows = np.flatnonzero(exact)
+            f, it, ok = friction_factor_batch(re_number[rows], roughness[rows], diameter[rows], solver,
+                                              tolerance, max_iterations)
+            f_factor[rows], iterations[rows], converged[rows] = f, it, ok
+            self.misses += rows.size
+        return f_factor, iterations, converged
+
+
+def _factorize(values: np.ndarray):
+    """
+    (codes, uniques) for a 1-D array with few distinct values. Candidates
+    come from a small sample and every value is matched by binary search,
+    which is much cheaper than sorting the whole column; np.unique is only
+    used when the sample missed some values.
+    """
+    step = max(1, values.size // _FACTORIZE_SAMPLE)
+    uniques = np.unique(values[::step])
+    codes = np.searchsorted(uniques, values)
+    np.minimum(codes, uniques.size - 1, out=codes)
+    if not np.array_equal(uniques[codes], values):
+        uniques, codes = np.unique(values, return_inverse=True)
+        codes = codes.ravel()
+    return codes, uniques.tolist()
+
+
+_default_cache = None
+
+
+def default_cache() -> FrictionFactorCache:
+    """Process-wide cache, created on first use (one per worker process)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FrictionFactorCache()
+    return _default_cache
@@ -0,0 +1,171 @@
+# core/inputs.py
+# Input validation shared by the GUI (FlexibleDuctApp.gather_inputs) and the
+# headless batch tools, so every entry point accepts exactly the same values.
+#
+# core.air, core.fittings and core.shapes need NumPy, so they are imported
+# by the functions that use them: the GUI imports this module at startup
+# and only loads NumPy with the first page that needs it (ui/app_root.py).
+
+ROUGHNESS_MAP = {
+    "Low (0.003)": 0.003,
+    "Medium (0.009)": 0.009,
+    "High (0.015)": 0.015,
+}
+DEFAULT_ROUGHNESS = "Medium (0.009)"
+DEFAULT_SAFETY_FACTOR_PERCENT = 10.0
+NAN = float("nan")
+
+
+def parse_positive_float(value_str, field_name: str) -> float:
+    try:
+        value = float(value_str)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field_name} must be a number.")
+    if value < 0:
+        raise ValueError(f"{field_name} must be non-negative.")
+    return value
+
+
+def parse_float(value_str, field_name: str) -> float:
+    try:
+        return float(value_str)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field_name} must be a number.")
+
+
+def parse_count(value_str, field_name: str) -> int:
+    # int() would silently truncate a JSON number such as 3.7
+    if isinstance(value_str, float) and not value_str.is_integer():
+        raise ValueError(f"{field_name} must be a whole number.")
+    try:
+        return int(value_str)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field_name} must be a whole number.")
+
+
+def parse_roughness(choice, roughness_map: dict = ROUGHNESS_MAP) -> float:
+    """Accept a roughness label from roughness_map or a numeric value."""
+    if choice in roughness_map:
+        return roughness_map[choice]
+    return parse_positive_float(choice, "Roughness")
+
+
+def parse_inputs(raw: dict, roughness_map: dict = ROUGHNESS_MAP):
+    """
+    Validate raw field values (strings or numbers) and return (inputs, params).
+
+    inputs is the display dict shown in the full results window; params holds
+    the keyword arguments for calculate_flexible_duct. A safety factor of None
+    falls back to the default 10 %, as when the custom SF box is unchecked.
+    """
+    from core.air import CONDITION_LABELS
+    from core.fittings import FLEX_BEND_IDS, format_fittings
+
+    params = parse_params(raw, roughness_map)
+    sf_raw = raw.get("safety_factor_percent")
+    counts = params["bend_counts"]
+    return {
+        "Duct Diameter (in)": params["duct_diameter_in"],
+        "Air Flow (CFM)": params["air_flow_cfm"],
+        "Duct Length (ft)": params["duct_length_ft"],
+        "Bends": {angle: counts[angle] for angle in FLEX_BEND_IDS},
+        "Fittings": format_fittings({k: v for k, v in counts.items() if k not in FLEX_BEND_IDS}) or "None",
+        "Roughness": raw.get("roughness", DEFAULT_ROUGHNESS),
+        "Compression (%)": params["compression_percent"],
+        "Safety Factor (%)": DEFAULT_SAFETY_FACTOR_PERCENT if sf_raw is None else float(sf_raw),
+        **{label: params[name] for name, label in CONDITION_LABELS.items()},
+    }, params
+
+
+def parse_params(raw: dict, roughness_map: dict = ROUGHNESS_MAP) -> dict:
+    """Validate raw field values and return calculate_flexible_duct kwargs."""
+    duct_diameter_in = parse_positive_float(raw["duct_diameter_in"], "Duct Diameter (in)")
+    return {"duct_diameter_in": duct_diameter_in, **_parse_run(raw, roughness_map)}
+
+
+def _parse_run(raw: dict, roughness_map: dict) -> dict:
+    # Everything but the duct size, shared by every duct shape
+    from core.air import CONDITION_LABELS, STANDARD_CONDITIONS, check_conditions
+    from core.fittings import parse_fittings
+
+    air_flow_cfm = parse_positive_float(raw["air_flow_cfm"], "Air Flow (CFM)")
+    duct_length_ft = parse_positive_float(raw["duct_length_ft"], "Duct Length (ft)")
+    bend_45 = parse_count(raw.get("bend_45", 0), "45° Bends")
+    bend_90 = parse_count(raw.get("bend_90", 0), "90° Bends")
+    bend_180 = parse_count(raw.get("bend_180", 0), "180° Bends")
+    bend_counts = {"45": bend_45, "90": bend_90, "180": bend_180}
+    # Other catalog fittings, "id:count; id:count" (core/fittings.py)
+    for fitting_id, count in parse_fittings(raw.get("fittings")).items():
+        bend_counts[fitting_id] = bend_counts.get(fitting_id, 0) + count
+    roughness_choice = raw.get("roughness", DEFAULT_ROUGHNESS)
+    roughness_value = parse_roughness(roughness_choice, roughness_map)
+    try:
+        compression_percent = float(raw.get("compression_percent", 0.0))
+    except (TypeError, ValueError):
+        raise ValueError("Compression (%) must be a number.")
+    sf_raw = raw.get("safety_factor_percent")
+    if sf_raw is None:
+        sf_percent = DEFAULT_SAFETY_FACTOR_PERCENT
+    else:
+        sf_percent = parse_positive_float(sf_raw, "Safety Factor (%)")
+    safety_factor = 1.0 + (sf_percent / 100.0)
+    # Air conditions (core/air.py); blank means standard air
+    conditions = {
+        name: standard if raw.get(name) in (None, "") else parse_float(raw[name], CONDITION_LABELS[name])
+        for name, standard in STANDARD_CONDITIONS.items()
+    }
+    check_conditions(*conditions.values())
+    return {
+        "air_flow_cfm": air_flow_cfm,
+        "duct_length_ft": duct_length_ft,
+        "bend_counts": bend_counts,
+        "roughness_value": roughness_value,
+        "compression_percent": compression_percent,
+        "safety_factor": safety_factor,
+        **conditions,
+    }
+
+
+def parse_duct_params(raw: dict, roughness_map: dict = ROUGHNESS_MAP) -> dict:
+    """
+    parse_params for a duct of any shape (core/shapes.py): adds "shape",
+    "width_in" and "height_in". A blank shape is round; rectangular and
+    flat oval ducts take width and height instead of a diameter (which is
+    then NaN), pass the aspect-ratio checks and are not compressed.
+    """
+    from core.shapes import SHAPES, check_duct_shape
+
+    shape = raw.get("shape") or "round"
+    if shape not in SHAPES:
+        raise ValueError(f"Shape must be one of: {', '.join(SHAPES)}.")
+    if shape == "round":
+        return {**parse_params(raw, roughness_map), "shape": shape, "width_in": NAN, "height_in": NAN}
+    width_in = parse_positive_float(raw.get("width_in"), "Width (in)")
+    height_in = parse_positive_float(raw.get("height_in"), "Height (in)")
+    check_duct_shape(shape, width_in, height_in)
+    params = {"duct_diameter_in": NAN, **_parse_run(raw, roughness_map)}
+    if params["compression_percent"] != 0:
+        raise ValueError("Compression (%) applies to flexible duct only.")
+    return {**params, "shape": shape, "width_in": width_in, "height_in": height_in}
+
+
+def parse_duct_inputs(raw: dict, roughness_map: dict = ROUGHNESS_MAP):
+    """parse_inputs for the rectangular/flat oval page: (inputs, params)."""
+    from core.air import CONDITION_LABELS
+    from core.fittings import format_fittings
+    from core.shapes import SHAPES
+
+    params = parse_duct_params(raw, roughness_map)
+    sf_raw = raw.get("safety_factor_percent")
+    counts = params["bend_counts"]
+    return {
+        "Shape": SHAPES[params["shape"]],
+        "Width (in)": params["width_in"],
+        "Height (in)": params["height_in"],
+        "Air Flow (CFM)": params["air_flow_cfm"],
+        "Duct Length (ft)": params["duct_length_ft"],
+        "Fittings": format_fittings(counts) or "None",
+        "Roughness": raw.get("roughness", DEFAULT_ROUGHNESS),
+        "Safety Factor (%)": DEFAULT_SAFETY_FACTOR_PERCENT if sf_raw is None else float(sf_raw),
+        **{label: params[name] for name, label in CONDITION_LABELS.items()},
+    }, params
@@ -0,0 +1,109 @@
+# core/instrument.py
+# Opt-in per-stage timing for the calculation pipeline.
+#
+# Functions that support it take instrument=None. With None they do no
+# timing work beyond one `is not None` test per stage, so instrumentation
+# costs nothing unless it is switched on. Stages used by the pipeline:
+#   parse    - input validation (gather_inputs / schedule records)
+#   friction - friction-factor evaluation
+#   details  - pressure loss and the details dict / result columns
+#   format   - turning results into text (GUI fields, schedule output)
+import cProfile
+import io
+import json
+import pstats
+import time
+
+STAGES = ("parse", "friction", "details", "format")
+
+
+class Instrumentation:
+    """Accumulated wall time and call/row counts per stage, plus free counters."""
+
+    def __init__(self):
+        self.clock = time.perf_counter
+        self.reset()
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.profile_text = ""
+
+    def add(self, stage: str, seconds: float, rows: int = 1):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, rows, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += rows
+            entry[2] += seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def stage(self, name: str, rows: int = 1):
+        """Context manager timing one pass through a stage."""
+        return _Stage(self, name, rows)
+
+    # -----------------------------
+    # Profiling
+    # -----------------------------
+    def profile_call(self, func, *args, limit: int = 25, **kwargs):
+        """
+        Run func under cProfile and keep the top `limit` entries (by
+        cumulative time) in profile_text. Profiles only the calling thread.
+        """
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+            self.profile_text = out.getvalue()
+
+    # -----------------------------
+    # Reporting
+    # -----------------------------
+    def report(self) -> dict:
+        stages = {}
+        for name, (calls, rows, seconds) in self.stages.items():
+            stages[name] = {
+                "calls": calls,
+                "rows": rows,
+                "total_s": seconds,
+                "mean_ms": seconds / calls * 1e3,
+                "rows_per_s": rows / seconds if seconds > 0 else None,
+            }
+        report = {"stages": stages, "counters": dict(self.counters)}
+        if self.profile_text:
+            report["profile"] = self.profile_text
+        return report
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.report(), indent=indent, ensure_ascii=False)
+
+    def summary(self) -> str:
+        """One line for the status bar: mean time per call of each stage."""
+        order = [s for s in STAGES if s in self.stages] + [s for s in self.stages if s not in STAGES]
+        parts = []
+        for name in order:
+            calls, _, seconds = self.stages[name]
+            parts.append(f"{name} {seconds / calls * 1e3:.3f} ms")
+        return " · ".join(parts) if parts else "No timings recorded"
+
+
+class _Stage:
+    __slots__ = ("instrument", "name", "rows", "start")
+
+    def __init__(self, instrument, name, rows):
+        self.instrument = instrument
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = self.instrument.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrument.add(self.name, self.instrument.clock() - self.start, self.rows)
+        return False
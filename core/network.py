@@ -0,0 +1,247 @@
+# core/network.py
+# Trunk-and-branch duct systems built from flexible duct segments.
+#
+# Segments form a tree rooted at the fan. Each segment carries the flow of
+# its own terminal (if any) plus everything downstream, and its ΔP comes
+# from the batch kernel. Edits only mark the touched segment dirty; the
+# next query re-rates just the dirty segments (in one vectorized call) and
+# walks up their ancestors, so a single edit costs O(depth) rather than
+# O(segments).
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.friction import DEFAULT_FRICTION_SOLVER
+
+_GEOMETRY_FIELDS = (
+    "duct_diameter_in", "duct_length_ft", "bend_counts",
+    "roughness_value", "compression_percent", "safety_factor",
+)
+
+
+class DuctSegment:
+    __slots__ = (
+        "segment_id", "parent", "children", "depth",
+        "duct_diameter_in", "duct_length_ft", "bend_counts",
+        "roughness_value", "compression_percent", "safety_factor", "terminal_cfm",
+        "air_flow_cfm", "velocity_fpm", "pressure_loss", "downstream_loss", "critical_child",
+    )
+
+    def __init__(self, segment_id, parent, depth, duct_diameter_in, duct_length_ft, bend_counts,
+                 roughness_value, compression_percent, safety_factor, terminal_cfm):
+        self.segment_id = segment_id
+        self.parent = parent
+        self.children = []
+        self.depth = depth
+        self.duct_diameter_in = duct_diameter_in
+        self.duct_length_ft = duct_length_ft
+        self.bend_counts = dict(bend_counts or {})
+        self.roughness_value = roughness_value
+        self.compression_percent = compression_percent
+        self.safety_factor = safety_factor
+        self.terminal_cfm = terminal_cfm
+        self.air_flow_cfm = terminal_cfm
+        self.velocity_fpm = 0.0
+        self.pressure_loss = 0.0
+        # Worst ΔP from the inlet of this segment to any terminal below it
+        self.downstream_loss = 0.0
+        self.critical_child = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return not self.children
+
+
+class DuctNetwork:
+    """
+    Tree of duct segments with accumulated CFM, per-path ΔP and the
+    critical (worst) path the fan has to overcome.
+    """
+
+    def __init__(self, friction_solver: str = DEFAULT_FRICTION_SOLVER, result_cache=None):
+        if result_cache is not None and result_cache.friction_solver != friction_solver:
+            raise ValueError("The result cache was opened for a different friction solver.")
+        self.friction_solver = friction_solver
+        # core/result_cache.py: segments rated before (in this or an earlier
+        # session) are not rated again
+        self.result_cache = result_cache
+        self.segments = {}
+        self.root = None
+        self._flow_dirty = set()
+        self._loss_dirty = set()
+        self.last_recomputed = 0
+
+    # -----------------------------
+    # Editing
+    # -----------------------------
+    def add_segment(self, segment_id, parent_id, duct_diameter_in: float, duct_length_ft: float,
+                    bend_counts: dict = None, roughness_value: float = 0.009, compression_percent: float = 0.0,
+                    safety_factor: float = 1.1, terminal_cfm: float = 0.0) -> DuctSegment:
+        if segment_id in self.segments:
+            raise ValueError(f"Segment '{segment_id}' already exists.")
+        if parent_id is None:
+            if self.root is not None:
+                raise ValueError(f"Network already has a root segment ('{self.root.segment_id}').")
+            parent = None
+        else:
+            parent = self._get(parent_id)
+        segment = DuctSegment(
+            segment_id, parent, parent.depth + 1 if parent else 0,
+            duct_diameter_in, duct_length_ft, bend_counts,
+            roughness_value, compression_percent, safety_factor, terminal_cfm,
+        )
+        self.segments[segment_id] = segment
+        if parent is None:
+            self.root = segment
+        else:
+            parent.children.append(segment)
+            # The parent's flow (and so its ΔP) changes with the new branch
+            self._flow_dirty.add(parent)
+        self._flow_dirty.add(segment)
+        return segment
+
+    def update_segment(self, segment_id, **changes):
+        """Change geometry fields and/or terminal_cfm of one segment."""
+        segment = self._get(segment_id)
+        for name, value in changes.items():
+            if name == "terminal_cfm":
+                self._flow_dirty.add(segment)
+            elif name in _GEOMETRY_FIELDS:
+                self._loss_dirty.add(segment)
+            else:
+                raise ValueError(f"Unknown segment field '{name}'.")
+            setattr(segment, name, dict(value or {}) if name == "bend_counts" else value)
+
+    def remove_segment(self, segment_id):
+        """Remove a segment together with everything downstream of it."""
+        segment = self._get(segment_id)
+        stack = [segment]
+        while stack:
+            node = stack.pop()
+            del self.segments[node.segment_id]
+            self._flow_dirty.discard(node)
+            self._loss_dirty.discard(node)
+            stack.extend(node.children)
+        if segment.parent is None:
+            self.root = None
+        else:
+            segment.parent.children.remove(segment)
+            self._flow_dirty.add(segment.parent)
+
+    def _get(self, segment_id) -> DuctSegment:
+        try:
+            return self.segments[segment_id]
+        except KeyError:
+            raise ValueError(f"Unknown segment '{segment_id}'.")
+
+    # -----------------------------
+    # Incremental evaluation
+    # -----------------------------
+    @staticmethod
+    def _with_ancestors(segments):
+        seen = set()
+        for segment in segments:
+            while segment is not None and segment not in seen:
+                seen.add(segment)
+                segment = segment.parent
+        return seen
+
+    def evaluate(self) -> int:
+        """Re-rate dirty segments and their ancestors; returns segments re-rated."""
+        if not self._flow_dirty and not self._loss_dirty:
+            self.last_recomputed = 0
+            return 0
+        # Flow changes propagate up to the root: every ancestor carries it
+        flow_changed = sorted(self._with_ancestors(self._flow_dirty), key=lambda s: -s.depth)
+        for segment in flow_changed:
+            segment.air_flow_cfm = segment.terminal_cfm + sum(c.air_flow_cfm for c in segment.children)
+
+        rerate = list(set(flow_changed) | self._loss_dirty)
+        args = (
+            [s.duct_diameter_in for s in rerate],
+            [s.air_flow_cfm for s in rerate],
+            [s.duct_length_ft for s in rerate],
+            {fitting_id: [s.bend_counts.get(fitting_id, 0) for s in rerate]
+             for fitting_id in set().union(*(s.bend_counts for s in rerate))},
+            [s.roughness_value for s in rerate],
+            [s.compression_percent for s in rerate],
+            [s.safety_factor for s in rerate],
+        )
+        if self.result_cache is not None:
+            out = self.result_cache.calculate_batch(*args)
+        else:
+            out = calculate_flexible_duct_batch(*args, self.friction_solver)
+        for segment, velocity, loss in zip(rerate, out["velocity_fpm"].tolist(),
+                                           out["total_pressure_loss"].tolist()):
+            segment.velocity_fpm = velocity
+            segment.pressure_loss = loss
+
+        # Worst downstream path, bottom-up over the re-rated segments' ancestors
+        for segment in sorted(self._with_ancestors(rerate), key=lambda s: -s.depth):
+            worst = max(segment.children, key=lambda c: c.downstream_loss, default=None)
+            segment.critical_child = worst
+            segment.downstream_loss = segment.pressure_loss + (worst.downstream_loss if worst else 0.0)
+
+        self._flow_dirty.clear()
+        self._loss_dirty.clear()
+        self.last_recomputed = len(rerate)
+        return len(rerate)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def critical_path(self):
+        """(segment ids from the fan to the worst terminal, total ΔP in.w.g.)."""
+        self.evaluate()
+        path = []
+        segment = self.root
+        while segment is not None:
+            path.append(segment.segment_id)
+            segment = segment.critical_child
+        return path, (self.root.downstream_loss if self.root else 0.0)
+
+    def path_pressure_loss(self, terminal_id) -> float:
+        """Total ΔP from the fan to the outlet of the given segment."""
+        self.evaluate()
+        segment = self._get(terminal_id)
+        total = 0.0
+        while segment is not None:
+            total += segment.pressure_loss
+            segment = segment.parent
+        return total
+
+    def path_pressure_losses(self) -> dict:
+        """Total ΔP from the fan to every terminal, keyed by terminal id."""
+        self.evaluate()
+        losses = {}
+        if self.root is None:
+            return losses
+        stack = [(self.root, 0.0)]
+        while stack:
+            segment, upstream = stack.pop()
+            total = upstream + segment.pressure_loss
+            if segment.is_terminal:
+                losses[segment.segment_id] = total
+            stack.extend((child, total) for child in segment.children)
+        return losses
+
+    def segment_result(self, segment_id) -> dict:
+        self.evaluate()
+        segment = self._get(segment_id)
+        return {
+            "Air Flow (CFM)": segment.air_flow_cfm,
+            "Velocity (FPM)": segment.velocity_fpm,
+            "Total ΔP (in.w.g.)": segment.pressure_loss,
+            "Worst Downstream ΔP (in.w.g.)": segment.downstream_loss,
+        }
+
+    def results(self) -> dict:
+        """Columnar per-segment results in insertion order."""
+        self.evaluate()
+        segments = list(self.segments.values())
+        return {
+            "segment_id": [s.segment_id for s in segments],
+            "air_flow_cfm": np.array([s.air_flow_cfm for s in segments]),
+            "velocity_fpm": np.array([s.velocity_fpm for s in segments]),
+            "pressure_loss": np.array([s.pressure_loss for s in segments]),
+            "downstream_loss": np.array([s.downstream_loss for s in segments]),
+        }
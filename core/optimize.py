@@ -0,0 +1,247 @@
+# core/optimize.py
+# Diameter selection for a whole trunk-and-branch system (core/network.py):
+# the least duct material such that every fan-to-terminal path stays under
+# the available static pressure and every segment under a velocity limit.
+#
+# Each segment's ΔP and velocity at every candidate diameter are rated once,
+# in a single batch call, into a (segment, diameter) table; the search never
+# calls the kernel again. Diameters that break the velocity limit, or that
+# cost at least as much as another allowed size without lowering ΔP, are
+# pruned, which leaves each segment's options ordered by rising cost and
+# falling ΔP whatever the cost per foot.
+# The search itself is greedy-with-repair:
+#   1. every segment starts at its cheapest allowed size;
+#   2. while some path is over the limit, upsize the segment on the worst
+#      path with the best reduction of total path excess per unit of added
+#      material;
+#   3. repair: downsize segments, largest saving first, wherever the
+#      slack of every path through them absorbs the extra ΔP.
+# Segments are numbered depth first, so the terminals below a segment are
+# one contiguous run of the path ΔP array: a step updates a slice, memory
+# stays O(segments) and a 1,000-segment system solves in well under a
+# second.
+import math
+
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.calculations import STANDARD_FLEX_DIAMETERS_IN
+
+# Relative tolerance on the path limit, so a path exactly at the limit passes
+_LIMIT_TOLERANCE = 1e-9
+
+
+def segment_material(duct_diameter_in, duct_length_ft):
+    """Duct wall area (ft²): the default material measure."""
+    return math.pi * np.asarray(duct_diameter_in, dtype=np.float64) / 12.0 * duct_length_ft
+
+
+def rate_options(network, diameters=STANDARD_FLEX_DIAMETERS_IN) -> dict:
+    """
+    ΔP and velocity of every segment of network at every diameter, from
+    one batch kernel call. Returns (segments, diameters) arrays
+    "pressure_loss" and "velocity_fpm" plus the "segments" they belong to
+    and the sorted "diameters". Rows that cannot be rated get an infinite
+    ΔP.
+    """
+    network.evaluate()
+    segments = list(network.segments.values())
+    sizes = np.array(sorted(diameters), dtype=np.float64)
+    if sizes.size == 0:
+        raise ValueError("No candidate diameters given.")
+    k = sizes.size
+
+    def per_row(values):
+        return np.repeat(np.asarray(values, dtype=np.float64), k)
+
+    fitting_ids = set().union(*(s.bend_counts for s in segments)) if segments else set()
+    out = calculate_flexible_duct_batch(
+        np.tile(sizes, len(segments)),
+        per_row([s.air_flow_cfm for s in segments]),
+        per_row([s.duct_length_ft for s in segments]),
+        {f: per_row([s.bend_counts.get(f, 0) for s in segments]) for f in fitting_ids},
+        per_row([s.roughness_value for s in segments]),
+        per_row([s.compression_percent for s in segments]),
+        per_row([s.safety_factor for s in segments]),
+        network.friction_solver,
+    )
+    loss = out["total_pressure_loss"].reshape(len(segments), k)
+    return {
+        "segments": segments,
+        "diameters": sizes,
+        "pressure_loss": np.where(np.isfinite(loss) & (loss >= 0), loss, np.inf),
+        "velocity_fpm": out["velocity_fpm"].reshape(len(segments), k),
+    }
+
+
+def optimize_diameters(
+    network,
+    max_pressure_loss: float,
+    max_velocity_fpm: float = None,
+    diameters=STANDARD_FLEX_DIAMETERS_IN,
+    cost_per_ft: dict = None,
+    apply: bool = False,
+) -> dict:
+    """
+    Choose a standard diameter for every segment of network so that the
+    total material is as small as the greedy-with-repair search finds while
+    every fan-to-terminal ΔP is at most max_pressure_loss (in.w.g.) and,
+    if given, every velocity at most max_velocity_fpm.
+
+    Material is duct wall area (ft²) unless cost_per_ft maps each diameter
+    to a cost per foot of duct. Flows come from the network's terminals and
+    do not depend on the sizes chosen. With apply=True the chosen
+    diameters are written back to the network.
+
+    Returns a dict with "feasible", "diameters" (segment id -> in.),
+    "material", the "critical_path_loss" and "critical_terminal", the
+    "path_losses" per terminal, the number of "upsized" and "repaired"
+    steps, and "velocity_violations": ids of segments that exceed the
+    velocity limit at every size (they are left at the largest size). When
+    a segment has such a violation, or even the largest allowed sizes leave
+    a path over the limit, the result is the best found with feasible
+    False and nothing is applied.
+    """
+    if not max_pressure_loss > 0:
+        raise ValueError("max_pressure_loss must be positive.")
+    if network.root is None:
+        raise ValueError("The network has no segments.")
+    table = rate_options(network, diameters)
+    segments, sizes = table["segments"], table["diameters"]
+    loss = table["pressure_loss"]
+    n, k = loss.shape
+
+    lengths = np.array([s.duct_length_ft for s in segments], dtype=np.float64)
+    if cost_per_ft is None:
+        cost = segment_material(sizes[None, :], lengths[:, None])
+    else:
+        missing = [d for d in sizes.tolist() if d not in cost_per_ft]
+        if missing:
+            raise ValueError(f"cost_per_ft has no cost for diameter(s): {', '.join(f'{d:g}' for d in missing)}.")
+        cost = np.array([cost_per_ft[d] for d in sizes.tolist()], dtype=np.float64)[None, :] * lengths[:, None]
+
+    # Prune each segment's options: velocity-infeasible sizes, and sizes
+    # whose ΔP is no lower than that of an allowed size costing no more
+    allowed = np.isfinite(loss)
+    if max_velocity_fpm is not None:
+        allowed &= table["velocity_fpm"] <= max_velocity_fpm
+    velocity_violations = [s.segment_id for s, ok in zip(segments, allowed.any(axis=1)) if not ok]
+    for i in np.flatnonzero(~allowed.any(axis=1)):
+        allowed[i, -1] = True
+    options = []
+    for i in range(n):
+        keep, best = [], np.inf
+        candidates = np.flatnonzero(allowed[i])
+        for j in candidates[np.lexsort((loss[i, candidates], cost[i, candidates]))].tolist():
+            if loss[i, j] < best:
+                keep.append(j)
+                best = loss[i, j]
+        options.append(keep or [k - 1])
+
+    # Depth-first walk from the root: path ΔP of every terminal (in walk
+    # order) from its parent's running total, and for every segment the
+    # run terminals[below[i, 0]:below[i, 1]] of terminals downstream of it
+    index = {s: i for i, s in enumerate(segments)}
+    parent = np.array([index[s.parent] if s.parent is not None else -1 for s in segments], dtype=np.intp)
+    walk, terminal_rows, below = [], [], np.zeros((n, 2), dtype=np.intp)
+    stack = [(network.root, False)]
+    while stack:
+        segment, done = stack.pop()
+        i = index[segment]
+        if done:
+            below[i, 1] = len(terminal_rows)
+            continue
+        walk.append(i)
+        below[i, 0] = len(terminal_rows)
+        if segment.is_terminal:
+            terminal_rows.append(i)
+        stack.append((segment, True))
+        stack.extend((child, False) for child in reversed(segment.children))
+    walk = np.array(walk, dtype=np.intp)
+    terminal_rows = np.array(terminal_rows, dtype=np.intp)
+    terminals = [segments[i] for i in terminal_rows.tolist()]
+    limit = max_pressure_loss * (1 + _LIMIT_TOLERANCE)
+    rows = np.arange(n)
+
+    def path_to(i):
+        members = []
+        while i >= 0:
+            members.append(i)
+            i = parent[i]
+        return np.array(members, dtype=np.intp)
+
+    pos = np.zeros(n, dtype=np.intp)
+    chosen = np.array([opts[0] for opts in options])
+    last = np.array([len(opts) - 1 for opts in options])
+    total = loss[rows, chosen]
+    for i in walk[1:].tolist():
+        total[i] += total[parent[i]]
+    path_loss = total[terminal_rows]
+
+    # 1. Greedy: on the worst path, upsize the segment with the best
+    #    reduction of total excess (over all violating paths) per unit of
+    #    added material
+    upsized = 0
+    while True:
+        worst = int(np.argmax(path_loss))
+        if not path_loss[worst] > limit:
+            break
+        on_path = path_to(terminal_rows[worst])
+        movable = on_path[pos[on_path] < last[on_path]]
+        if not movable.size:
+            break
+        nxt = np.array([options[i][pos[i] + 1] for i in movable.tolist()])
+        delta = loss[movable, chosen[movable]] - loss[movable, nxt]
+        added = np.maximum(cost[movable, nxt] - cost[movable, chosen[movable]], 1e-12)
+        excess = np.where(path_loss > limit, path_loss - max_pressure_loss, 0.0)
+        benefit = np.array([np.minimum(excess[lo:hi], d).sum() for (lo, hi), d in zip(below[movable], delta)])
+        best = int(np.argmax(benefit / added))
+        i = int(movable[best])
+        lo, hi = below[i]
+        path_loss[lo:hi] -= delta[best]
+        pos[i] += 1
+        chosen[i] = nxt[best]
+        upsized += 1
+    paths_ok = not (path_loss > limit).any()
+    feasible = paths_ok and not velocity_violations
+
+    # 2. Repair: step segments back down while every path through them has room
+    repaired = 0
+    if paths_ok:
+        changed = True
+        while changed:
+            changed = False
+            saving = np.where(pos > 0, cost[rows, chosen] - cost[rows, [
+                options[i][max(pos[i] - 1, 0)] for i in range(n)]], 0.0)
+            for i in np.argsort(-saving, kind="stable").tolist():
+                if pos[i] == 0:
+                    continue
+                prev = options[i][pos[i] - 1]
+                extra = loss[i, prev] - loss[i, chosen[i]]
+                lo, hi = below[i]
+                if path_loss[lo:hi].max() + extra <= limit:
+                    path_loss[lo:hi] += extra
+                    pos[i] -= 1
+                    chosen[i] = prev
+                    repaired += 1
+                    changed = True
+
+    result_diameters = {s.segment_id: float(sizes[j]) for s, j in zip(segments, chosen.tolist())}
+    # Terminals are reported in network order, not walk order
+    report = np.argsort(terminal_rows, kind="stable")
+    worst = int(report[np.argmax(path_loss[report])])
+    if apply and feasible:
+        for segment_id, d in result_diameters.items():
+            if network.segments[segment_id].duct_diameter_in != d:
+                network.update_segment(segment_id, duct_diameter_in=d)
+    return {
+        "feasible": feasible,
+        "diameters": result_diameters,
+        "material": float(cost[rows, chosen].sum()),
+        "critical_path_loss": float(path_loss[worst]),
+        "critical_terminal": terminals[worst].segment_id,
+        "path_losses": {terminals[t].segment_id: float(path_loss[t]) for t in report.tolist()},
+        "upsized": upsized,
+        "repaired": repaired,
+        "velocity_violations": velocity_violations,
+    }
@@ -0,0 +1,229 @@
+# core/parallel.py
+# Multi-core runner around the batch kernel for very large schedules.
+#
+# Inputs are packed once into a shared-memory float64 block, every worker
+# rates a contiguous [start, stop) slice in place and writes its columns into
+# a second shared block, so nothing row-shaped is pickled between processes
+# and output order is simply the input order.
+#
+#   python -m core.parallel --rows 2000000 --workers 1 2 4 8
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from core.air import air_properties
+from core.batch import BATCH_COLUMNS, calculate_flexible_duct_batch
+from core.fittings import default_catalog
+from core.friction import DEFAULT_FRICTION_SOLVER
+
+# Rows per task: about CHUNKS_PER_WORKER tasks per worker (so one slow
+# worker does not hold up the rest), at least MIN_PARALLEL_CHUNK_SIZE (below
+# that the per-task attach and scheduling cost shows) and at most
+# MAX_PARALLEL_CHUNK_SIZE (which bounds a worker's kernel temporaries)
+CHUNKS_PER_WORKER = 4
+MIN_PARALLEL_CHUNK_SIZE = 50_000
+MAX_PARALLEL_CHUNK_SIZE = 250_000
+
+# Fittings are resolved to their total Leq and K, and air conditions to their
+# density and Reynolds coefficient, once in the parent, so the block has the
+# same rows however many fittings a schedule lists
+_INPUT_ROWS = (
+    "duct_diameter_in", "air_flow_cfm", "duct_length_ft",
+    "fitting_leq_ft", "fitting_k",
+    "roughness_value", "compression_percent", "safety_factor",
+    "air_density", "re_coefficient",
+)
+_OUTPUT_ROWS = tuple(BATCH_COLUMNS) + ("f_converged",)
+_OUTPUT_DTYPES = {"f_iterations": np.int32, "f_converged": bool}
+
+
+def _attach(name: str, rows: int, n: int):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray((rows, n), dtype=np.float64, buffer=shm.buf)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (its affinity mask where the OS has one)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def parallel_chunk_size(n: int, workers: int) -> int:
+    """Rows per task for n rows on workers processes (see CHUNKS_PER_WORKER)."""
+    per_task = -(-n // (workers * CHUNKS_PER_WORKER))
+    return min(max(per_task, MIN_PARALLEL_CHUNK_SIZE), MAX_PARALLEL_CHUNK_SIZE)
+
+
+def make_pool(workers: int = None) -> ProcessPoolExecutor:
+    """
+    Process pool for calculate_flexible_duct_parallel.
+
+    On POSIX the shared-memory resource tracker is started first so the
+    workers inherit it; a worker that started its own tracker would
+    "clean up" (and warn about) blocks the parent still owns.
+    """
+    if os.name == "posix":
+        resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+
+
+def _rate_block(block: np.ndarray, friction_solver: str) -> dict:
+    d, cfm, length, leq, k, rough, kc, sf, rho, re_coefficient = block
+    return calculate_flexible_duct_batch(
+        d, cfm, length, None, rough, kc, sf, friction_solver,
+        fitting_losses=(leq, k), air_properties=(rho, re_coefficient),
+    )
+
+
+def _rate_slice(in_name: str, out_name: str, n: int, start: int, stop: int, friction_solver: str) -> int:
+    in_shm, inputs = _attach(in_name, len(_INPUT_ROWS), n)
+    out_shm, outputs = _attach(out_name, len(_OUTPUT_ROWS), n)
+    try:
+        out = _rate_block(inputs[:, start:stop], friction_solver)
+        for i, name in enumerate(_OUTPUT_ROWS):
+            outputs[i, start:stop] = out[name]
+        del inputs, outputs, out
+    finally:
+        in_shm.close()
+        out_shm.close()
+    return stop - start
+
+
+def calculate_flexible_duct_parallel(
+    duct_diameter_in,
+    air_flow_cfm,
+    duct_length_ft,
+    bend_counts: dict,
+    roughness_value,
+    compression_percent,
+    safety_factor,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    workers: int = None,
+    chunk_size: int = None,
+    executor=None,
+    altitude_ft=0.0,
+    air_temperature_f=70.0,
+    relative_humidity_pct=0.0,
+) -> dict:
+    """
+    Same inputs and output as calculate_flexible_duct_batch, sharded across
+    a process pool in chunks of chunk_size rows (default
+    parallel_chunk_size(n, workers)).
+
+    workers defaults to os.cpu_count() and is capped at available_cpus():
+    more processes than CPUs only add overhead to a CPU-bound kernel. One
+    worker, or a schedule that fits in one chunk, runs in-process. A pool
+    from make_pool() may be passed as executor to avoid pool start-up cost
+    on repeated calls.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    workers = min(workers or os.cpu_count() or 1, available_cpus())
+    bend_counts = bend_counts or {}
+    conditions = {"altitude_ft": altitude_ft, "air_temperature_f": air_temperature_f,
+                  "relative_humidity_pct": relative_humidity_pct}
+    values = [
+        duct_diameter_in, air_flow_cfm, duct_length_ft, 0.0, 0.0,
+        roughness_value, compression_percent, safety_factor, 0.0, 0.0,
+    ]
+    n = max((np.size(v) for v in values + list(bend_counts.values()) + list(conditions.values())
+             if np.ndim(v) > 0), default=1)
+    if chunk_size is None:
+        chunk_size = parallel_chunk_size(n, workers)
+    if workers == 1 or n <= chunk_size:
+        return calculate_flexible_duct_batch(
+            duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+            roughness_value, compression_percent, safety_factor, friction_solver, **conditions,
+        )
+    values[3], values[4] = default_catalog().resolve_batch(
+        bend_counts, np.broadcast_to(np.asarray(duct_diameter_in, dtype=np.float64), (n,)),
+    )
+    values[8], values[9] = air_properties(**conditions)
+
+    in_shm = shared_memory.SharedMemory(create=True, size=len(_INPUT_ROWS) * n * 8)
+    out_shm = shared_memory.SharedMemory(create=True, size=len(_OUTPUT_ROWS) * n * 8)
+    try:
+        inputs = np.ndarray((len(_INPUT_ROWS), n), dtype=np.float64, buffer=in_shm.buf)
+        for i, value in enumerate(values):
+            value = np.asarray(value, dtype=np.float64)
+            if value.ndim and value.shape != (n,):
+                raise ValueError(f"Batch inputs must have equal lengths, got shape {value.shape} for {n} rows.")
+            inputs[i] = value
+        bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        own_pool = executor is None
+        pool = executor or make_pool(workers)
+        try:
+            futures = [pool.submit(_rate_slice, in_shm.name, out_shm.name, n, start, stop, friction_solver)
+                       for start, stop in bounds]
+            for future in futures:
+                future.result()
+        finally:
+            if own_pool:
+                pool.shutdown()
+        outputs = np.ndarray((len(_OUTPUT_ROWS), n), dtype=np.float64, buffer=out_shm.buf)
+        result = {name: outputs[i].astype(_OUTPUT_DTYPES.get(name, np.float64))
+                  for i, name in enumerate(_OUTPUT_ROWS)}
+        del inputs, outputs
+        return result
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+
+def scaling_report(n_rows: int = 1_000_000, worker_counts=(1, 2, 4), chunk_size: int = None, seed: int = 0,
+                   repeat: int = 3):
+    """
+    Time calculate_flexible_duct_parallel on a synthetic schedule for each
+    worker count (best of repeat runs). Returns a list of (workers, seconds,
+    rows_per_s, speedup) relative to the first entry. Pool start-up is
+    excluded from the timing; worker counts above available_cpus() run
+    with that many workers.
+    """
+    rng = np.random.default_rng(seed)
+    args = (
+        rng.choice([4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 14.0, 16.0], n_rows),
+        rng.uniform(50, 2000, n_rows),
+        rng.uniform(1, 100, n_rows),
+        {"45": rng.integers(0, 3, n_rows), "90": rng.integers(0, 4, n_rows), "180": rng.integers(0, 2, n_rows)},
+        rng.choice([0.003, 0.009, 0.015], n_rows),
+        rng.uniform(0, 30, n_rows),
+        np.full(n_rows, 1.1),
+    )
+    report = []
+    for workers in worker_counts:
+        with make_pool(min(workers, available_cpus())) as pool:
+            # Warm the pool so worker start-up and imports are not timed
+            list(pool.map(int, range(workers)))
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                calculate_flexible_duct_parallel(*args, workers=workers, chunk_size=chunk_size, executor=pool)
+                timings.append(time.perf_counter() - start)
+        elapsed = min(timings)
+        base = report[0][1] if report else elapsed
+        report.append((workers, elapsed, n_rows / elapsed, base / elapsed))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report batch throughput scaling versus worker count.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, help="rows per task (default: sized from rows and workers)")
+    args = parser.parse_args(argv)
+    print(f"{available_cpus()} CPU(s) available")
+    print(f"{'workers':>7}  {'seconds':>8}  {'rows/s':>12}  {'speedup':>7}")
+    for workers, elapsed, rate, speedup in scaling_report(args.rows, args.workers, args.chunk_size):
+        print(f"{workers:>7}  {elapsed:>8.3f}  {rate:>12,.0f}  {speedup:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+# core/project.py
+# Project files: many runs (inputs plus results) stored column by column.
+#
+# A project is a directory (conventionally named *.ductproj) holding a small
+# JSON header, project.json, and one raw little-endian file per column. The
+# header's row count is the commit point: appends write the new rows at the
+# end of every column file and then replace the header atomically, so an
+# interrupted save leaves the project as it was. Opening reads only the
+# header; columns are memory-mapped on first use, so a million-run project
+# opens instantly and only the pages of the rows actually viewed are read.
+import json
+import os
+import time
+
+import numpy as np
+
+from core.air import RHO_AIR, STANDARD_CONDITIONS
+from core.batch import BATCH_COLUMNS, calculate_flexible_duct_batch
+from core.fittings import FLEX_BEND_IDS
+from core.friction import DEFAULT_FRICTION_SOLVER, FRICTION_SOLVERS, check_solver
+from core.schedule import (
+    DEFAULT_CHUNK_SIZE, duct_shapes, fitting_counts, parse_chunk, read_chunks,
+)
+
+PROJECT_FORMAT = "flexible-duct-project"
+PROJECT_VERSION = 2
+PROJECT_SUFFIX = ".ductproj"
+HEADER_FILE = "project.json"
+
+# Column name -> dtype. Inputs mirror calculate_flexible_duct's arguments;
+# friction_solver is stored as an index into the header's "solvers" list.
+INPUT_COLUMNS = {
+    "duct_diameter_in": "<f8",
+    "air_flow_cfm": "<f8",
+    "duct_length_ft": "<f8",
+    "bend_45": "<i4",
+    "bend_90": "<i4",
+    "bend_180": "<i4",
+    "roughness_value": "<f8",
+    "compression_percent": "<f8",
+    "safety_factor": "<f8",
+    "altitude_ft": "<f8",
+    "air_temperature_f": "<f8",
+    "relative_humidity_pct": "<f8",
+    "friction_solver": "|u1",
+}
+RESULT_COLUMNS = {name: "<f8" for name in BATCH_COLUMNS}
+RESULT_COLUMNS["f_iterations"] = "<i4"
+RESULT_COLUMNS["f_converged"] = "|b1"
+PROJECT_COLUMNS = {**INPUT_COLUMNS, **RESULT_COLUMNS}
+# Counts of other catalog fittings (core/fittings.py) get a column each,
+# added when a run first lists that fitting
+FITTING_COLUMN_PREFIX = "fitting_"
+_FITTING_DTYPE = "<i4"
+# Columns added in version 2 (air conditions, core/air.py). Version 1 runs
+# were rated for standard air, so they read as these values; a project
+# opened for writing is upgraded by writing the columns out.
+_VERSION_1_DEFAULTS = {**STANDARD_CONDITIONS, "air_density": RHO_AIR}
+
+
+def fitting_column(fitting_id: str) -> str:
+    if fitting_id in FLEX_BEND_IDS:
+        return f"bend_{fitting_id}"
+    return FITTING_COLUMN_PREFIX + fitting_id
+
+
+def inputs_from_params(params: dict) -> dict:
+    """Project input columns from calculate_flexible_duct keyword arguments."""
+    inputs = {name: value for name, value in params.items() if name != "bend_counts"}
+    inputs.update((fitting_column(f), count) for f, count in params["bend_counts"].items())
+    return inputs
+
+
+def _fitting_counts(inputs: dict) -> dict:
+    counts = {}
+    for name, values in inputs.items():
+        if name.startswith("bend_"):
+            counts[name[len("bend_"):]] = values
+        elif name.startswith(FITTING_COLUMN_PREFIX):
+            counts[name[len(FITTING_COLUMN_PREFIX):]] = values
+    return counts
+
+
+def is_project(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+
+class DuctProject:
+    """
+    A project opened for reading and, unless read_only, appending/patching.
+
+    len(project) is the number of runs. column(name) returns a read-only
+    memory-mapped array, rows(index) copies only the requested rows.
+    append() adds runs at the end and update() patches rows in place;
+    neither rewrites existing data.
+    """
+
+    def __init__(self, path: str, header: dict, read_only: bool = False):
+        self.path = path
+        self.header = header
+        self.read_only = read_only
+        self._maps = {}
+
+    # -----------------------------
+    # Create / open
+    # -----------------------------
+    @classmethod
+    def create(cls, path: str, metadata: dict = None) -> "DuctProject":
+        if os.path.exists(path) and os.listdir(path):
+            raise ValueError(f"{path} already exists and is not empty.")
+        os.makedirs(path, exist_ok=True)
+        now = time.time()
+        header = {
+            "format": PROJECT_FORMAT,
+            "version": PROJECT_VERSION,
+            "rows": 0,
+            "columns": dict(PROJECT_COLUMNS),
+            "solvers": list(FRICTION_SOLVERS),
+            "metadata": dict(metadata or {}),
+            "created": now,
+            "modified": now,
+        }
+        for name in PROJECT_COLUMNS:
+            open(cls._column_path(path, name), "wb").close()
+        project = cls(path, header)
+        project._write_header()
+        return project
+
+    @classmethod
+    def open(cls, path: str, read_only: bool = False) -> "DuctProject":
+        try:
+            with open(os.path.join(path, HEADER_FILE), encoding="utf-8") as f:
+                header = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"{path} is not a project (no {HEADER_FILE}).")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Corrupt project header: {e.msg}")
+        if header.get("format") != PROJECT_FORMAT:
+            raise ValueError(f"{path} is not a flexible duct project.")
+        if header.get("version", 0) > PROJECT_VERSION:
+            raise ValueError(f"Project version {header['version']} is newer than this program supports.")
+        missing = [name for name in PROJECT_COLUMNS
+                   if name not in header.get("columns", {}) and name not in _VERSION_1_DEFAULTS]
+        if missing:
+            raise ValueError(f"Project is missing column(s): {', '.join(missing)}.")
+        project = cls(path, header, read_only)
+        if not read_only:
+            project._upgrade()
+        return project
+
+    def _upgrade(self):
+        added = [name for name in _VERSION_1_DEFAULTS if name not in self.header["columns"]]
+        if not added:
+            return
+        for name in added:
+            with open(self._column_path(self.path, name), "wb") as f:
+                f.write(np.full(len(self), _VERSION_1_DEFAULTS[name], dtype=PROJECT_COLUMNS[name]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self.header["columns"][name] = PROJECT_COLUMNS[name]
+        self.header["version"] = PROJECT_VERSION
+        self._write_header()
+
+    @classmethod
+    def open_or_create(cls, path: str, metadata: dict = None) -> "DuctProject":
+        return cls.open(path) if is_project(path) else cls.create(path, metadata)
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    @property
+    def solvers(self) -> list:
+        return self.header["solvers"]
+
+    @property
+    def metadata(self) -> dict:
+        return self.header["metadata"]
+
+    @property
+    def input_columns(self) -> list:
+        """INPUT_COLUMNS plus the project's extra fitting count columns."""
+        return list(INPUT_COLUMNS) + [name for name in self.header["columns"]
+                                      if name.startswith(FITTING_COLUMN_PREFIX)]
+
+    @staticmethod
+    def _column_path(path: str, name: str) -> str:
+        return os.path.join(path, f"{name}.bin")
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory-mapped view of a whole column."""
+        column = self._maps.get(name)
+        if column is None and name not in self.header["columns"] and name in _VERSION_1_DEFAULTS:
+            # Version 1 project opened read-only
+            column = np.full(len(self), _VERSION_1_DEFAULTS[name], dtype=PROJECT_COLUMNS[name])
+            column.flags.writeable = False
+            self._maps[name] = column
+        if column is None:
+            dtype = np.dtype(self.header["columns"][name])
+            if len(self) == 0:
+                column = np.empty(0, dtype=dtype)
+            else:
+                column = np.memmap(self._column_path(self.path, name), dtype=dtype, mode="r", shape=(len(self),))
+            self._maps[name] = column
+        return column
+
+    def rows(self, index, columns=None) -> dict:
+        """Copies of the given rows (slice or index array) for each column."""
+        return {name: np.array(self.column(name)[index]) for name in (columns or self.header["columns"])}
+
+    def solver_names(self, codes) -> list:
+        return [self.solvers[int(code)] for code in codes]
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError("Project was opened read-only.")
+
+    def _write_header(self):
+        self.header["modified"] = time.time()
+        tmp = os.path.join(self.path, HEADER_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.header, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, HEADER_FILE))
+
+    def _coerce(self, columns: dict, names):
+        lengths = {np.size(columns[name]) for name in names if np.ndim(columns[name]) > 0}
+        if len(lengths) > 1:
+            raise ValueError(f"Project columns must have equal lengths, got {sorted(lengths)}.")
+        n = lengths.pop() if lengths else 1
+        arrays = {}
+        for name in names:
+            value = columns[name]
+            if name == "friction_solver":
+                value = self._solver_codes(value)
+            arrays[name] = np.broadcast_to(
+                np.asarray(value).astype(self.header["columns"][name], copy=False), (n,)
+            )
+        return arrays, n
+
+    def _solver_codes(self, value):
+        names = [value] if isinstance(value, str) else value
+        if len(names) and isinstance(names[0], str):
+            for name in set(names):
+                check_solver(name)
+                if name not in self.solvers:
+                    self.solvers.append(name)
+            codes = {name: i for i, name in enumerate(self.solvers)}
+            return np.array([codes[name] for name in names])
+        return value
+
+    def append(self, columns: dict) -> range:
+        """
+        Add runs given as {column: array or scalar} covering every name in
+        PROJECT_COLUMNS (friction_solver may be solver names). Fitting count
+        columns may be added or left out (zero). Returns the range of the
+        new row numbers.
+        """
+        self._check_writable()
+        missing = [name for name in PROJECT_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Missing project column(s): {', '.join(missing)}.")
+        unknown = [name for name in columns
+                   if name not in self.header["columns"] and not name.startswith(FITTING_COLUMN_PREFIX)]
+        if unknown:
+            raise ValueError(f"Unknown project column(s): {', '.join(unknown)}.")
+        start = len(self)
+        self._maps.clear()
+        for name in columns:
+            if name not in self.header["columns"]:
+                self._add_fitting_column(name)
+        # Runs that do not list a fitting have none of it
+        columns = {**{name: 0 for name in self.header["columns"]}, **columns}
+        arrays, n = self._coerce(columns, list(self.header["columns"]))
+        for name, array in arrays.items():
+            dtype = np.dtype(self.header["columns"][name])
+            with open(self._column_path(self.path, name), "r+b") as f:
+                # Drop bytes left by an interrupted append before writing
+                f.truncate(start * dtype.itemsize)
+                f.seek(start * dtype.itemsize)
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        self.header["rows"] = start + n
+        self._write_header()
+        return range(start, start + n)
+
+    def _add_fitting_column(self, name: str):
+        # Zero counts for the existing runs; the header records the column
+        # with the next append, so an interrupted one leaves no trace
+        self.header["columns"][name] = _FITTING_DTYPE
+        with open(self._column_path(self.path, name), "wb") as f:
+            f.truncate(len(self) * np.dtype(_FITTING_DTYPE).itemsize)
+
+    def update(self, index, columns: dict):
+        """Patch the given rows of some columns in place."""
+        self._check_writable()
+        index = np.atleast_1d(np.arange(len(self))[index])
+        arrays, n = self._coerce(columns, list(columns))
+        if n not in (1, index.size):
+            raise ValueError(f"Expected {index.size} values per column, got {n}.")
+        self._maps.clear()
+        for name, array in arrays.items():
+            dtype = self.header["columns"][name]
+            column = np.memmap(self._column_path(self.path, name), dtype=dtype, mode="r+", shape=(len(self),))
+            column[index] = np.broadcast_to(array, index.shape)
+            column.flush()
+            del column
+        self._write_header()
+
+    def add_runs(self, inputs: dict, friction_solver: str = DEFAULT_FRICTION_SOLVER) -> range:
+        """
+        Rate inputs (INPUT_COLUMNS except friction_solver, plus any
+        fitting columns, see inputs_from_params) and append them.
+        """
+        results = _rate(inputs, friction_solver)
+        return self.append({**inputs, **results, "friction_solver": friction_solver})
+
+    def edit_runs(self, index, changes: dict):
+        """
+        Change some inputs of the given rows and re-rate only those rows.
+        The rows keep their stored friction solver.
+        """
+        input_columns = self.input_columns
+        unknown = [name for name in changes if name not in input_columns or name == "friction_solver"]
+        if unknown:
+            raise ValueError(f"Cannot edit column(s): {', '.join(unknown)}.")
+        index = np.atleast_1d(np.arange(len(self))[index])
+        inputs = self.rows(index, input_columns)
+        arrays, _ = self._coerce(changes, list(changes))
+        inputs.update({name: np.broadcast_to(arrays[name], index.shape) for name in arrays})
+        codes = inputs.pop("friction_solver")
+        results = {name: np.empty(index.size, dtype=dtype) for name, dtype in RESULT_COLUMNS.items()}
+        for code in np.unique(codes):
+            rows = codes == code
+            out = _rate({name: values[rows] for name, values in inputs.items()}, self.solvers[int(code)])
+            for name in RESULT_COLUMNS:
+                results[name][rows] = out[name]
+        self.update(index, {**inputs, **results})
+
+    def close(self):
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _rate(inputs: dict, friction_solver: str) -> dict:
+    out = calculate_flexible_duct_batch(
+        inputs["duct_diameter_in"],
+        inputs["air_flow_cfm"],
+        inputs["duct_length_ft"],
+        _fitting_counts(inputs),
+        inputs["roughness_value"],
+        inputs["compression_percent"],
+        inputs["safety_factor"],
+        friction_solver,
+        **{name: inputs.get(name, standard) for name, standard in STANDARD_CONDITIONS.items()},
+    )
+    return {name: out[name] for name in RESULT_COLUMNS}
+
+
+def append_schedule(project: DuctProject, in_stream, in_fmt: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    friction_solver: str = DEFAULT_FRICTION_SOLVER, on_error=None):
+    """
+    Rate a schedule chunk by chunk and append its valid rows to project.
+    Projects store round ducts only, so rectangular and flat oval rows are
+    rejected. on_error(line, message) is called for every rejected row.
+    Returns (rows_read, rows_rejected).
+    """
+    total = rejected = 0
+    for chunk in read_chunks(in_stream, in_fmt, chunk_size):
+        lines, errors, columns, valid = parse_chunk(chunk)
+        shapes = duct_shapes(columns)
+        if shapes is not None:
+            round_rows = shapes["shape"] == "round"
+            for i in valid[~round_rows].tolist():
+                errors[i] = "Projects store round ducts only."
+            columns = {name: values[round_rows] for name, values in columns.items() if name not in shapes}
+            valid = valid[round_rows]
+        total += len(lines)
+        rejected += len(lines) - len(valid)
+        if on_error is not None:
+            for line, error in zip(lines, errors):
+                if error:
+                    on_error(line, error)
+        if len(valid):
+            counts = fitting_counts(columns)
+            params = {name: values for name, values in columns.items() if name not in counts}
+            project.add_runs(inputs_from_params(dict(params, bend_counts=counts)), friction_solver)
+    return total, rejected
@@ -0,0 +1,407 @@
+# core/result_cache.py
+# Persistent memo cache of calculation results, stored as memory-mapped
+# .npy files so a project re-run only rates the rows that changed.
+#
+# Two kinds of entries share one table:
+#   inputs   calculate_batch / calculate (and so DuctNetwork) rows, keyed
+#            by their inputs after canonicalization (fittings resolved to
+#            their total Leq and K at the row's diameter, air conditions
+#            to their density and Reynolds coefficient, -0.0 -> 0.0) and
+#            quantization (the low 20 mantissa bits are cleared, about
+#            2e-10 relative);
+#   records  schedule rows (core/schedule.py), keyed by the text of the
+#            record and its format (the CSV header), so a hit skips
+#            parsing, rating and formatting: the entry also holds the
+#            formatted result text.
+# Each key is hashed twice, to 64 bits each: one hash is searched
+# (vectorized searchsorted), the other must match too, so a wrong answer
+# takes two independent 64-bit collisions. Entries live under a directory
+# named by FORMULA_TAG, which changes with the physics constants, the
+# fittings catalog and FORMULA_REVISION, so stale results are never
+# served. Each tag directory carries a MARKER_FILE, and marked directories
+# of other formula tags are removed when a cache is opened; nothing else
+# under the root is touched. Misses are rated on the caller's own inputs,
+# so a cold cache returns exactly what the kernel would.
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from core.batch import BATCH_COLUMNS, calculate_flexible_duct_batch
+from core.air import RE_COEFFICIENT, RHO_AIR, air_properties
+from core.calculations import calculate_flexible_duct
+from core.fittings import default_catalog
+from core.friction import DEFAULT_FRICTION_SOLVER, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, FRICTION_SOLVERS
+
+# Bump whenever an equation (or the file layout) changes in a way the
+# constants below do not show
+FORMULA_REVISION = 5
+FORMULA_TAG = hashlib.sha1(json.dumps(
+    [FORMULA_REVISION, RHO_AIR, RE_COEFFICIENT, default_catalog().fingerprint], sort_keys=True,
+).encode()).hexdigest()[:16]
+
+DEFAULT_MAX_ENTRIES = 2_000_000
+CACHED_COLUMNS = tuple(BATCH_COLUMNS) + ("f_converged",)
+_QUANTIZE_MASK = np.uint64(~((1 << 20) - 1) & 0xFFFFFFFFFFFFFFFF)
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_FILES = ("keys", "check", "values", "texts", "used")
+MARKER_FILE = ".flexduct-result-cache"
+_INPUT_WIDTH = 10
+# Seeds of the searched and the checking hash of input rows
+_INPUT_SEEDS = (0xCBF29CE484222325, 0x84222325CBF29CE4)
+# Longer record texts are hashed through their BLAKE2 digest, which keeps
+# the byte matrix of a chunk small
+_MAX_TEXT_BYTES = 256
+
+
+def resolved_inputs(duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+                    roughness_value, compression_percent, safety_factor,
+                    altitude_ft=0.0, air_temperature_f=70.0, relative_humidity_pct=0.0) -> np.ndarray:
+    """
+    (n, 10) float64 matrix of inputs in a fixed column order: diameter,
+    flow, length, fitting Leq, fitting K, roughness, compression, safety
+    factor, air density and Reynolds coefficient.
+    """
+    conditions = (altitude_ft, air_temperature_f, relative_humidity_pct)
+    columns = [duct_diameter_in, air_flow_cfm, duct_length_ft, roughness_value,
+               compression_percent, safety_factor, *conditions, *(bend_counts or {}).values()]
+    n = max(np.size(c) for c in columns)
+    matrix = np.empty((n, _INPUT_WIDTH))
+    for i, column in zip((0, 1, 2, 5, 6, 7), columns):
+        matrix[:, i] = column
+    matrix[:, 3], matrix[:, 4] = default_catalog().resolve_batch(bend_counts or {}, matrix[:, 0])
+    matrix[:, 8], matrix[:, 9] = air_properties(*conditions)
+    return matrix
+
+
+def quantize(matrix: np.ndarray) -> np.ndarray:
+    """Copy of a resolved_inputs matrix with -0.0 -> 0.0 and the low mantissa bits cleared."""
+    matrix = matrix + 0.0  # -0.0 -> 0.0
+    bits = matrix.view(np.uint64)
+    bits &= _QUANTIZE_MASK
+    return matrix
+
+
+def canonical_inputs(*args, **conditions) -> np.ndarray:
+    """Quantized resolved_inputs: the cache key of each row."""
+    return quantize(resolved_inputs(*args, **conditions))
+
+
+def hash_rows(matrix: np.ndarray, seed: int = _INPUT_SEEDS[0]) -> np.ndarray:
+    bits = np.ascontiguousarray(matrix).view(np.uint64)
+    h = np.full(bits.shape[0], seed, dtype=np.uint64)
+    for i in range(bits.shape[1]):
+        h ^= bits[:, i]
+        h *= _HASH_MULTIPLIER
+        h ^= h >> np.uint64(29)
+    return h
+
+
+def hash_inputs(inputs: np.ndarray):
+    """(keys, check): the two hashes of each row of canonical_inputs."""
+    return tuple(hash_rows(inputs, seed) for seed in _INPUT_SEEDS)
+
+
+def hash_texts(texts: list, domain: str):
+    """
+    (keys, check): the two hashes of each record text, seeded by domain
+    (the format of the records, and anything else their results depend on).
+    """
+    texts = [text if len(text) <= _MAX_TEXT_BYTES else hashlib.blake2b(text.encode()).hexdigest()
+             for text in texts]
+    try:
+        data = np.array(texts, dtype=np.bytes_)
+    except UnicodeEncodeError:
+        data = np.array([text.encode() for text in texts], dtype=np.bytes_)
+    # Pad to whole 64-bit words; the length tells trailing NULs apart
+    width = -(-data.itemsize // 8) * 8
+    words = np.zeros((len(texts), width), dtype=np.uint8)
+    words[:, :data.itemsize] = data.view(np.uint8).reshape(len(texts), data.itemsize)
+    words = words.view(np.uint64)
+    # Each row is hashed over its own words only, so its key does not
+    # depend on the longest row of the chunk it was read in
+    used = -(-np.char.str_len(data).astype(np.intp) // 8)
+    lengths = np.fromiter(map(len, texts), np.uint64, len(texts))
+    seeds = hashlib.blake2b(domain.encode(), digest_size=16).digest()
+    return tuple(_hash_words(words, used, lengths, int.from_bytes(seeds[i:i + 8], "little")) for i in (0, 8))
+
+
+def _hash_words(words: np.ndarray, used: np.ndarray, lengths: np.ndarray, seed: int) -> np.ndarray:
+    # hash_rows over the first used[i] words of each row, then its length
+    h = np.full(words.shape[0], seed, dtype=np.uint64)
+    for i in range(words.shape[1]):
+        rows = np.flatnonzero(used > i)
+        if rows.size == h.size:
+            h ^= words[:, i]
+            h *= _HASH_MULTIPLIER
+            h ^= h >> np.uint64(29)
+        else:
+            part = h[rows] ^ words[rows, i]
+            part *= _HASH_MULTIPLIER
+            part ^= part >> np.uint64(29)
+            h[rows] = part
+    h ^= lengths
+    h *= _HASH_MULTIPLIER
+    h ^= h >> np.uint64(29)
+    return h
+
+
+class ResultCache:
+    """
+    On-disk memo cache for one friction solver (and tolerance/iteration
+    limit). Files are memory-mapped on open; the first store copies them
+    into memory and flush() (or leaving a with block) writes them back
+    atomically. When more than max_entries are held, the least recently
+    used entries are evicted on flush. Not safe for concurrent writers.
+    """
+
+    def __init__(self, root: str, friction_solver: str = DEFAULT_FRICTION_SOLVER,
+                 tolerance: float = DEFAULT_TOLERANCE, max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        if friction_solver not in FRICTION_SOLVERS:
+            raise ValueError(f"Unknown friction solver '{friction_solver}'.")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.root = root
+        self.friction_solver = friction_solver
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.max_entries = max_entries
+        self.path = os.path.join(root, FORMULA_TAG, f"{friction_solver}-{tolerance:g}-{max_iterations}")
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(root, FORMULA_TAG, MARKER_FILE), "w") as marker:
+            marker.write(FORMULA_TAG)
+        self._remove_stale()
+        self._load()
+        self._pending = []
+        self._dirty = False
+        self.clear_stats()
+
+    def _remove_stale(self):
+        # Only directories carrying our marker file are ours to delete
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name != FORMULA_TAG and os.path.isfile(os.path.join(entry, MARKER_FILE)):
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _load(self):
+        files = [os.path.join(self.path, f"{name}.npy") for name in _FILES]
+        if all(os.path.exists(f) for f in files) and np.load(files[0], mmap_mode="r").size:
+            self.keys, self.check, self.values, self.texts = (np.load(f, mmap_mode="r") for f in files[:4])
+            self.used = np.array(np.load(files[4]))
+        else:
+            self.clear()
+        self.generation = int(self.used.max()) + 1 if self.used.size else 1
+
+    # -----------------------------
+    # Statistics
+    # -----------------------------
+    def clear_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": int(self.keys.size),
+            "formula_tag": FORMULA_TAG,
+        }
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+    def _find(self, keys: np.ndarray, check: np.ndarray):
+        # (hit mask, positions of the hits in the table)
+        if not self.keys.size:
+            self.misses += keys.size
+            return np.zeros(keys.size, dtype=bool), np.empty(0, dtype=np.intp)
+        # Searching the keys in sorted order walks the table (memory-mapped,
+        # maybe not yet paged in) front to back: several times faster
+        order = np.argsort(keys)
+        pos = np.empty(keys.size, dtype=np.intp)
+        pos[order] = np.searchsorted(self.keys, keys[order])
+        np.minimum(pos, self.keys.size - 1, out=pos)
+        hit = self.keys[pos] == keys
+        rows = np.flatnonzero(hit)
+        same = self.check[pos[rows]] == check[rows]
+        hit[rows[~same]] = False
+        found = pos[rows[same]]
+        self.used[found] = self.generation
+        self.hits += found.size
+        self.misses += keys.size - found.size
+        return hit, found
+
+    def lookup_inputs(self, inputs: np.ndarray, keys=None):
+        """
+        (hit mask, (n, len(CACHED_COLUMNS)) values) for canonical_inputs
+        rows; rows without a hit are NaN. keys are hash_inputs(inputs).
+        """
+        hit, found = self._find(*(hash_inputs(inputs) if keys is None else keys))
+        values = np.full((hit.size, len(CACHED_COLUMNS)), np.nan)
+        values[hit] = self.values[found]
+        return hit, values
+
+    def lookup_records(self, texts: list, domain: str, keys=None):
+        """
+        (hit mask, values, result texts) for records keyed by their text
+        (see store_records); rows without a hit are NaN and "".
+        keys are hash_texts(texts, domain).
+        """
+        hit, found = self._find(*(hash_texts(texts, domain) if keys is None else keys))
+        values = np.full((hit.size, len(CACHED_COLUMNS)), np.nan)
+        values[hit] = self.values[found]
+        texts = np.full(hit.size, "", dtype=object)
+        texts[hit] = list(map(bytes.decode, self.texts[found].tolist()))
+        return hit, values, texts.tolist()
+
+    def store_inputs(self, inputs: np.ndarray, values: np.ndarray, keys=None):
+        """Queue results (CACHED_COLUMNS) for canonical_inputs rows."""
+        keys = hash_inputs(inputs) if keys is None else keys
+        self._store(*keys, np.asarray(values, dtype=np.float64), np.zeros(len(values), dtype="S1"))
+
+    def store_records(self, texts: list, domain: str, values: np.ndarray, result_texts: list, keys=None):
+        """
+        Queue results for records keyed by their text: values in
+        CACHED_COLUMNS order (NaN where not known) and the text they are
+        written as. result_texts must be ASCII.
+        """
+        keys = hash_texts(texts, domain) if keys is None else keys
+        self._store(*keys, np.asarray(values, dtype=np.float64), np.array(result_texts, dtype=np.bytes_))
+
+    def _store(self, keys, check, values, texts):
+        # Entries are merged into the sorted arrays by the next flush(), so
+        # a run with many chunks sorts the cache only once
+        self._pending.append((keys, check, values, texts))
+        self._dirty = True
+
+    def _merge_pending(self):
+        if not self._pending:
+            return
+        keys, check, values, texts = (np.concatenate(parts) for parts in zip(*self._pending))
+        self._pending = []
+        # Keep the first row of any duplicate key, and only keys not yet stored
+        keys, first = np.unique(keys, return_index=True)
+        if self.keys.size:
+            pos = np.minimum(np.searchsorted(self.keys, keys), self.keys.size - 1)
+            new = self.keys[pos] != keys
+            keys, first = keys[new], first[new]
+        if not keys.size:
+            return
+        order = np.argsort(np.concatenate((self.keys, keys)), kind="stable")
+        for name, added in (("keys", keys), ("check", check[first]), ("values", values[first]),
+                            ("texts", texts[first]), ("used", np.full(keys.size, self.generation, dtype=np.int64))):
+            setattr(self, name, np.concatenate((getattr(self, name), added))[order])
+        self.stores += keys.size
+
+    def _evict(self):
+        excess = self.keys.size - self.max_entries
+        if excess <= 0:
+            return
+        keep = np.sort(np.argsort(self.used, kind="stable")[excess:])
+        for name in _FILES:
+            setattr(self, name, getattr(self, name)[keep])
+        self.evictions += excess
+
+    def flush(self):
+        """Write the cache to disk (only if entries were added) and start a new LRU generation."""
+        if self._dirty or self.keys.size > self.max_entries:
+            self._merge_pending()
+            self._evict()
+            for name in _FILES:
+                target = os.path.join(self.path, f"{name}.npy")
+                # np.save adds .npy to names without it, so the temp name keeps it
+                tmp = os.path.join(self.path, f"{name}.tmp.npy")
+                np.save(tmp, np.asarray(getattr(self, name)))
+                os.replace(tmp, target)
+            self._dirty = False
+        else:
+            np.save(os.path.join(self.path, "used.npy"), self.used)
+        self.generation += 1
+
+    def clear(self):
+        self._pending = []
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.check = np.empty(0, dtype=np.uint64)
+        self.values = np.empty((0, len(CACHED_COLUMNS)))
+        self.texts = np.empty(0, dtype="S1")
+        self.used = np.empty(0, dtype=np.int64)
+        self._dirty = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+    # -----------------------------
+    # Cached calculations
+    # -----------------------------
+    def calculate_batch(self, duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+                        roughness_value, compression_percent, safety_factor, **conditions) -> dict:
+        """
+        calculate_flexible_duct_batch with memoization: only rows whose
+        inputs are not cached go through the batch kernel. conditions are
+        the kernel's air condition keywords.
+        """
+        raw = resolved_inputs(duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+                              roughness_value, compression_percent, safety_factor, **conditions)
+        inputs = quantize(raw)
+        keys = hash_inputs(inputs)
+        hit, values = self.lookup_inputs(inputs, keys)
+        missing = np.flatnonzero(~hit)
+        if missing.size:
+            # The quantized inputs are only the key; rate the caller's own values
+            m = raw[missing]
+            out = calculate_flexible_duct_batch(
+                m[:, 0], m[:, 1], m[:, 2], None, m[:, 5], m[:, 6], m[:, 7],
+                self.friction_solver, self.tolerance, self.max_iterations,
+                fitting_losses=(m[:, 3], m[:, 4]), air_properties=(m[:, 8], m[:, 9]),
+            )
+            fresh = np.column_stack([out[name] for name in CACHED_COLUMNS]).astype(np.float64)
+            values[missing] = fresh
+            self.store_inputs(inputs[missing], fresh, tuple(k[missing] for k in keys))
+        result = {name: values[:, i] for i, name in enumerate(CACHED_COLUMNS)}
+        result["f_iterations"] = result["f_iterations"].astype(np.int32)
+        result["f_converged"] = result["f_converged"].astype(bool)
+        return result
+
+    def calculate(self, duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+                  roughness_value, compression_percent, safety_factor, **conditions):
+        """
+        calculate_flexible_duct with memoization. Misses run the scalar
+        function itself; hits rebuild the same details dict, except that a
+        friction warning is reported generically.
+        """
+        inputs = canonical_inputs(duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+                                  roughness_value, compression_percent, safety_factor, **conditions)
+        hit, values = self.lookup_inputs(inputs)
+        if not hit[0]:
+            v, dp, details = calculate_flexible_duct(
+                duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts, roughness_value,
+                compression_percent, safety_factor, self.friction_solver, self.tolerance, self.max_iterations,
+                **conditions,
+            )
+            row = [details[label] for label in BATCH_COLUMNS.values()] + [details["Friction Status"] == "OK"]
+            self.store_inputs(inputs, np.array([row], dtype=np.float64))
+            return v, dp, details
+        row = dict(zip(CACHED_COLUMNS, values[0].tolist()))
+        details = {label: row[name] for name, label in BATCH_COLUMNS.items()}
+        details["Friction Iterations"] = int(row["f_iterations"])
+        details["Friction Solver"] = FRICTION_SOLVERS[self.friction_solver]
+        details["Friction Status"] = "OK" if row["f_converged"] else "Friction factor did not converge (cached)"
+        # Same key order as calculate_flexible_duct
+        order = ("Area (ft²)", "Velocity (FPM)", "Air Density (lb/ft³)", "Reynolds Number", "Friction Factor (f)", "Friction Solver",
+                 "Friction Iterations", "Friction Status", "Equivalent Length (ft)", "Raw Pf (in.w.g.)",
+                 "PDCF", "Safety Factor", "Total ΔP (in.w.g.)")
+        details = {key: details[key] for key in order}
+        return row["velocity_fpm"], row["total_pressure_loss"], details
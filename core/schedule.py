@@ -0,0 +1,717 @@
+# core/schedule.py
+# Streaming reader/rater for duct schedules (CSV or JSON Lines).
+import csv
+import io
+import json
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, compress, islice, repeat
+from operator import contains, is_, itemgetter, methodcaller
+
+import numpy as np
+
+from core.air import CONDITION_LIMITS, STANDARD_CONDITIONS
+from core.batch import calculate_flexible_duct_batch
+from core.fittings import parse_fittings
+from core.friction import DEFAULT_FRICTION_SOLVER
+from core.friction_cache import default_cache
+from core.inputs import (
+    DEFAULT_ROUGHNESS, DEFAULT_SAFETY_FACTOR_PERCENT, ROUGHNESS_MAP, parse_count, parse_duct_params, parse_float,
+    parse_positive_float, parse_roughness,
+)
+from core.result_cache import CACHED_COLUMNS, hash_texts
+from core.shapes import calculate_duct_batch
+
+INPUT_FIELDS = (
+    "duct_diameter_in",
+    "air_flow_cfm",
+    "duct_length_ft",
+    "bend_45",
+    "bend_90",
+    "bend_180",
+    "roughness",
+    "compression_percent",
+    "safety_factor_percent",
+    "fittings",
+    "altitude_ft",
+    "air_temperature_f",
+    "relative_humidity_pct",
+    "shape",
+    "width_in",
+    "height_in",
+)
+RESULT_FIELDS = (
+    "velocity_fpm",
+    "re_number",
+    "f_factor",
+    "leq_ft",
+    "pf",
+    "pdcf",
+    "total_pressure_loss",
+    "f_iterations",
+    "f_converged",
+)
+OUTPUT_FIELDS = ("line",) + RESULT_FIELDS + ("error",)
+# Result columns written as integers (f_converged as 0/1); the rest are floats
+INTEGER_FIELDS = {"f_iterations": np.int32, "f_converged": np.int8}
+DEFAULT_CHUNK_SIZE = 10_000
+
+_SCALAR_PARAMS = ("duct_diameter_in", "air_flow_cfm", "duct_length_ft",
+                  "roughness_value", "compression_percent", "safety_factor") + tuple(STANDARD_CONDITIONS)
+_BEND_ANGLES = ("45", "90", "180")
+# Columns of non-round ducts (core/shapes.py) and their values for round rows
+_ROUND_SHAPE = {"shape": "round", "width_in": math.nan, "height_in": math.nan}
+# A field missing from a JSON record (a blank CSV cell reads as "")
+_ABSENT = object()
+# Results are formatted per distinct value when a sample of this many
+# rows has at most a quarter as many distinct values
+_FORMAT_SAMPLE = 1024
+
+
+def _json_record(text):
+    try:
+        record = json.loads(text)
+    except json.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {e.msg}")
+    if not isinstance(record, dict):
+        return ValueError("Each JSON line must be an object.")
+    return record
+
+
+def iter_records(stream, fmt: str):
+    """Yield (line_number, record) pairs from a CSV or JSONL text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty cells mean "use the default", like a blank optional field
+            yield reader.line_num, {k: v for k, v in record.items() if k and v not in ("", None)}
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_no, _json_record(line)
+    else:
+        raise ValueError(f"Unsupported schedule format: {fmt}")
+
+
+def iter_chunks(records, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CsvChunk:
+    """
+    Rows of a CSV schedule as read by read_chunks: their line numbers, the
+    header and either the lines themselves (texts, when no cell is quoted;
+    split on demand) or the cells as parsed by csv.reader (rows).
+    """
+
+    def __init__(self, lines: list, header: list, texts: list = None, rows: list = None):
+        self.lines = lines
+        self.header = header
+        self.texts = texts
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.lines)
+
+    def cells(self) -> list:
+        if self.rows is None:
+            self.rows = list(map(methodcaller("split", ","), self.texts))
+        return self.rows
+
+    def key_texts(self) -> list:
+        """Each row as csv.writer writes it: the line itself unless a cell was quoted."""
+        if self.texts is not None:
+            return self.texts
+        return [_csv_line(row) for row in self.rows]
+
+    def take(self, positions: list) -> "CsvChunk":
+        texts = None if self.texts is None else [self.texts[i] for i in positions]
+        rows = None if texts is not None else [self.rows[i] for i in positions]
+        return CsvChunk([self.lines[i] for i in positions], self.header, texts, rows)
+
+    def record(self, i: int) -> dict:
+        """Row i as iter_records reads it."""
+        return {k: v for k, v in dict(zip(self.header, self.cells()[i])).items() if k and v != ""}
+
+    def columns(self, fields) -> dict:
+        """The cells of each field, "" where a row has none."""
+        rows = self.cells()
+        width = len(self.header)
+        if rows and min(map(len, rows)) < width:
+            rows = [row + [""] * (width - len(row)) for row in rows]
+        # Like csv.DictReader, the last of repeated column names wins
+        index = {name: i for i, name in enumerate(self.header)}
+        blank = [""] * len(rows)
+        return {field: list(map(itemgetter(index[field]), rows)) if field in index else blank
+                for field in fields}
+
+
+class JsonlChunk:
+    """Lines of a JSON Lines schedule as read by read_chunks, decoded on demand."""
+
+    def __init__(self, lines: list, texts: list):
+        self.lines = lines
+        self.texts = texts
+
+    def __len__(self):
+        return len(self.lines)
+
+    def take(self, positions: list) -> "JsonlChunk":
+        return JsonlChunk([self.lines[i] for i in positions], [self.texts[i] for i in positions])
+
+    def records(self) -> list:
+        """(line_number, record) pairs, as iter_records yields them."""
+        return list(zip(self.lines, map(_json_record, self.texts)))
+
+
+def record_texts(chunk):
+    """
+    (texts, domain) keying the rows of a chunk in a ResultCache: the text
+    of each record (for CSV the row as csv.writer writes it, so quoting
+    does not matter) and the format they are read in, with the CSV header.
+    """
+    if isinstance(chunk, CsvChunk):
+        return chunk.key_texts(), "csv\x1e" + _csv_line(chunk.header)
+    if isinstance(chunk, JsonlChunk):
+        return chunk.texts, "jsonl"
+    return [json.dumps(record, sort_keys=True, default=repr) if isinstance(record, dict) else repr(record)
+            for _, record in chunk], "records"
+
+
+def _take(chunk, positions: list):
+    # The rows of a chunk at positions, as a chunk of the same kind
+    if isinstance(chunk, (CsvChunk, JsonlChunk)):
+        return chunk.take(positions)
+    return [chunk[i] for i in positions]
+
+
+def _csv_line(cells, end: str = "") -> str:
+    out = io.StringIO()
+    csv.writer(out, lineterminator=end).writerow(cells)
+    return out.getvalue()
+
+
+def read_chunks(stream, fmt: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield the rows of a CSV or JSONL text stream in chunks of at most
+    chunk_size (CsvChunk or JsonlChunk, for parse_chunk and rate_chunk):
+    the rows of iter_chunks(iter_records(stream, fmt)), read whole lines
+    at a time instead of record by record.
+    """
+    if fmt == "csv":
+        yield from _csv_chunks(stream, chunk_size)
+    elif fmt == "jsonl":
+        line_no = 0
+        while True:
+            block = list(islice(stream, chunk_size))
+            if not block:
+                return
+            lines = range(line_no + 1, line_no + 1 + len(block))
+            line_no += len(block)
+            texts = list(map(methodcaller("rstrip", "\r\n"), block))
+            keep = list(map(str.strip, block))
+            if "" in keep:
+                # Blank lines are not rows
+                lines, texts = compress(lines, keep), list(compress(texts, keep))
+            if texts:
+                yield JsonlChunk(list(lines), texts)
+    else:
+        raise ValueError(f"Unsupported schedule format: {fmt}")
+
+
+def _csv_chunks(stream, chunk_size: int):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    line_no = reader.line_num
+    while True:
+        block = list(islice(stream, chunk_size))
+        if not block:
+            return
+        if any(map(contains, block, repeat('"'))):
+            # Quoted cells may hold commas or line breaks: let csv parse
+            # the block, and finish a record that runs past its end
+            lines, rows = [], []
+            parser = csv.reader(chain(block, stream))
+            for row in parser:
+                if row:
+                    rows.append(row)
+                    lines.append(line_no + parser.line_num)
+                if parser.line_num >= len(block):
+                    break
+            line_no += parser.line_num
+            chunk = CsvChunk(lines, header, rows=rows)
+        else:
+            lines = range(line_no + 1, line_no + 1 + len(block))
+            line_no += len(block)
+            texts = list(map(methodcaller("rstrip", "\r\n"), block))
+            if "" in texts:
+                # Blank lines are not rows
+                keep = list(map(bool, texts))
+                lines, texts = compress(lines, keep), list(compress(texts, keep))
+            chunk = CsvChunk(list(lines), header, texts=texts)
+        if chunk.lines:
+            yield chunk
+
+
+def _validate(record) -> dict:
+    if isinstance(record, Exception):
+        raise record
+    if record.get("shape", "round") in ("round", ""):
+        required = INPUT_FIELDS[:3]
+    else:
+        required = ("width_in", "height_in") + INPUT_FIELDS[1:3]
+    missing = [f for f in required if f not in record]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}.")
+    return parse_duct_params(record)
+
+
+def parse_chunk(chunk):
+    """
+    Validate one chunk: a CsvChunk or JsonlChunk from read_chunks, or a
+    list of (line_number, record) pairs.
+
+    Returns (lines, errors, columns, valid): the input line numbers, an
+    error message per row ("" when valid), arrays of parameter values for
+    the valid rows keyed by calculate_flexible_duct argument (fitting
+    counts by fitting id, see fitting_counts; "shape", "width_in" and
+    "height_in" only once a non-round row appears, see duct_shapes) and
+    the positions of the valid rows in the chunk.
+
+    Round rows are converted a column at a time (_parse_columns); the rows
+    that fail and the non-round rows are parsed one by one with
+    parse_duct_params, which also gives the error message of a bad row.
+    """
+    if isinstance(chunk, JsonlChunk):
+        chunk = chunk.records()
+    if isinstance(chunk, CsvChunk):
+        lines = list(chunk.lines)
+        params, fittings, slow = _parse_columns(chunk.columns(INPUT_FIELDS), "")
+        record = chunk.record
+    else:
+        lines = [line for line, _ in chunk]
+        records = [record for _, record in chunk]
+        dicts = [record if isinstance(record, dict) else {} for record in records]
+        params, fittings, slow = _parse_columns(
+            {field: list(map(methodcaller("get", field, _ABSENT), dicts)) for field in INPUT_FIELDS}, _ABSENT)
+        slow |= np.array([not isinstance(record, dict) for record in records], dtype=bool)
+        record = records.__getitem__
+
+    errors = [""] * len(lines)
+    shapes = None
+    for i in np.flatnonzero(slow).tolist():
+        try:
+            row = _validate(record(i))
+        except (ValueError, KeyError) as e:
+            errors[i] = str(e)
+            continue
+        slow[i] = False
+        for name in _SCALAR_PARAMS:
+            params[name][i] = row[name]
+        counts = row["bend_counts"]
+        for angle in _BEND_ANGLES:
+            params[angle][i] = counts[angle]
+        fittings[i] = {fitting_id: count for fitting_id, count in counts.items() if fitting_id not in _BEND_ANGLES}
+        if row["shape"] != "round":
+            if shapes is None:
+                shapes = {name: np.full(len(lines), value, dtype=object if name == "shape" else np.float64)
+                          for name, value in _ROUND_SHAPE.items()}
+            for name in _ROUND_SHAPE:
+                shapes[name][i] = row[name]
+
+    valid = np.flatnonzero(~slow)
+    columns = {name: params[name][valid] for name in _SCALAR_PARAMS}
+    columns.update((angle, params[angle][valid].astype(np.int64)) for angle in _BEND_ANGLES)
+    if shapes is not None:
+        columns.update((name, values[valid]) for name, values in shapes.items())
+    # Other fittings in the order valid rows first list them, each a column
+    listed = list(compress(valid.tolist(), map(bool, map(fittings.__getitem__, valid.tolist()))))
+    for i in listed:
+        for fitting_id in fittings[i]:
+            if fitting_id not in columns:
+                columns[fitting_id] = np.zeros(len(valid), dtype=np.int64)
+    if listed:
+        position = np.searchsorted(valid, listed).tolist()
+        for i, row in zip(listed, position):
+            for fitting_id, count in fittings[i].items():
+                if fitting_id not in _BEND_ANGLES:
+                    columns[fitting_id][row] = count
+    return lines, errors, columns, valid
+
+
+def _parse_columns(raw: dict, absent):
+    # parse_duct_params for the round rows of raw (a list of values per
+    # INPUT_FIELDS, absent where a row has no value): (params, fittings,
+    # slow), params being arrays keyed like _SCALAR_PARAMS and
+    # _BEND_ANGLES (flex bends listed under fittings added in), fittings a
+    # dict per row and slow marking the rows left to parse one by one
+    n = len(raw["duct_diameter_in"])
+    slow = np.zeros(n, dtype=bool)
+
+    def column(field, parse, default=None, objects=False):
+        values, failed = _convert_column(raw[field], absent, parse, default, objects)
+        if failed is not None:
+            np.logical_or(slow, failed, out=slow)
+        return values
+
+    # Non-round rows take width and height instead of a diameter
+    column("shape", _round_shape, "round", objects=True)
+    params = {}
+    for name in INPUT_FIELDS[:3]:
+        params[name] = column(name, float)
+        slow |= params[name] < 0
+    for angle, field in zip(_BEND_ANGLES, INPUT_FIELDS[3:6]):
+        params[angle] = column(field, partial(parse_count, field_name=field), 0)
+    params["roughness_value"] = column("roughness", parse_roughness, ROUGHNESS_MAP[DEFAULT_ROUGHNESS])
+    params["compression_percent"] = column("compression_percent", float, 0.0)
+    sf_percent = column("safety_factor_percent", _parse_safety_factor, DEFAULT_SAFETY_FACTOR_PERCENT)
+    params["safety_factor"] = 1.0 + (sf_percent / 100.0)
+    for name, standard in STANDARD_CONDITIONS.items():
+        params[name] = column(name, partial(_parse_condition, standard=standard), standard)
+        lo, hi = CONDITION_LIMITS[name]
+        slow |= ~((params[name] >= lo) & (params[name] <= hi))
+    fittings = column("fittings", parse_fittings, {}, objects=True)
+    for i in compress(range(n), map(bool, fittings)):
+        for fitting_id, count in fittings[i].items():
+            if fitting_id in _BEND_ANGLES:
+                params[fitting_id][i] += count
+    return params, fittings, slow
+
+
+def _convert_column(values: list, absent, parse, default, objects: bool = False):
+    # parse() each value of a raw column but the absent ones, which take
+    # default (None: the field is required): (converted, failed), with
+    # converted a float64 array (a list if objects) and failed marking the
+    # values parse rejected (None if none). Schedules repeat sizes, counts
+    # and labels, so each distinct value is parsed once; a column of
+    # mostly distinct numbers is converted in one pass instead.
+    n = len(values)
+    try:
+        distinct = dict.fromkeys(values)
+    except TypeError:  # unhashable JSON values (arrays, objects)
+        distinct = None
+    if parse is float and distinct is not None and 2 * len(distinct) > n and absent not in distinct:
+        try:
+            return np.fromiter(map(float, values), np.float64, n), None
+        except (TypeError, ValueError):
+            pass
+    if distinct is None:
+        converted = [_attempt(parse, value, absent, default) for value in values]
+    else:
+        for value in distinct:
+            distinct[value] = _attempt(parse, value, absent, default)
+        converted = list(map(distinct.__getitem__, values))
+    failed = None
+    if None in (converted if distinct is None else distinct.values()):
+        failed = np.fromiter(map(is_, converted, repeat(None)), bool, n)
+    return converted if objects else np.array(converted, dtype=np.float64), failed
+
+
+def _attempt(parse, value, absent, default):
+    if value == absent:
+        return default
+    try:
+        return parse(value)
+    except Exception:
+        # Parsed again by parse_duct_params, which reports (or raises) it
+        return None
+
+
+def _round_shape(value):
+    if value not in ("round", ""):
+        raise ValueError
+    return value
+
+
+def _parse_safety_factor(value) -> float:
+    if value is None:
+        return DEFAULT_SAFETY_FACTOR_PERCENT
+    return parse_positive_float(value, "Safety Factor (%)")
+
+
+def _parse_condition(value, standard: float) -> float:
+    return standard if value in (None, "") else parse_float(value, "")
+
+
+def fitting_counts(columns: dict) -> dict:
+    """The fitting count columns of parse_chunk output, keyed by fitting id."""
+    return {name: values for name, values in columns.items()
+            if name not in _SCALAR_PARAMS and name not in _ROUND_SHAPE}
+
+
+def duct_shapes(columns: dict):
+    """The shape columns of parse_chunk output, or None when every row is round."""
+    if "shape" not in columns:
+        return None
+    return {name: columns[name] for name in _ROUND_SHAPE}
+
+
+def air_conditions(columns: dict) -> dict:
+    """The air condition columns of parse_chunk output, as kernel keyword arguments."""
+    return {name: columns[name] for name in STANDARD_CONDITIONS}
+
+
+def rate_chunk(chunk, friction_solver: str = DEFAULT_FRICTION_SOLVER, use_friction_cache: bool = False,
+               instrument=None, result_cache=None):
+    """
+    Rate one chunk (anything parse_chunk takes).
+
+    Returns (lines, errors, results): the input line numbers, an error
+    message per row ("" when valid) and a dict of columns keyed by
+    RESULT_FIELDS, all in input order: floats, except the INTEGER_FIELDS.
+    Rows that fail validation carry NaN (0 in the integer columns) instead
+    of aborting the chunk. use_friction_cache interpolates
+    f from the process-wide FrictionFactorCache. instrument records the
+    parse stage here and the batch stages in calculate_flexible_duct_batch.
+    Rectangular and flat oval rows are rated in the same pass through
+    their round equivalent (core/shapes.py).
+
+    result_cache (core/result_cache.py, same friction solver) memoizes
+    rows across runs by their text (record_texts): only rows it has not
+    seen are parsed and rated, and results also holds "texts", each row's
+    results as format_rows writes them, which ScheduleWriter writes as is.
+    """
+    if result_cache is not None:
+        return _rate_cached(chunk, friction_solver, use_friction_cache, instrument, result_cache)
+    if instrument is not None:
+        start = instrument.clock()
+    lines, errors, columns, valid = parse_chunk(chunk)
+    if instrument is not None:
+        instrument.add("parse", instrument.clock() - start, len(lines))
+        instrument.count("rows_rejected", len(lines) - len(valid))
+
+    results = _empty_results(len(lines))
+    shapes = duct_shapes(columns) if len(valid) else None
+    if len(valid) and shapes is not None:
+        out = calculate_duct_batch(
+            shapes["shape"],
+            shapes["width_in"],
+            shapes["height_in"],
+            columns["duct_diameter_in"],
+            columns["air_flow_cfm"],
+            columns["duct_length_ft"],
+            fitting_counts(columns),
+            columns["roughness_value"],
+            columns["compression_percent"],
+            columns["safety_factor"],
+            friction_solver=friction_solver,
+            friction_cache=default_cache() if use_friction_cache else None,
+            instrument=instrument,
+            **air_conditions(columns),
+        )
+        for name in RESULT_FIELDS:
+            results[name][valid] = out[name]
+    elif len(valid):
+        out = calculate_flexible_duct_batch(
+            columns["duct_diameter_in"],
+            columns["air_flow_cfm"],
+            columns["duct_length_ft"],
+            fitting_counts(columns),
+            columns["roughness_value"],
+            columns["compression_percent"],
+            columns["safety_factor"],
+            friction_solver,
+            friction_cache=default_cache() if use_friction_cache else None,
+            instrument=instrument,
+            **air_conditions(columns),
+        )
+        for name in RESULT_FIELDS:
+            results[name][valid] = out[name]
+    return lines, errors, results
+
+
+def _empty_results(n: int) -> dict:
+    return {
+        name: np.zeros(n, INTEGER_FIELDS[name]) if name in INTEGER_FIELDS else np.full(n, np.nan)
+        for name in RESULT_FIELDS
+    }
+
+
+def _rate_cached(chunk, friction_solver, use_friction_cache, instrument, result_cache):
+    # rate_chunk through result_cache: hits skip parsing, rating and
+    # formatting; the valid rows among the misses are stored
+    if instrument is not None:
+        start = instrument.clock()
+    texts, domain = record_texts(chunk)
+    if use_friction_cache:
+        # Interpolated friction factors differ slightly from solved ones
+        domain += "\x1efriction-cache"
+    keys = hash_texts(texts, domain)
+    hit, values, result_texts = result_cache.lookup_records(texts, domain, keys)
+    lines = list(chunk.lines) if isinstance(chunk, (CsvChunk, JsonlChunk)) else [line for line, _ in chunk]
+    errors = [""] * len(lines)
+    results = _empty_results(len(lines))
+    found = np.flatnonzero(hit)
+    for name in RESULT_FIELDS:
+        results[name][found] = values[found, CACHED_COLUMNS.index(name)]
+    if instrument is not None:
+        instrument.add("cache", instrument.clock() - start, len(lines))
+    missing = np.flatnonzero(~hit)
+    if missing.size:
+        _, missing_errors, fresh = rate_chunk(_take(chunk, missing.tolist()), friction_solver,
+                                              use_friction_cache, instrument)
+        fresh_texts = format_rows(fresh)
+        for i, error, text in zip(missing.tolist(), missing_errors, fresh_texts):
+            errors[i] = error
+            result_texts[i] = text
+        for name in RESULT_FIELDS:
+            results[name][missing] = fresh[name]
+        ok = np.array([not error for error in missing_errors], dtype=bool)
+        if ok.any():
+            stored = np.full((int(ok.sum()), len(CACHED_COLUMNS)), np.nan)
+            for name in RESULT_FIELDS:
+                stored[:, CACHED_COLUMNS.index(name)] = fresh[name][ok]
+            rows = missing[ok]
+            result_cache.store_records([texts[i] for i in rows.tolist()], domain, stored,
+                                       list(compress(fresh_texts, ok)), tuple(k[rows] for k in keys))
+    results["texts"] = result_texts
+    return lines, errors, results
+
+
+class ScheduleWriter:
+    """
+    Incremental CSV/JSONL writer for rate_chunk output. Valid rows are
+    filled into a line template from whole result columns of text
+    (format_results); only rejected rows are written one by one.
+    """
+
+    def __init__(self, stream, fmt: str):
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported output format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            stream.write(",".join(OUTPUT_FIELDS) + "\n")
+        else:
+            self._template = "{{" + ", ".join(f'"{name}": {{}}' for name in OUTPUT_FIELDS[:-1]) + ', "error": ""}}\n'
+
+    def write_chunk(self, lines, errors, results):
+        texts = results.get("texts")
+        if self.fmt == "jsonl":
+            if texts is None:
+                columns = format_results(results)
+            else:
+                columns = [list(column) for column in zip(*map(methodcaller("split", ","), texts))]
+            # JSON has no inf/nan; zero-area rows are reported as null
+            for name, column in zip(RESULT_FIELDS, columns):
+                for i in np.flatnonzero(~np.isfinite(results[name])).tolist():
+                    column[i] = "null"
+            rows = list(map(self._template.format, lines, *columns))
+        else:
+            # The last cell is the empty error of a valid row, and the line end
+            rows = list(map(",".join, zip(map(str, lines), texts or format_rows(results), repeat("\n"))))
+        for i in compress(range(len(rows)), errors):
+            rows[i] = self._error_row(lines[i], errors[i])
+        self.stream.write("".join(rows))
+
+    def _error_row(self, line, error) -> str:
+        if self.fmt == "jsonl":
+            return json.dumps({"line": line, "error": error}, ensure_ascii=False) + "\n"
+        return _csv_line((line,) + ("",) * len(RESULT_FIELDS) + (error,), "\n")
+
+
+def format_results(results: dict) -> list:
+    """The RESULT_FIELDS columns of rate_chunk output as lists of text (repr)."""
+    return [_column_texts(results[name]) for name in RESULT_FIELDS]
+
+
+def format_rows(results: dict) -> list:
+    """The RESULT_FIELDS of each row of rate_chunk output as CSV text."""
+    return list(map(",".join, zip(*format_results(results))))
+
+
+def _column_texts(values) -> list:
+    if values.dtype.kind != "f":
+        return list(map(str, values.tolist()))
+    # Sizes, fittings and flows repeat, and so do many results (leq_ft,
+    # pdcf, f_factor): format each distinct value once. np.unique keeps
+    # one of 0.0 and -0.0, so only when there is no -0.0.
+    sample = values[:_FORMAT_SAMPLE]
+    if 4 * np.unique(sample).size <= sample.size and not np.signbit(values[values == 0]).any():
+        distinct, inverse = np.unique(values, return_inverse=True)
+        return np.array(list(map(repr, distinct.tolist())), dtype=object)[inverse].tolist()
+    return list(map(repr, values.tolist()))
+
+
+def rate_schedule(in_stream, out_stream, in_fmt: str = "csv", out_fmt: str = "csv",
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, on_error=None, workers: int = 1,
+                  friction_solver: str = DEFAULT_FRICTION_SOLVER, use_friction_cache: bool = False,
+                  instrument=None, result_cache=None):
+    """
+    Stream a schedule from in_stream to out_stream chunk by chunk.
+
+    Memory use is bounded by chunk_size (times 2 * workers chunks in flight
+    when workers > 1; chunks are parsed and rated in a process pool and
+    written back in input order). on_error(line, message) is called for
+    every rejected row. Returns (rows_read, rows_rejected). instrument
+    times writing as the format stage; parsing and rating are only timed
+    when workers == 1 (pool workers run in other processes). result_cache
+    requires workers == 1.
+    """
+    if result_cache is not None and workers > 1:
+        raise ValueError("A result cache can only be used with a single worker.")
+    if result_cache is not None and result_cache.friction_solver != friction_solver:
+        raise ValueError("The result cache was opened for a different friction solver.")
+    writer = ScheduleWriter(out_stream, out_fmt)
+    total = rejected = 0
+    chunks = read_chunks(in_stream, in_fmt, chunk_size)
+    if workers > 1:
+        results = _rate_chunks_in_pool(chunks, workers, friction_solver, use_friction_cache)
+    else:
+        results = (rate_chunk(chunk, friction_solver, use_friction_cache, instrument, result_cache)
+                   for chunk in chunks)
+    for lines, errors, columns in results:
+        if instrument is not None:
+            with instrument.stage("format", len(lines)):
+                writer.write_chunk(lines, errors, columns)
+        else:
+            writer.write_chunk(lines, errors, columns)
+        total += len(lines)
+        for line, error in zip(lines, errors):
+            if error:
+                rejected += 1
+                if on_error is not None:
+                    on_error(line, error)
+    return total, rejected
+
+
+def rate_schedule_columns(in_stream, in_fmt: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          friction_solver: str = DEFAULT_FRICTION_SOLVER):
+    """
+    Rate a whole schedule into memory, for display rather than streaming.
+    Returns (lines, errors, results) like rate_chunk, with the chunks
+    concatenated: an int array of line numbers, a list of error messages
+    and a dict of columns keyed by RESULT_FIELDS.
+    """
+    lines, errors = [], []
+    parts = {name: [] for name in RESULT_FIELDS}
+    for chunk in read_chunks(in_stream, in_fmt, chunk_size):
+        chunk_lines, chunk_errors, columns = rate_chunk(chunk, friction_solver)
+        lines.extend(chunk_lines)
+        errors.extend(chunk_errors)
+        for name in RESULT_FIELDS:
+            parts[name].append(columns[name])
+    results = {name: np.concatenate(parts[name]) if parts[name] else np.empty(0) for name in RESULT_FIELDS}
+    return np.asarray(lines, dtype=np.int64), errors, results
+
+
+def _rate_chunks_in_pool(chunks, workers: int, friction_solver: str, use_friction_cache: bool):
+    # Sliding window of futures: keeps every core busy while only a bounded
+    # number of chunks is ever held in memory, and yields in submission order.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(rate_chunk, chunk, friction_solver, use_friction_cache))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,447 @@
+# core/service.py
+# Local JSON calculation service (asyncio, standard library only).
+#
+#   python -m core.service --port 8765
+#
+# Endpoints (JSON in, JSON out; records use the schedule fields of
+# core/schedule.py, INPUT_FIELDS, plus an optional "friction_solver"):
+#   POST /calculate  one record            -> result fields
+#   POST /batch      {"rows": [...]} or a JSON Lines body -> JSON Lines
+#                    (for JSON Lines, ?friction_solver=... selects the model)
+#   POST /size       one record + limits   -> smallest standard diameter
+#   POST /sweep      {"base": record, "x": axis, "y": axis} -> ΔP grid
+#   GET  /metrics    latency percentiles, throughput, micro-batch sizes
+#   GET  /health
+#
+# Concurrent /calculate requests are coalesced into micro-batches and rated
+# with one call to the batch kernel. /batch responses larger than one chunk
+# are streamed with chunked transfer encoding, one rated chunk at a time.
+# The server only binds to loopback addresses.
+import argparse
+import asyncio
+import io
+import json
+import math
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+from core.calculations import size_flexible_duct
+from core.friction import DEFAULT_FRICTION_SOLVER, check_solver
+from core.inputs import parse_params
+from core.schedule import DEFAULT_CHUNK_SIZE, RESULT_FIELDS, ScheduleWriter, iter_chunks, iter_records, rate_chunk
+from core.sweep import SWEEP_PARAMETERS, axis_values, sweep_pressure_loss
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY_S = 0.002
+MAX_BODY_BYTES = 256 * 1024 * 1024
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+_LATENCY_WINDOW = 4096
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _finite(value):
+    # JSON has no inf/nan; report them as null like the schedule writer
+    return value if math.isfinite(value) else None
+
+
+def _solver(body: dict) -> str:
+    solver = body.get("friction_solver", DEFAULT_FRICTION_SOLVER)
+    check_solver(solver)
+    return solver
+
+
+def _object(body) -> dict:
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object.")
+    return body
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+class ServiceMetrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.endpoints = {}
+        self.batches = 0
+        self.batched_requests = 0
+        self.largest_batch = 0
+
+    def record(self, endpoint: str, seconds: float, rows: int, ok: bool):
+        entry = self.endpoints.get(endpoint)
+        if entry is None:
+            entry = self.endpoints[endpoint] = {
+                "requests": 0, "errors": 0, "rows": 0, "latencies": deque(maxlen=_LATENCY_WINDOW),
+            }
+        entry["requests"] += 1
+        entry["rows"] += rows
+        entry["errors"] += 0 if ok else 1
+        entry["latencies"].append(seconds)
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.batched_requests += size
+        self.largest_batch = max(self.largest_batch, size)
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started
+        endpoints = {}
+        for name, entry in self.endpoints.items():
+            latencies = sorted(entry["latencies"])
+            endpoints[name] = {
+                "requests": entry["requests"],
+                "errors": entry["errors"],
+                "rows": entry["rows"],
+                "requests_per_s": entry["requests"] / uptime,
+                "rows_per_s": entry["rows"] / uptime,
+                **{f"p{p}_ms": _percentile(latencies, p) * 1e3 for p in (50, 90, 99)},
+            }
+        return {
+            "uptime_s": uptime,
+            "endpoints": endpoints,
+            "micro_batching": {
+                "batches": self.batches,
+                "requests": self.batched_requests,
+                "mean_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+            },
+        }
+
+
+def _percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100.0 * len(sorted_values)))]
+
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    """
+    Collects single-record requests for at most max_delay seconds (or until
+    max_batch are waiting) and rates them together with rate_chunk, one
+    batch-kernel call per friction solver, run in the default executor so
+    the event loop keeps accepting requests. Invalid records only fail their
+    own request.
+    """
+
+    def __init__(self, metrics: ServiceMetrics, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY_S):
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._batches = set()
+
+    async def submit(self, record: dict, friction_solver: str) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, friction_solver, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.metrics.record_batch(len(pending))
+        # Keep a reference so the task is not collected while it runs
+        task = asyncio.get_running_loop().create_task(self._rate(pending))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _rate(self, pending):
+        loop = asyncio.get_running_loop()
+        by_solver = {}
+        for item in pending:
+            by_solver.setdefault(item[1], []).append(item)
+        for solver, items in by_solver.items():
+            try:
+                _, errors, results = await loop.run_in_executor(
+                    None, rate_chunk, [(i, record) for i, (record, _, _) in enumerate(items)], solver,
+                )
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            columns = [results[name].tolist() for name in RESULT_FIELDS]
+            for i, (_, _, future) in enumerate(items):
+                if future.done():  # client went away
+                    continue
+                if errors[i]:
+                    future.set_exception(ValueError(errors[i]))
+                else:
+                    future.set_result({name: _finite(col[i]) for name, col in zip(RESULT_FIELDS, columns)})
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class CalculationService:
+    def __init__(self, max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY_S,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self.metrics, max_batch, max_delay)
+        self.chunk_size = chunk_size
+        self.routes = {
+            ("POST", "/calculate"): self.calculate,
+            ("POST", "/batch"): self.batch,
+            ("POST", "/size"): self.size,
+            ("POST", "/sweep"): self.sweep,
+            ("GET", "/metrics"): self.get_metrics,
+            ("GET", "/health"): self.health,
+        }
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"The calculation service only binds to loopback ({', '.join(LOOPBACK_HOSTS)}).")
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                await self._dispatch(method, url.path, query, headers, body, writer)
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            await _send_json(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, query, headers, body, writer):
+        start = time.perf_counter()
+        handler = self.routes.get((method, path))
+        rows, ok = 0, False
+        try:
+            if handler is None:
+                status = 405 if any(p == path for _, p in self.routes) else 404
+                raise HTTPError(status, f"No endpoint {method} {path}")
+            rows = await handler(query, headers, body, writer)
+            ok = True
+        except HTTPError as e:
+            await _send_json(writer, e.status, {"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+            await _send_json(writer, 400, {"error": message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            await _send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            self.metrics.record(path, time.perf_counter() - start, rows, ok)
+
+    # -----------------------------
+    # Endpoints; each returns the number of rows it rated
+    # -----------------------------
+    async def calculate(self, query, headers, body, writer) -> int:
+        record = _object(_json(body))
+        result = await self.batcher.submit(record, _solver(record))
+        await _send_json(writer, 200, result)
+        return 1
+
+    async def batch(self, query, headers, body, writer) -> int:
+        if headers.get("content-type", "").startswith("application/x-ndjson"):
+            solver = _solver(query)
+            records = iter_records(io.StringIO(body.decode("utf-8")), "jsonl")
+        else:
+            request = _object(_json(body))
+            rows = request.get("rows")
+            if not isinstance(rows, list):
+                raise ValueError('Batch body must have a "rows" list (or be JSON Lines).')
+            solver = _solver(request)
+            records = ((i, record if isinstance(record, dict) else ValueError("Each row must be an object."))
+                       for i, record in enumerate(rows, start=1))
+        chunks = iter_chunks(records, self.chunk_size)
+        loop = asyncio.get_running_loop()
+        first = next(chunks, [])
+        first_rated = await loop.run_in_executor(None, rate_chunk, first, solver)
+        following = next(chunks, None)
+        if following is None:
+            # Fits in one chunk: a plain response with Content-Length
+            await _send(writer, 200, _jsonl(first_rated), "application/x-ndjson")
+            return len(first)
+
+        writer.write(_head(200, "application/x-ndjson", chunked=True))
+        rows = 0
+        chunk, rated = following, first_rated
+        while True:
+            # Rate the next chunk while the previous one is being sent
+            pending = loop.run_in_executor(None, rate_chunk, chunk, solver) if chunk is not None else None
+            payload = _jsonl(rated)
+            writer.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+            await writer.drain()
+            rows += len(rated[0])
+            if pending is None:
+                break
+            rated = await pending
+            chunk = next(chunks, None)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return rows
+
+    async def size(self, query, headers, body, writer) -> int:
+        request = _object(_json(body))
+        params = parse_params(dict(request, duct_diameter_in=request.get("duct_diameter_in", 0)))
+        del params["duct_diameter_in"]
+        limits = {name: None if request.get(name) is None else float(request[name])
+                  for name in ("max_pressure_loss", "max_friction_rate", "max_velocity_fpm")}
+        if all(value is None for value in limits.values()):
+            raise ValueError("Give at least one of max_pressure_loss, max_friction_rate, max_velocity_fpm.")
+        solver = _solver(request)
+        diameter, velocity, dp, details = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: size_flexible_duct(**params, **limits, friction_solver=solver)
+        )
+        await _send_json(writer, 200, {
+            "duct_diameter_in": diameter,
+            "velocity_fpm": _finite(velocity),
+            "total_pressure_loss": _finite(dp),
+            "details": {k: _finite(v) if isinstance(v, float) else v for k, v in details.items()},
+        })
+        return 1
+
+    async def sweep(self, query, headers, body, writer) -> int:
+        request = _object(_json(body))
+        params = parse_params(_object(request.get("base")))
+        axes = []
+        for key in ("x", "y"):
+            axis = _object(request.get(key))
+            if axis.get("name") not in SWEEP_PARAMETERS:
+                raise ValueError(f'{key}.name must be one of: {", ".join(SWEEP_PARAMETERS)}.')
+            axes.append((axis["name"], axis_values(float(axis["start"]), float(axis["stop"]), int(axis["steps"]))))
+        (x_name, x_values), (y_name, y_values) = axes
+        solver = _solver(request)
+        grid = await asyncio.get_running_loop().run_in_executor(
+            None, sweep_pressure_loss, params, x_name, x_values, y_name, y_values, solver
+        )
+        await _send_json(writer, 200, {
+            "x": {"name": x_name, "values": x_values.tolist()},
+            "y": {"name": y_name, "values": y_values.tolist()},
+            "total_pressure_loss": [[_finite(v) for v in row] for row in grid.tolist()],
+        })
+        return int(grid.size)
+
+    async def get_metrics(self, query, headers, body, writer) -> int:
+        await _send_json(writer, 200, self.metrics.snapshot())
+        return 0
+
+    async def health(self, query, headers, body, writer) -> int:
+        await _send_json(writer, 200, {"status": "ok"})
+        return 0
+
+
+def _json(body: bytes):
+    try:
+        return json.loads(body or b"null")
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid JSON: {e}")
+
+
+def _jsonl(rated) -> bytes:
+    out = io.StringIO()
+    ScheduleWriter(out, "jsonl").write_chunk(*rated)
+    return out.getvalue().encode("utf-8")
+
+
+async def _read_request(reader):
+    """(method, target, headers, body), or None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = b""
+    if "content-length" in headers:
+        value = headers["content-length"]
+        if not (value.isascii() and value.isdigit()):
+            raise HTTPError(400, f"Invalid Content-Length '{value}'")
+        length = int(value)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length)
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        raise HTTPError(411, "Chunked request bodies are not supported; send Content-Length")
+    return method.upper(), target, headers, body
+
+
+def _head(status: int, content_type: str, length: int = None, chunked: bool = False) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}"]
+    lines.append("Transfer-Encoding: chunked" if chunked else f"Content-Length: {length}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send(writer, status: int, payload: bytes, content_type: str):
+    writer.write(_head(status, content_type, len(payload)) + payload)
+    await writer.drain()
+
+
+async def _send_json(writer, status: int, obj):
+    await _send(writer, status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json")
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options):
+    service = CalculationService(**options)
+    server = await service.start(host, port)
+    addresses = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+    print(f"Calculation service listening on {addresses}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON calculation service (loopback only).")
+    parser.add_argument("--host", default=DEFAULT_HOST, choices=LOOPBACK_HOSTS)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help=f"most /calculate requests rated together (default {DEFAULT_MAX_BATCH})")
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY_S * 1e3,
+                        help=f"longest wait for a micro-batch to fill (default {DEFAULT_MAX_DELAY_S * 1e3:g} ms)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per streamed /batch chunk (default {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, max_batch=args.max_batch,
+                          max_delay=args.max_delay_ms / 1e3, chunk_size=args.chunk_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# core/shapes.py
+# Rectangular and flat-oval ducts, rated by the flexible duct batch kernel
+# (core/batch.py) through a round equivalent.
+#
+# A non-round duct is handed to the kernel as a round duct of one of two
+# diameters:
+#   huebscher  equivalent diameter at equal flow and friction loss
+#              (ASHRAE Fundamentals, Duct Design):
+#                rectangular  De = 1.30 (a b)^0.625 / (a + b)^0.25
+#                flat oval    De = 1.55 A^0.625 / P^0.25
+#              rated at the actual air flow;
+#   hydraulic  Dh = 4 A / P, rated at the actual velocity (the kernel's
+#              flow is scaled by the area of the round Dh duct over A).
+# with A the cross-section and P the perimeter (in., in²); a flat oval of
+# major axis a (width) and minor axis b (height) has
+#   A = π b² / 4 + b (a - b),   P = π b + 2 (a - b).
+# The reported area and velocity are always those of the actual section.
+# Non-round ducts are sheet metal, so they take no compression.
+#
+# Both diameters are precomputed for every standard size
+# (EquivalentDiameterTable, shared via default_size_table()), so the
+# non-round rows of a mixed schedule cost an index computation and a
+# gather on top of the round-duct kernel, and round rows cost nothing
+# extra; off-table sizes fall back to the formulas.
+import math
+
+import numpy as np
+
+from core.batch import BATCH_COLUMNS, calculate_flexible_duct_batch
+from core.friction import (
+    DEFAULT_FRICTION_SOLVER, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, FRICTION_SOLVERS,
+)
+
+# Shape name -> label; "round" is the flexible duct of core/calculations.py
+SHAPES = {
+    "round": "Round (flexible)",
+    "rectangular": "Rectangular",
+    "flat_oval": "Flat Oval",
+}
+_SHAPE_CODES = {name: code for code, name in enumerate(SHAPES)}
+_ROUND, _RECTANGULAR, _FLAT_OVAL = range(3)
+# Huebscher coefficient on A^0.625 / P^0.25; 1.30 · 2^0.25 is the
+# rectangular formula in terms of a·b and a + b
+_HUEBSCHER = np.array([np.nan, 1.30 * 2 ** 0.25, 1.55])
+
+EQUIVALENT_METHODS = {
+    "huebscher": "Huebscher equivalent diameter",
+    "hydraulic": "Hydraulic diameter",
+}
+DEFAULT_EQUIVALENT_METHOD = "huebscher"
+
+# Long side / short side. The equivalent-diameter correlations were
+# established up to 8:1; above 4:1 the loss per unit of area rises quickly
+MAX_ASPECT_RATIO = 8.0
+RECOMMENDED_ASPECT_RATIO = 4.0
+
+# Nominal rectangular sides and flat oval axes (in), ascending and evenly spaced
+STANDARD_SIDES_IN = tuple(range(4, 62, 2))
+
+# Columns added by calculate_duct_batch to the kernel's BATCH_COLUMNS
+SHAPE_COLUMNS = {
+    "hydraulic_diameter_in": "Hydraulic Diameter (in)",
+    "equivalent_diameter_in": "Equivalent Diameter (in)",
+    "aspect_ratio": "Aspect Ratio",
+}
+
+
+def check_method(method: str):
+    if method not in EQUIVALENT_METHODS:
+        raise ValueError(f"Unknown diameter method '{method}'; expected one of: {', '.join(EQUIVALENT_METHODS)}.")
+
+
+def shape_codes(shape):
+    """
+    Shape names (a name or a sequence of names) as integer codes; integer
+    arrays are taken to be codes already.
+    """
+    if isinstance(shape, str):
+        if shape not in _SHAPE_CODES:
+            raise ValueError(f"Unknown duct shape '{shape}'; expected one of: {', '.join(SHAPES)}.")
+        return _SHAPE_CODES[shape]
+    names = np.asarray(shape)
+    if names.dtype.kind in "iu":
+        return names.astype(np.intp, copy=False)
+    # One comparison per shape beats sorting strings (np.unique); round
+    # is matched first and the rest only among the other rows
+    codes = np.zeros(names.shape, dtype=np.intp)
+    other = np.flatnonzero(names.ravel() != "round")
+    if other.size:
+        rest = names.ravel()[other]
+        found = np.zeros(other.size, dtype=bool)
+        for name in SHAPES:
+            if name != "round":
+                match = rest == name
+                codes.ravel()[other[match]] = _SHAPE_CODES[name]
+                found |= match
+        if not found.all():
+            raise ValueError(f"Unknown duct shape '{rest[~found][0]}'; expected one of: {', '.join(SHAPES)}.")
+    return codes
+
+
+def _area_perimeter(codes, width_in, height_in):
+    # Rectangular and flat oval only (in², in.)
+    w = np.asarray(width_in, dtype=np.float64)
+    h = np.asarray(height_in, dtype=np.float64)
+    oval = np.asarray(codes) == _FLAT_OVAL
+    area = np.where(oval, math.pi * h * h / 4.0 + h * (w - h), w * h)
+    perimeter = np.where(oval, math.pi * h + 2.0 * (w - h), 2.0 * (w + h))
+    return area, perimeter
+
+
+def _diameters(codes, width_in, height_in):
+    area, perimeter = _area_perimeter(codes, width_in, height_in)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hydraulic = 4.0 * area / perimeter
+        equivalent = _HUEBSCHER[codes] * area ** 0.625 / perimeter ** 0.25
+    return hydraulic, equivalent
+
+
+def hydraulic_diameter(shape: str, width_in, height_in):
+    """Hydraulic diameter 4 A / P (in.) of a rectangular or flat oval section."""
+    return _diameters(shape_codes(shape), width_in, height_in)[0]
+
+
+def huebscher_diameter(shape: str, width_in, height_in):
+    """Round duct diameter (in.) with the same flow and friction loss (Huebscher)."""
+    return _diameters(shape_codes(shape), width_in, height_in)[1]
+
+
+def aspect_ratio(width_in, height_in):
+    w = np.asarray(width_in, dtype=np.float64)
+    h = np.asarray(height_in, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(w, h) / np.minimum(w, h)
+
+
+def check_duct_shape(shape, width_in, height_in):
+    """
+    Raise ValueError unless every rectangular or flat oval row has positive
+    sides, a flat oval is at least as wide as it is high (width is the
+    major axis) and the aspect ratio is at most MAX_ASPECT_RATIO. Round
+    rows are not checked.
+    """
+    codes, w, h = np.broadcast_arrays(np.atleast_1d(shape_codes(shape)),
+                                      np.atleast_1d(np.asarray(width_in, dtype=np.float64)),
+                                      np.atleast_1d(np.asarray(height_in, dtype=np.float64)))
+    rows = np.flatnonzero(codes != _ROUND)
+    if rows.size:
+        _check_sizes(codes[rows], w[rows], h[rows])
+
+
+def _check_sizes(codes, w, h):
+    # check_duct_shape for non-round rows only
+    if not ((w > 0) & (h > 0) & np.isfinite(w) & np.isfinite(h)).all():
+        raise ValueError("Width (in) and Height (in) must be positive numbers.")
+    if ((codes == _FLAT_OVAL) & (w < h)).any():
+        raise ValueError("Flat oval width (major axis) must be at least its height (minor axis).")
+    ratio = aspect_ratio(w, h)
+    if (ratio > MAX_ASPECT_RATIO).any():
+        raise ValueError(f"Aspect ratio must be at most {MAX_ASPECT_RATIO:g}:1 "
+                         f"(got {ratio.max():.1f}:1).")
+
+
+class EquivalentDiameterTable:
+    """
+    Hydraulic and Huebscher diameters of every standard rectangular and
+    flat oval size (each pair of STANDARD_SIDES_IN), stored flat for take().
+    lookup() gathers on-table rows by index and evaluates the formulas only
+    for the rest.
+    """
+
+    def __init__(self, sides=STANDARD_SIDES_IN):
+        sides = np.array(sorted(sides), dtype=np.float64)
+        steps = np.diff(sides)
+        if sides.size < 2 or not np.allclose(steps, steps[0]):
+            raise ValueError("Standard sides must be at least two evenly spaced sizes.")
+        self.sides = sides
+        self.lo, self.step, self.size = float(sides[0]), float(steps[0]), sides.size
+        w, h = np.meshgrid(sides, sides, indexing="ij")
+        hydraulic, equivalent = [], []
+        for code in (_RECTANGULAR, _FLAT_OVAL):
+            dh, de = _diameters(np.full(w.shape, code), w, h)
+            # Flat ovals narrower than they are high do not exist
+            valid = (w >= h) if code == _FLAT_OVAL else np.ones(w.shape, dtype=bool)
+            hydraulic.append(np.where(valid, dh, np.nan))
+            equivalent.append(np.where(valid, de, np.nan))
+        self._hydraulic = np.ascontiguousarray(np.stack(hydraulic).ravel())
+        self._equivalent = np.ascontiguousarray(np.stack(equivalent).ravel())
+
+    def _index(self, value):
+        pos = (value - self.lo) * (1.0 / self.step)
+        i = np.rint(pos)
+        on = (np.abs(pos - i) <= 1e-9) & (i >= 0) & (i < self.size)
+        return np.where(on, i, 0).astype(np.intp), on
+
+    def lookup(self, codes, width_in, height_in):
+        """(hydraulic, Huebscher) diameters (in.) for rectangular/flat oval rows."""
+        codes = np.asarray(codes, dtype=np.intp)
+        w = np.asarray(width_in, dtype=np.float64)
+        h = np.asarray(height_in, dtype=np.float64)
+        iw, on_w = self._index(w)
+        ih, on_h = self._index(h)
+        index = ((codes - _RECTANGULAR) * self.size + iw) * self.size + ih
+        hydraulic = self._hydraulic.take(index)
+        equivalent = self._equivalent.take(index)
+        off = np.flatnonzero(~(on_w & on_h))
+        if off.size:
+            hydraulic[off], equivalent[off] = _diameters(codes[off], w[off], h[off])
+        return hydraulic, equivalent
+
+
+_default_table = None
+
+
+def default_size_table() -> EquivalentDiameterTable:
+    """The standard-size table used by the calculations, built on first use."""
+    global _default_table
+    if _default_table is None:
+        _default_table = EquivalentDiameterTable()
+    return _default_table
+
+
+def round_equivalent(shape, width_in, height_in, duct_diameter_in, air_flow_cfm,
+                     method: str = DEFAULT_EQUIVALENT_METHOD):
+    """
+    Kernel inputs for ducts of any shape. Returns (duct_diameter_in,
+    air_flow_cfm, geometry): the round diameter and flow to rate each row
+    at, and a dict of SHAPE_COLUMNS arrays plus the positions of the
+    non-round rows ("rows") and their actual "area_ft2", for
+    apply_geometry. Round rows pass through unchanged. Raises ValueError
+    for sizes that fail check_duct_shape.
+    """
+    check_method(method)
+    codes = shape_codes(shape)
+    n = max(np.size(codes), np.size(width_in), np.size(height_in), np.size(duct_diameter_in), np.size(air_flow_cfm))
+    codes = np.broadcast_to(codes, (n,))
+    d = np.array(np.broadcast_to(np.asarray(duct_diameter_in, dtype=np.float64), (n,)))
+    cfm = np.array(np.broadcast_to(np.asarray(air_flow_cfm, dtype=np.float64), (n,)))
+    rows = np.flatnonzero(codes != _ROUND)
+    hydraulic, equivalent, ratio = d.copy(), d.copy(), np.ones(n)
+    area_in2 = np.empty(0)
+    if rows.size:
+        # Everything below touches the non-round rows only
+        c = codes[rows]
+        w = np.broadcast_to(np.asarray(width_in, dtype=np.float64), (n,))[rows]
+        h = np.broadcast_to(np.asarray(height_in, dtype=np.float64), (n,))[rows]
+        _check_sizes(c, w, h)
+        dh, de = default_size_table().lookup(c, w, h)
+        area_in2 = _area_perimeter(c, w, h)[0]
+        hydraulic[rows], equivalent[rows] = dh, de
+        ratio[rows] = aspect_ratio(w, h)
+        if method == "hydraulic":
+            # Same velocity in the round Dh duct as in the actual section
+            d[rows] = dh
+            cfm[rows] *= np.pi * dh * dh / (4.0 * area_in2)
+        else:
+            d[rows] = de
+    geometry = {
+        "hydraulic_diameter_in": hydraulic,
+        "equivalent_diameter_in": equivalent,
+        "aspect_ratio": ratio,
+        "rows": rows,
+        "area_ft2": area_in2 / 144.0,
+    }
+    return d, cfm, geometry
+
+
+def apply_geometry(out: dict, geometry: dict, air_flow_cfm) -> dict:
+    """
+    Put the actual area and velocity of the non-round rows into kernel
+    output columns (replacing those of the round equivalent) and add the
+    SHAPE_COLUMNS. Returns out.
+    """
+    rows = geometry["rows"]
+    if rows.size:
+        area = geometry["area_ft2"]
+        cfm = np.broadcast_to(np.asarray(air_flow_cfm, dtype=np.float64), out["velocity_fpm"].shape)[rows]
+        out["area_ft2"] = np.array(out["area_ft2"])
+        out["area_ft2"][rows] = area
+        out["velocity_fpm"] = np.array(out["velocity_fpm"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["velocity_fpm"][rows] = cfm / area
+    for name in SHAPE_COLUMNS:
+        out[name] = geometry[name]
+    return out
+
+
+def calculate_duct_batch(
+    shape,
+    width_in,
+    height_in,
+    duct_diameter_in,
+    air_flow_cfm,
+    duct_length_ft,
+    bend_counts: dict,
+    roughness_value,
+    compression_percent,
+    safety_factor,
+    method: str = DEFAULT_EQUIVALENT_METHOD,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    friction_cache=None,
+    instrument=None,
+    **conditions,
+) -> dict:
+    """
+    calculate_flexible_duct_batch for a mix of round, rectangular and flat
+    oval ducts in one pass. shape holds shape names (see SHAPES); width_in
+    and height_in size the non-round rows (width is the flat oval's major
+    axis) and duct_diameter_in the round ones, so each may be NaN where
+    unused. Non-round rows are rated through their round equivalent
+    (method, see EQUIVALENT_METHODS) and must not be compressed.
+    conditions are the air condition arguments of the kernel. Returns the
+    kernel columns, with the actual area and velocity, plus SHAPE_COLUMNS.
+    """
+    d, cfm, geometry = round_equivalent(shape, width_in, height_in, duct_diameter_in, air_flow_cfm, method)
+    rows = geometry["rows"]
+    if rows.size and np.any(np.broadcast_to(np.asarray(compression_percent, dtype=np.float64), d.shape)[rows]):
+        raise ValueError("Compression (%) applies to flexible duct only.")
+    out = calculate_flexible_duct_batch(
+        d, cfm, duct_length_ft, bend_counts, roughness_value, compression_percent, safety_factor,
+        friction_solver, tolerance, max_iterations, friction_cache, instrument, **conditions,
+    )
+    return apply_geometry(out, geometry, air_flow_cfm)
+
+
+def calculate_shaped_duct(
+    shape: str,
+    width_in: float,
+    height_in: float,
+    air_flow_cfm: float,
+    duct_length_ft: float,
+    bend_counts: dict,
+    roughness_value: float,
+    safety_factor: float,
+    method: str = DEFAULT_EQUIVALENT_METHOD,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+    duct_diameter_in: float = float("nan"),
+    compression_percent: float = 0.0,
+    **conditions,
+):
+    """
+    One rectangular or flat oval duct, rated through calculate_duct_batch.
+    Returns (velocity_fpm, total_pressure_loss, details) like
+    calculate_flexible_duct; the keyword arguments match
+    core/inputs.parse_duct_params.
+    """
+    out = calculate_duct_batch(
+        shape, width_in, height_in, duct_diameter_in, air_flow_cfm, duct_length_ft, bend_counts,
+        roughness_value, compression_percent, safety_factor, method, friction_solver, **conditions,
+    )
+    value = {name: column[0].item() for name, column in out.items()}
+    details = {
+        "Shape": SHAPES[shape],
+        "Diameter Method": EQUIVALENT_METHODS[method],
+        "Aspect Ratio": value["aspect_ratio"],
+        "Hydraulic Diameter (in)": value["hydraulic_diameter_in"],
+        "Equivalent Diameter (in)": value["equivalent_diameter_in"],
+    }
+    details.update((label, value[name]) for name, label in BATCH_COLUMNS.items())
+    details["Friction Solver"] = FRICTION_SOLVERS[friction_solver]
+    details["Friction Status"] = "OK" if value["f_converged"] else "Friction factor did not converge"
+    return value["velocity_fpm"], value["total_pressure_loss"], details
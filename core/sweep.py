@@ -0,0 +1,117 @@
+# core/sweep.py
+# 2-D parametric sweeps of ΔP over two inputs of calculate_flexible_duct.
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.friction import DEFAULT_FRICTION_SOLVER
+
+SWEEP_PARAMETERS = {
+    "air_flow_cfm": "Air Flow (CFM)",
+    "duct_diameter_in": "Duct Diameter (in)",
+    "duct_length_ft": "Duct Length (ft)",
+    "compression_percent": "Compression (%)",
+}
+MAX_SWEEP_STEPS = 1000
+
+# Axis values are matched after rounding so that ranges rebuilt with
+# linspace reuse previously computed rows/columns despite float noise
+_KEY_DECIMALS = 9
+
+
+def axis_values(start: float, stop: float, steps: int) -> np.ndarray:
+    if not 2 <= steps <= MAX_SWEEP_STEPS:
+        raise ValueError(f"Steps must be between 2 and {MAX_SWEEP_STEPS}.")
+    if start < 0 or stop < 0:
+        raise ValueError("Sweep ranges must be non-negative.")
+    return np.linspace(start, stop, steps)
+
+
+def sweep_pressure_loss(params: dict, x_name: str, x_values, y_name: str, y_values,
+                        friction_solver: str = DEFAULT_FRICTION_SOLVER) -> np.ndarray:
+    """
+    ΔP (in.w.g.) over the grid x_values × y_values with every other input
+    taken from params (calculate_flexible_duct keyword arguments).
+    Returns an array of shape (len(y_values), len(x_values)), evaluated in
+    one call to the batch kernel so it matches the single-point result.
+    """
+    for name in (x_name, y_name):
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Cannot sweep '{name}'. Choose from: {', '.join(SWEEP_PARAMETERS)}.")
+    if x_name == y_name:
+        raise ValueError("Choose two different sweep parameters.")
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    grid_x, grid_y = np.meshgrid(x_values, y_values)
+    args = dict(params)
+    args[x_name] = grid_x.ravel()
+    args[y_name] = grid_y.ravel()
+    out = calculate_flexible_duct_batch(**args, friction_solver=friction_solver)
+    return out["total_pressure_loss"].reshape(grid_y.shape)
+
+
+class SweepGrid:
+    """
+    Sweep result that is updated incrementally.
+
+    update() keeps the previous grid and, when the parameters and one axis
+    are unchanged, only evaluates the rows/columns for axis values that
+    were not computed before (e.g. when a range is extended or shifted by
+    whole steps). Any other change recomputes the full grid.
+    """
+
+    def __init__(self):
+        self.params = None
+        self.x_name = self.y_name = None
+        self.friction_solver = None
+        self.x_values = np.empty(0)
+        self.y_values = np.empty(0)
+        self.values = np.empty((0, 0))
+        self.last_computed_cells = 0
+
+    def update(self, params: dict, x_name: str, x_values, y_name: str, y_values,
+               friction_solver: str = DEFAULT_FRICTION_SOLVER) -> np.ndarray:
+        x_values = np.asarray(x_values, dtype=np.float64)
+        y_values = np.asarray(y_values, dtype=np.float64)
+        same_setup = (
+            params == self.params and (x_name, y_name, friction_solver)
+            == (self.x_name, self.y_name, self.friction_solver)
+        )
+        if same_setup and _same_axis(y_values, self.y_values):
+            values = self._merge(params, x_name, x_values, y_name, y_values, friction_solver, axis=1)
+        elif same_setup and _same_axis(x_values, self.x_values):
+            values = self._merge(params, x_name, x_values, y_name, y_values, friction_solver, axis=0)
+        else:
+            values = sweep_pressure_loss(params, x_name, x_values, y_name, y_values, friction_solver)
+            self.last_computed_cells = values.size
+        self.params = dict(params)
+        self.x_name, self.y_name, self.friction_solver = x_name, y_name, friction_solver
+        self.x_values, self.y_values, self.values = x_values, y_values, values
+        return values
+
+    def _merge(self, params, x_name, x_values, y_name, y_values, friction_solver, axis: int) -> np.ndarray:
+        old_axis = self.x_values if axis == 1 else self.y_values
+        new_axis = x_values if axis == 1 else y_values
+        old_keys = {key: i for i, key in enumerate(np.round(old_axis, _KEY_DECIMALS).tolist())}
+        positions = [old_keys.get(key, -1) for key in np.round(new_axis, _KEY_DECIMALS).tolist()]
+        reused = np.array([p >= 0 for p in positions], dtype=bool)
+        values = np.empty((y_values.size, x_values.size))
+        if reused.any():
+            taken = np.take(self.values, [p for p in positions if p >= 0], axis=axis)
+            if axis == 1:
+                values[:, reused] = taken
+            else:
+                values[reused, :] = taken
+        missing = ~reused
+        if missing.any():
+            if axis == 1:
+                values[:, missing] = sweep_pressure_loss(
+                    params, x_name, x_values[missing], y_name, y_values, friction_solver)
+            else:
+                values[missing, :] = sweep_pressure_loss(
+                    params, x_name, x_values, y_name, y_values[missing], friction_solver)
+        self.last_computed_cells = int(missing.sum()) * (y_values.size if axis == 1 else x_values.size)
+        return values
+
+
+def _same_axis(a: np.ndarray, b: np.ndarray) -> bool:
+    return a.shape == b.shape and np.array_equal(np.round(a, _KEY_DECIMALS), np.round(b, _KEY_DECIMALS))
@@ -0,0 +1,258 @@
+# core/uncertainty.py
+# Monte Carlo ΔP for uncertain installed conditions (compression, roughness,
+# length and bend counts), evaluated in chunks with bounded memory.
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.calculations import calculate_flexible_duct
+from core.fittings import FLEX_BEND_IDS
+from core.friction import DEFAULT_FRICTION_SOLVER
+
+# Sampled inputs, in the order their random streams are spawned from the seed
+UNCERTAIN_PARAMETERS = {
+    "compression_percent": "Compression (%)",
+    "roughness_value": "Roughness",
+    "duct_length_ft": "Duct Length (ft)",
+    "bend_45": "45° Bends",
+    "bend_90": "90° Bends",
+    "bend_180": "180° Bends",
+}
+# Distribution name -> number of parameters after the name
+DISTRIBUTIONS = {
+    "fixed": 1,        # ("fixed", value)
+    "uniform": 2,      # ("uniform", low, high)
+    "triangular": 3,   # ("triangular", low, mode, high)
+    "normal": 2,       # ("normal", mean, std), clipped at 0
+    "lognormal": 2,    # ("lognormal", median, sigma of ln)
+    "integer": 2,      # ("integer", low, high), inclusive; for bend counts
+}
+MAX_MONTE_CARLO_SAMPLES = 1_000_000
+DEFAULT_CHUNK_SIZE = 65_536
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def check_distribution(name: str, spec):
+    if name not in UNCERTAIN_PARAMETERS:
+        raise ValueError(f"Cannot sample '{name}'. Choose from: {', '.join(UNCERTAIN_PARAMETERS)}.")
+    if not spec or spec[0] not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution for {name}. Choose from: {', '.join(DISTRIBUTIONS)}.")
+    kind, args = spec[0], spec[1:]
+    if len(args) != DISTRIBUTIONS[kind]:
+        raise ValueError(f"A {kind} distribution takes {DISTRIBUTIONS[kind]} parameter(s), got {len(args)}.")
+    if kind in ("uniform", "integer") and args[0] > args[1]:
+        raise ValueError(f"{UNCERTAIN_PARAMETERS[name]}: low must not exceed high.")
+    if kind == "triangular" and not args[0] <= args[1] <= args[2]:
+        raise ValueError(f"{UNCERTAIN_PARAMETERS[name]}: expected low <= mode <= high.")
+    if kind in ("normal", "lognormal") and args[1] < 0:
+        raise ValueError(f"{UNCERTAIN_PARAMETERS[name]}: spread must be non-negative.")
+    if kind == "integer" and not name.startswith("bend_"):
+        raise ValueError(f"Integer distributions are only used for bend counts, not {name}.")
+
+
+def _sample(rng: np.random.Generator, spec, n: int) -> np.ndarray:
+    kind, args = spec[0], spec[1:]
+    if kind == "fixed":
+        return np.full(n, float(args[0]))
+    if kind == "uniform":
+        return rng.uniform(args[0], args[1], n)
+    if kind == "triangular":
+        low, mode, high = args
+        if low == high:
+            return np.full(n, float(low))
+        return rng.triangular(low, mode, high, n)
+    if kind == "normal":
+        return np.maximum(rng.normal(args[0], args[1], n), 0.0)
+    if kind == "lognormal":
+        return args[0] * np.exp(rng.normal(0.0, args[1], n))
+    return rng.integers(int(args[0]), int(args[1]), n, endpoint=True).astype(np.float64)
+
+
+def spread_distributions(params: dict, compression: float = 5.0, roughness_pct: float = 30.0,
+                         length_pct: float = 10.0, bends: int = 1) -> dict:
+    """
+    Simple distributions centred on the deterministic inputs in params
+    (calculate_flexible_duct kwargs): triangular ± compression points and
+    ± roughness_pct %, uniform ± length_pct % length and a uniform integer
+    ± bends for each bend type present. Lower bounds are clipped at zero.
+    """
+    c = params["compression_percent"]
+    r = params["roughness_value"]
+    length = params["duct_length_ft"]
+    dists = {
+        "compression_percent": ("triangular", max(c - compression, 0.0), c, c + compression),
+        "roughness_value": ("triangular", r * max(1 - roughness_pct / 100, 0.0), r, r * (1 + roughness_pct / 100)),
+        "duct_length_ft": ("uniform", length * max(1 - length_pct / 100, 0.0), length * (1 + length_pct / 100)),
+    }
+    for angle, count in (params.get("bend_counts") or {}).items():
+        # Bend types that are not in the run, and catalog fittings, stay fixed
+        if angle in FLEX_BEND_IDS and count > 0:
+            dists[f"bend_{angle}"] = ("integer", max(int(count) - bends, 0), int(count) + bends)
+    return dists
+
+
+class StreamingHistogram:
+    """
+    Fixed log-spaced histogram for percentile estimates over any number of
+    values in constant memory. Values at or below lo (including 0) and at
+    or above hi are counted in under/overflow bins; NaN/inf are counted as
+    invalid. Percentiles interpolate log-linearly inside a bin, so the
+    relative error is below one bin width (0.12 % at 2000 bins per decade).
+    Exact count, mean, std, min and max are tracked alongside.
+    """
+
+    def __init__(self, lo: float = 1e-6, hi: float = 1e4, bins_per_decade: int = 2000):
+        if not 0 < lo < hi:
+            raise ValueError("Histogram range must satisfy 0 < lo < hi.")
+        self.log_lo = np.log10(lo)
+        self.bins_per_decade = bins_per_decade
+        self.n_bins = int(np.ceil((np.log10(hi) - self.log_lo) * bins_per_decade))
+        # [underflow, bins..., overflow]
+        self.counts = np.zeros(self.n_bins + 2, dtype=np.int64)
+        self.count = 0
+        self.invalid = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        finite = np.isfinite(values)
+        self.invalid += int(values.size - np.count_nonzero(finite))
+        values = values[finite]
+        if not values.size:
+            return
+        with np.errstate(divide="ignore"):
+            pos = np.floor((np.log10(values) - self.log_lo) * self.bins_per_decade)
+        idx = np.clip(np.nan_to_num(pos, nan=-1.0, neginf=-1.0), -1, self.n_bins) + 1
+        self.counts += np.bincount(idx.astype(np.intp), minlength=self.counts.size)
+
+        # Chan et al. pairwise update of mean and sum of squared deviations
+        n, mean = values.size, float(values.mean())
+        total = self.count + n
+        delta = mean - self.mean
+        self._m2 += float(((values - mean) ** 2).sum()) + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    def _edge(self, i):
+        # Value at the lower edge of fine bin i (0-based, excluding underflow)
+        return 10.0 ** (self.log_lo + np.asarray(i, dtype=np.float64) / self.bins_per_decade)
+
+    def percentile(self, q):
+        """Estimated q-th percentile(s), q in [0, 100]; NaN when empty."""
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+        rank = np.clip(q / 100.0, 0.0, 1.0) * self.count
+        cum = np.cumsum(self.counts)
+        k = np.minimum(np.searchsorted(cum, rank, side="left"), self.counts.size - 1)
+        before = np.where(k > 0, cum[np.maximum(k - 1, 0)], 0)
+        frac = np.where(self.counts[k] > 0, (rank - before) / np.maximum(self.counts[k], 1), 0.0)
+        value = self._edge(k - 1 + frac)
+        value = np.where(k == 0, self.minimum, np.where(k == self.counts.size - 1, self.maximum, value))
+        return np.clip(value, self.minimum, self.maximum)[()]
+
+    def fraction_above(self, threshold: float) -> float:
+        """Estimated share of values greater than threshold."""
+        if self.count == 0:
+            return float("nan")
+        if threshold < self.minimum:
+            return 1.0
+        if threshold >= self.maximum:
+            return 0.0
+        pos = (np.log10(threshold) - self.log_lo) * self.bins_per_decade
+        i = int(np.clip(np.floor(pos), -1, self.n_bins)) + 1
+        within = pos - np.floor(pos) if 0 < i <= self.n_bins else 0.0
+        above = self.counts[i + 1:].sum() + self.counts[i] * (1.0 - within)
+        return float(above) / self.count
+
+    def display_histogram(self, bins: int = 40, lo_q: float = 0.5, hi_q: float = 99.5):
+        """
+        Coarse log-spaced histogram between two percentiles for plotting.
+        Returns (edges, counts), counts as fractions of all valid values.
+        """
+        if self.count == 0:
+            return np.empty(0), np.empty(0)
+        lo, hi = self.percentile([lo_q, hi_q])
+        lo = max(lo, self._edge(0))
+        if not hi > lo:
+            hi = lo * 1.001
+        edges = np.geomspace(lo, hi, bins + 1)
+        # Cumulative count at each edge, interpolated inside fine bins
+        pos = (np.log10(edges) - self.log_lo) * self.bins_per_decade
+        cum = np.concatenate(([0], np.cumsum(self.counts[1:-1]))) + self.counts[0]
+        cum_at = np.interp(pos, np.arange(cum.size), cum)
+        return edges, np.diff(cum_at) / self.count
+
+
+def run_monte_carlo(
+    params: dict,
+    distributions: dict,
+    samples: int = 100_000,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    percentiles=DEFAULT_PERCENTILES,
+    friction_solver: str = DEFAULT_FRICTION_SOLVER,
+) -> dict:
+    """
+    Sample ΔP with the inputs in distributions drawn at random and every
+    other input taken from params (calculate_flexible_duct kwargs).
+
+    Samples are rated chunk_size at a time by the batch kernel and folded
+    into a StreamingHistogram, so memory does not grow with samples. Each
+    sampled input has its own random stream spawned from seed, so a run is
+    reproducible for the same seed, samples and chunk_size, and editing one
+    distribution does not reshuffle the others. Returns a dict with the
+    deterministic ΔP, the requested percentiles, summary statistics, the
+    share of samples above the deterministic value and the histogram.
+    """
+    if not 1 <= samples <= MAX_MONTE_CARLO_SAMPLES:
+        raise ValueError(f"Samples must be between 1 and {MAX_MONTE_CARLO_SAMPLES:,}.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+    for name, spec in distributions.items():
+        check_distribution(name, spec)
+
+    _, deterministic, _ = calculate_flexible_duct(**params, friction_solver=friction_solver)
+    streams = dict(zip(
+        UNCERTAIN_PARAMETERS,
+        (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(UNCERTAIN_PARAMETERS))),
+    ))
+    hist = StreamingHistogram()
+    done = 0
+    while done < samples:
+        n = min(chunk_size, samples - done)
+        args = dict(params)
+        bend_counts = dict(params.get("bend_counts") or {})
+        for name, spec in distributions.items():
+            values = _sample(streams[name], spec, n)
+            if name.startswith("bend_"):
+                bend_counts[name[len("bend_"):]] = values
+            else:
+                args[name] = values
+        args["bend_counts"] = bend_counts
+        out = calculate_flexible_duct_batch(**args, friction_solver=friction_solver)
+        # With nothing sampled the kernel returns a single row
+        hist.add(np.broadcast_to(out["total_pressure_loss"], (n,)))
+        done += n
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "deterministic": deterministic,
+        "percentiles": dict(zip(percentiles, np.atleast_1d(hist.percentile(percentiles)).tolist())),
+        "mean": hist.mean,
+        "std": hist.std,
+        "min": hist.minimum,
+        "max": hist.maximum,
+        "invalid": hist.invalid,
+        "fraction_above_deterministic": hist.fraction_above(deterministic),
+        "histogram": hist,
+    }
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from core.air import (
+    RE_COEFFICIENT, RHO_AIR, AirPropertyTables, air_density, air_properties, air_viscosity, check_conditions,
+)
+from core.calculations import calculate_flexible_duct
+
+
+def test_standard_conditions_use_the_standard_constants():
+    assert air_properties() == (RHO_AIR, RE_COEFFICIENT)
+    assert air_properties(np.zeros(3), np.full(3, 70.0), 0.0) == (RHO_AIR, RE_COEFFICIENT)
+
+
+def test_tables_match_the_formulas():
+    rng = np.random.default_rng(0)
+    altitude = rng.uniform(-1000, 15000, 1000)
+    temperature = rng.uniform(-40, 180, 1000)
+    humidity = rng.uniform(0, 100, 1000)
+    density, _ = AirPropertyTables().lookup(altitude, temperature, humidity)
+    # The tables are scaled so that standard air is exactly RHO_AIR
+    expected = air_density(altitude, temperature, humidity) * RHO_AIR / air_density(0.0, 70.0, 0.0)
+    assert np.max(np.abs(density / expected - 1)) < 2e-5
+    assert AirPropertyTables().lookup(0.0, 70.0, 0.0) == pytest.approx((RHO_AIR, RE_COEFFICIENT), rel=1e-12)
+
+
+def test_density_falls_with_altitude_and_temperature():
+    density = air_properties([0.0, 5000.0, 5000.0], [70.0, 70.0, 100.0], 0.0)[0]
+    assert density[0] > density[1] > density[2]
+    assert air_viscosity(100.0) > air_viscosity(70.0)
+
+
+def test_thin_air_lowers_pressure_loss():
+    _, sea_level, _ = calculate_flexible_duct(8.0, 400.0, 30.0, {"90": 1}, 0.003, 5.0, 1.1)
+    _, denver, details = calculate_flexible_duct(8.0, 400.0, 30.0, {"90": 1}, 0.003, 5.0, 1.1, altitude_ft=5280.0)
+    assert denver < sea_level
+    assert details["Air Density (lb/ft³)"] < RHO_AIR
+
+
+@pytest.mark.parametrize("conditions", [(20000.0, 70.0, 0.0), (0.0, 200.0, 0.0), (0.0, 70.0, float("nan"))])
+def test_conditions_outside_the_tables_are_rejected(conditions):
+    with pytest.raises(ValueError):
+        check_conditions(*conditions)
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.batch import calculate_flexible_duct_batch, size_flexible_duct_batch
+from core.calculations import calculate_flexible_duct, size_flexible_duct
+from core.friction import FRICTION_SOLVERS
+
+
+def _schedule(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "duct_diameter_in": rng.choice([4.0, 6.0, 8.0, 12.0, 16.0], n),
+        "air_flow_cfm": rng.uniform(20, 2000, n),
+        "duct_length_ft": rng.uniform(1, 100, n),
+        "bend_counts": {"90": rng.integers(0, 3, n), "elbow_90_r1": rng.integers(0, 2, n)},
+        "roughness_value": rng.choice([0.003, 0.009, 0.015], n),
+        "compression_percent": rng.uniform(0, 30, n),
+        "safety_factor": 1.1,
+        "altitude_ft": rng.choice([0.0, 5000.0], n),
+        "air_temperature_f": rng.choice([70.0, 95.0], n),
+    }
+
+
+def _row(args, i):
+    row = {name: value[i] if np.ndim(value) else value for name, value in args.items() if name != "bend_counts"}
+    row["bend_counts"] = {f: int(counts[i]) for f, counts in args["bend_counts"].items()}
+    return row
+
+
+@pytest.mark.parametrize("solver", list(FRICTION_SOLVERS))
+def test_batch_matches_scalar(solver):
+    args = _schedule()
+    out = calculate_flexible_duct_batch(**args, friction_solver=solver)
+    for i in range(len(args["air_flow_cfm"])):
+        velocity, dp, details = calculate_flexible_duct(**_row(args, i), friction_solver=solver)
+        assert out["velocity_fpm"][i] == pytest.approx(velocity, rel=1e-12)
+        assert out["total_pressure_loss"][i] == pytest.approx(dp, rel=1e-12)
+        assert out["leq_ft"][i] == pytest.approx(details["Equivalent Length (ft)"], rel=1e-12)
+        assert out["f_iterations"][i] == details["Friction Iterations"]
+        assert out["f_converged"][i] == (details["Friction Status"] == "OK")
+
+
+def test_scalars_broadcast_against_arrays():
+    out = calculate_flexible_duct_batch([6.0, 8.0], 300.0, 25.0, {"90": 2}, 0.003, 10.0, 1.1)
+    assert out["total_pressure_loss"].shape == (2,)
+    _, dp, _ = calculate_flexible_duct(8.0, 300.0, 25.0, {"90": 2}, 0.003, 10.0, 1.1)
+    assert out["total_pressure_loss"][1] == pytest.approx(dp, rel=1e-12)
+
+
+def test_zero_flow_row_fails_like_the_scalar_function():
+    out = calculate_flexible_duct_batch(6.0, [0.0, 300.0], 25.0, {}, 0.003, 10.0, 1.1)
+    _, _, details = calculate_flexible_duct(6.0, 0.0, 25.0, {}, 0.003, 10.0, 1.1)
+    assert out["f_factor"][0] == details["Friction Factor (f)"] == 0.0
+    assert not out["f_converged"][0] and details["Friction Status"] != "OK"
+    assert out["f_converged"][1]
+
+
+def test_zero_area_row_has_infinite_velocity():
+    out = calculate_flexible_duct_batch([0.0, 6.0], 300.0, 25.0, {}, 0.003, 10.0, 1.1)
+    assert math.isinf(out["velocity_fpm"][0])
+    assert not out["f_converged"][0]
+    assert np.isfinite(out["total_pressure_loss"][1])
+
+
+def test_batch_sizing_matches_scalar_sizing():
+    rng = np.random.default_rng(1)
+    cfm = rng.uniform(50, 3000, 40)
+    length = rng.uniform(5, 80, 40)
+    limits = {"max_pressure_loss": 0.25, "max_velocity_fpm": 900.0}
+    out = size_flexible_duct_batch(cfm, length, {"90": 1}, 0.003, 5.0, 1.1, **limits)
+    for i in range(cfm.size):
+        diameter, _, dp, _ = size_flexible_duct(cfm[i], length[i], {"90": 1}, 0.003, 5.0, 1.1, **limits)
+        if diameter is None:
+            assert np.isnan(out["duct_diameter_in"][i])
+        else:
+            assert out["duct_diameter_in"][i] == diameter
+            assert out["total_pressure_loss"][i] == pytest.approx(dp, rel=1e-12)
+
+
+def test_sizing_requires_a_limit():
+    with pytest.raises(ValueError):
+        size_flexible_duct_batch(300.0, 20.0, {}, 0.003, 0.0, 1.1)
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+import benchmarks.__main__ as bench
+
+
+def test_compare_flags_slowdowns_and_missing_baselines():
+    baseline = {"kernel_s": 1.0, "rows_per_s": 1000.0, "gone_s": 1.0}
+    results = {"kernel_s": 1.1, "rows_per_s": 700.0, "gui_startup_s": 0.3}
+    rows = {row[0]: row for row in bench.compare(results, baseline, threshold=0.2)}
+    assert set(rows) == {"kernel_s", "rows_per_s", "gui_startup_s"}
+    assert rows["kernel_s"][3] == pytest.approx(0.1) and not rows["kernel_s"][4]
+    assert rows["rows_per_s"][3] == pytest.approx(1000 / 700 - 1) and rows["rows_per_s"][4]
+    assert rows["gui_startup_s"] == ("gui_startup_s", None, 0.3, None, True)
+    report = bench.format_report(list(rows.values()), 0.2)
+    assert "NO BASELINE" in report and "1 regression(s)" in report
+
+
+def test_main_fails_on_unrecorded_suites(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(bench, "SUITES", {"core": lambda quick: {"kernel_s": 1.0},
+                                          "gui": lambda quick: {"gui_startup_s": 0.5}})
+    baseline = tmp_path / "baseline.json"
+    assert bench.main(["--only", "core", "--baseline", str(baseline), "--save-baseline"]) == 0
+    assert bench.main(["--only", "core", "--baseline", str(baseline)]) == 0
+    assert bench.main(["--baseline", str(baseline)]) == 1
+    assert "NO BASELINE" in capsys.readouterr().out
+    # saving one suite keeps the other suite's metrics
+    assert bench.main(["--only", "gui", "--baseline", str(baseline), "--save-baseline"]) == 0
+    assert json.loads(baseline.read_text())["results"] == {"kernel_s": 1.0, "gui_startup_s": 0.5}
+    assert bench.main(["--baseline", str(baseline)]) == 0
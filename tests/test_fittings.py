@@ -0,0 +1,74 @@
+import csv
+
+import numpy as np
+import pytest
+
+from core.fittings import CATALOG_FIELDS, FittingsCatalog, default_catalog, format_fittings, load_catalog, parse_fittings
+
+
+@pytest.mark.parametrize("diameter", [4.0, 6.0, 12.0, 24.0])
+def test_flex_bends_keep_their_fixed_equivalent_lengths(diameter):
+    # 10/20/40 ft per 45°/90°/180° bend at every size, as before the catalog
+    catalog = default_catalog()
+    assert catalog.resolve({"45": 1}, diameter) == (10.0, 0.0)
+    assert catalog.resolve({"90": 1}, diameter) == (20.0, 0.0)
+    assert catalog.resolve({"180": 1}, diameter) == (40.0, 0.0)
+    assert catalog.resolve({"45": 2, "90": 1, "180": 3}, diameter) == (160.0, 0.0)
+
+
+def test_resolve_batch_and_flex_bend_leq_match_resolve():
+    catalog = default_catalog()
+    rng = np.random.default_rng(0)
+    d = rng.choice([3.0, 4.0, 5.5, 6.0, 9.0, 12.0, 30.0], 50)
+    flex = {"45": rng.integers(0, 4, 50), "90": 2, "180": rng.integers(0, 2, 50)}
+    mixed = {"90": rng.integers(0, 3, 50), "elbow_90_r1.5": rng.integers(0, 3, 50)}
+    assert np.array_equal(catalog.flex_bend_leq(flex, d), catalog.resolve_batch(flex, d)[0])
+    for counts in (flex, mixed):
+        leq, k = catalog.resolve_batch(counts, d)
+        for i in range(d.size):
+            row = {f: int(np.broadcast_to(c, d.shape)[i]) for f, c in counts.items()}
+            assert (leq[i], k[i]) == pytest.approx(catalog.resolve(row, d[i]), rel=1e-12)
+
+
+def test_k_fittings_resolve_to_k():
+    kind, k = default_catalog().value("elbow_90_r1", 8.0)
+    assert kind == "k" and k == pytest.approx(0.22)
+    assert default_catalog().resolve({"elbow_90_r1": 2}, 8.0) == pytest.approx((0.0, 0.44))
+
+
+def test_parse_and_format_fittings_round_trip():
+    counts = parse_fittings("elbow_90_r1.5:2; 90:1, elbow_90_r1.5")
+    assert counts == {"elbow_90_r1.5": 3, "90": 1}
+    assert parse_fittings(format_fittings(counts)) == counts
+    assert parse_fittings({"90": 2.0}) == {"90": 2}
+
+
+@pytest.mark.parametrize("text", ["bogus:2", "90:1.5", "90:-1"])
+def test_parse_fittings_rejects_bad_entries(text):
+    with pytest.raises(ValueError):
+        parse_fittings(text)
+
+
+def test_catalog_csv_round_trip(tmp_path):
+    catalog = default_catalog()
+    path = tmp_path / "catalog.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CATALOG_FIELDS)
+        writer.writerows(catalog.to_rows())
+    loaded = load_catalog(str(path))
+    assert loaded.ids == catalog.ids
+    assert loaded.fingerprint == catalog.fingerprint
+
+
+def test_interpolated_fitting_without_flex_fast_path():
+    catalog = FittingsCatalog((
+        ("45", "Flex", "45", "leq", {4: 10.0, 8: 30.0}),
+        ("90", "Flex", "90", "leq", {4: 20.0}),
+        ("180", "Flex", "180", "leq", {4: 40.0}),
+        ("boot", "Boots", "boot", "k", {4: 1.0, 8: 0.5}),
+    ))
+    assert catalog.resolve({"45": 1}, 6.0) == pytest.approx((20.0, 0.0))
+    assert catalog.resolve({"boot": 2}, 6.0) == pytest.approx((0.0, 1.5))
+    d = np.array([4.0, 6.0, 10.0])
+    assert catalog.flex_bend_leq({"45": 1, "90": 1}, d).tolist() == pytest.approx([30.0, 40.0, 50.0])
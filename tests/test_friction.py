@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.batch import friction_factor_batch
+from core.friction import FRICTION_SOLVERS, friction_factor
+from core.friction_cache import FrictionFactorCache
+
+
+@pytest.mark.parametrize("solver", list(FRICTION_SOLVERS))
+def test_solvers_agree_with_colebrook(solver):
+    reference = friction_factor(1e5, 0.003, 8.0, "colebrook")
+    assert reference.converged and reference.iterations > 0
+    result = friction_factor(1e5, 0.003, 8.0, solver)
+    assert result.converged
+    assert result.f_factor == pytest.approx(reference.f_factor, rel=0.03)
+
+
+@pytest.mark.parametrize("re_number", [0.0, -5.0, math.inf, math.nan])
+def test_invalid_reynolds_number_is_reported(re_number):
+    result = friction_factor(re_number, 0.003, 8.0)
+    assert result == (0.0, 0, False, result.message) and result.message
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError):
+        friction_factor(1e5, 0.003, 8.0, "moody")
+
+
+@pytest.mark.parametrize("solver", list(FRICTION_SOLVERS))
+def test_batch_solver_matches_scalar(solver):
+    re_number = np.array([2e3, 1e4, 1e5, 1e6, 0.0])
+    f, iterations, converged = friction_factor_batch(re_number, 0.009, 6.0, solver)
+    for i, re in enumerate(re_number.tolist()):
+        expected = friction_factor(re, 0.009, 6.0, solver)
+        assert f[i] == pytest.approx(expected.f_factor, rel=1e-12)
+        assert iterations[i] == expected.iterations
+        assert converged[i] == expected.converged
+
+
+def test_friction_cache_interpolates_within_its_error_bound():
+    cache = FrictionFactorCache(min_rows_to_build=0)
+    re_number = np.geomspace(2e3, 5e6, 5000)
+    first = cache.friction_factor_batch(re_number, 0.003, 8.0, "colebrook")
+    assert cache.stats()["builds"] == 1 and cache.hits == 0
+    f, iterations, converged = cache.friction_factor_batch(re_number, 0.003, 8.0, "colebrook")
+    assert cache.hits == re_number.size
+    assert converged.all() and not iterations.any()
+    exact = friction_factor_batch(re_number, 0.003, 8.0, "colebrook")[0]
+    assert np.array_equal(first[0], exact)
+    assert np.max(np.abs(f / exact - 1)) <= cache.max_rel_error
+
+
+def test_friction_cache_evicts_least_recently_used_table():
+    cache = FrictionFactorCache(max_tables=2, min_rows_to_build=0)
+    re_number = np.geomspace(2e3, 5e6, 100)
+    for diameter in (4.0, 6.0, 8.0):
+        cache.friction_factor_batch(re_number, 0.003, diameter, "colebrook")
+    stats = cache.stats()
+    assert stats["tables"] == 2 and stats["evictions"] == 1
@@ -0,0 +1,68 @@
+import math
+import os
+import subprocess
+import sys
+
+import pytest
+
+from core.inputs import (DEFAULT_SAFETY_FACTOR_PERCENT, parse_count, parse_duct_params, parse_inputs,
+                         parse_params)
+from utils.startup import StartupTimer
+
+RAW = {"duct_diameter_in": "8", "air_flow_cfm": "400", "duct_length_ft": "25", "bend_90": "2",
+       "roughness": "Low (0.003)", "compression_percent": "4", "safety_factor_percent": None}
+
+
+def test_gui_and_batch_inputs_agree():
+    inputs, params = parse_inputs(RAW)
+    assert params == parse_params(RAW)
+    assert params["bend_counts"] == {"45": 0, "90": 2, "180": 0}
+    assert params["roughness_value"] == 0.003
+    assert params["safety_factor"] == 1.0 + DEFAULT_SAFETY_FACTOR_PERCENT / 100.0
+    assert inputs["Safety Factor (%)"] == DEFAULT_SAFETY_FACTOR_PERCENT
+    assert inputs["Fittings"] == "None"
+    numbers = parse_params(dict(RAW, roughness=0.009, air_flow_cfm=400, fittings="elbow_90_r1:2"))
+    assert numbers["roughness_value"] == 0.009
+    assert numbers["bend_counts"]["elbow_90_r1"] == 2
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"duct_diameter_in": "eight"}, "Duct Diameter (in) must be a number."),
+    ({"air_flow_cfm": "-5"}, "Air Flow (CFM) must be non-negative."),
+    ({"bend_90": 1.5}, "90° Bends must be a whole number."),
+    ({"roughness": "Rough"}, "Roughness must be a number."),
+])
+def test_invalid_fields_name_the_field(change, message):
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        parse_params(dict(RAW, **change))
+
+
+def test_shaped_ducts_take_width_and_height():
+    round_params = parse_duct_params(RAW)
+    assert round_params["shape"] == "round" and math.isnan(round_params["width_in"])
+    rect = dict(RAW, shape="rectangular", width_in="12", height_in="6", compression_percent="0")
+    params = parse_duct_params(rect)
+    assert math.isnan(params["duct_diameter_in"]) and (params["width_in"], params["height_in"]) == (12.0, 6.0)
+    with pytest.raises(ValueError):
+        parse_duct_params(dict(rect, compression_percent="4"))
+    with pytest.raises(ValueError):
+        parse_duct_params(dict(rect, shape="hexagonal"))
+    assert parse_count(3.0, "n") == 3
+
+
+def test_gui_startup_imports_do_not_load_numpy():
+    code = "import sys, ui.app_root, core.inputs, core.calculations; print('numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert out.stdout.strip() == "False"
+
+
+def test_startup_timer_report():
+    timer = StartupTimer(start=0.0)
+    timer.marks = {"imports": 0.1, "window": 0.2}
+    timer.mark("imports")  # first call wins
+    timer.record_page("Flexible Duct", 0.05)
+    assert timer.report() == {"imports_s": 0.1, "window_s": 0.2, "first_paint_s": None,
+                              "page_build_s": {"Flexible Duct": 0.05}}
+    lines = timer.format().splitlines()
+    assert lines[0] == "Startup timing (s):" and lines[-1].split()[-1] == "—"
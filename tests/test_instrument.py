@@ -0,0 +1,72 @@
+import io
+import json
+
+import numpy as np
+
+from core.batch import calculate_flexible_duct_batch
+from core.calculations import calculate_flexible_duct
+from core.instrument import Instrumentation
+from core.schedule import rate_schedule
+
+SCHEDULE = "duct_diameter_in,air_flow_cfm,duct_length_ft,bend_90\n" + "".join(
+    f"{d},{cfm},20,1\n" for d in (6, 8, 10) for cfm in (200, 400)) + "x,100,20,0\n"
+
+
+class _Clock:
+    # Advances one second per reading so timings are exact
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+def test_stages_and_counters_accumulate():
+    inst = Instrumentation()
+    inst.clock = _Clock()
+    with inst.stage("parse", rows=10):
+        pass
+    with inst.stage("parse", rows=5):
+        pass
+    inst.add("custom", 0.5)
+    inst.count("hits")
+    inst.count("hits", 2)
+    report = inst.report()
+    assert report["stages"]["parse"] == {"calls": 2, "rows": 15, "total_s": 2.0, "mean_ms": 1000.0,
+                                         "rows_per_s": 7.5}
+    assert report["counters"] == {"hits": 3}
+    assert json.loads(inst.to_json()) == report
+    assert inst.summary() == "parse 1000.000 ms · custom 500.000 ms"
+    inst.reset()
+    assert inst.summary() == "No timings recorded"
+
+
+def test_instrumented_calls_return_the_same_results():
+    inst = Instrumentation()
+    scalar = calculate_flexible_duct(8.0, 400.0, 20.0, {"90": 1}, 0.003, 4.0, 1.1, instrument=inst)
+    assert scalar == calculate_flexible_duct(8.0, 400.0, 20.0, {"90": 1}, 0.003, 4.0, 1.1)
+    d = np.array([6.0, 8.0, 10.0])
+    out = calculate_flexible_duct_batch(d, 400.0, 20.0, {"90": 1}, 0.003, 4.0, 1.1, instrument=inst)
+    plain = calculate_flexible_duct_batch(d, 400.0, 20.0, {"90": 1}, 0.003, 4.0, 1.1)
+    for name, values in plain.items():
+        np.testing.assert_array_equal(out[name], values)
+    assert {"friction", "details"} <= set(inst.stages)
+
+
+def test_schedule_stages_count_rows():
+    inst = Instrumentation()
+    timed, plain = io.StringIO(), io.StringIO()
+    assert rate_schedule(io.StringIO(SCHEDULE), timed, instrument=inst) == (7, 1)
+    rate_schedule(io.StringIO(SCHEDULE), plain)
+    assert timed.getvalue() == plain.getvalue()
+    stages = inst.report()["stages"]
+    assert stages["parse"]["rows"] == 7 and stages["format"]["rows"] == 7
+    assert inst.counters["rows_rejected"] == 1
+
+
+def test_profile_call_keeps_the_result_and_a_profile():
+    inst = Instrumentation()
+    assert inst.profile_call(sum, [1, 2, 3]) == 6
+    assert "function calls" in inst.profile_text
+    assert "profile" in inst.report()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from core.calculations import calculate_flexible_duct
+from core.network import DuctNetwork
+
+
+def _network():
+    # fan -> trunk -> (a -> (a1, a2), b)
+    network = DuctNetwork()
+    network.add_segment("trunk", None, 14.0, 30.0, {"90": 1})
+    network.add_segment("a", "trunk", 10.0, 20.0, {"45": 1})
+    network.add_segment("a1", "a", 6.0, 15.0, {"90": 2}, terminal_cfm=150.0)
+    network.add_segment("a2", "a", 8.0, 25.0, {"90": 1}, terminal_cfm=350.0)
+    network.add_segment("b", "trunk", 8.0, 40.0, {"90": 3}, terminal_cfm=300.0)
+    return network
+
+
+def _loss(network, segment_id):
+    s = network.segments[segment_id]
+    return calculate_flexible_duct(s.duct_diameter_in, s.air_flow_cfm, s.duct_length_ft, s.bend_counts,
+                                   s.roughness_value, s.compression_percent, s.safety_factor)[1]
+
+
+def test_flows_and_path_losses_match_the_scalar_function():
+    network = _network()
+    results = network.results()
+    assert dict(zip(results["segment_id"], results["air_flow_cfm"].tolist())) == {
+        "trunk": 800.0, "a": 500.0, "a1": 150.0, "a2": 350.0, "b": 300.0}
+    losses = {s: _loss(network, s) for s in network.segments}
+    expected = {
+        "a1": losses["trunk"] + losses["a"] + losses["a1"],
+        "a2": losses["trunk"] + losses["a"] + losses["a2"],
+        "b": losses["trunk"] + losses["b"],
+    }
+    assert network.path_pressure_losses() == pytest.approx(expected, rel=1e-12)
+    path, total = network.critical_path()
+    worst = max(expected, key=expected.get)
+    assert path[-1] == worst and total == pytest.approx(expected[worst], rel=1e-12)
+    assert network.path_pressure_loss("a2") == pytest.approx(expected["a2"], rel=1e-12)
+
+
+def test_edits_rerate_only_the_segment_and_its_ancestors():
+    network = _network()
+    network.evaluate()
+    assert network.evaluate() == 0
+    network.update_segment("a1", duct_length_ft=30.0)
+    assert network.evaluate() == 1  # its flow did not change
+    network.update_segment("a1", terminal_cfm=200.0)
+    assert network.evaluate() == 3  # a1, a and trunk carry the new flow
+    assert network.segments["trunk"].air_flow_cfm == 850.0
+    fresh = DuctNetwork()
+    for s in network.segments.values():
+        fresh.add_segment(s.segment_id, s.parent.segment_id if s.parent else None, s.duct_diameter_in,
+                          s.duct_length_ft, s.bend_counts, terminal_cfm=s.terminal_cfm)
+    for name, values in fresh.results().items():
+        np.testing.assert_array_equal(network.results()[name], values)
+
+
+def test_removing_a_branch_drops_its_flow():
+    network = _network()
+    network.evaluate()
+    network.remove_segment("a")
+    assert set(network.segments) == {"trunk", "b"}
+    assert network.results()["air_flow_cfm"].tolist() == [300.0, 300.0]
+    assert set(network.path_pressure_losses()) == {"b"}
+
+
+def test_invalid_topologies_are_rejected():
+    network = _network()
+    with pytest.raises(ValueError):
+        network.add_segment("trunk", None, 8.0, 10.0)
+    with pytest.raises(ValueError):
+        network.add_segment("root2", None, 8.0, 10.0)
+    with pytest.raises((KeyError, ValueError)):
+        network.add_segment("c", "missing", 8.0, 10.0)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from core.calculations import STANDARD_FLEX_DIAMETERS_IN
+from core.network import DuctNetwork
+from core.optimize import optimize_diameters, rate_options
+
+
+def _network(seed, n):
+    rng = np.random.default_rng(seed)
+    network = DuctNetwork()
+    for i in range(n):
+        parent = None if i == 0 else int(rng.integers(0, i)) if rng.random() < 0.7 else i - 1
+        network.add_segment(i, parent, 8.0, float(rng.uniform(3, 40)), {"90": int(rng.integers(0, 3))},
+                            0.003, 4.0, 1.1)
+    for s in list(network.segments.values()):
+        if s.is_terminal:
+            network.update_segment(s.segment_id, terminal_cfm=float(rng.uniform(50, 400)))
+    return network
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_feasible_result_meets_the_limits_and_matches_the_network(seed):
+    network = _network(seed, 25 + 10 * seed)
+    result = optimize_diameters(network, 0.6, max_velocity_fpm=3000.0, apply=True)
+    assert result["feasible"]
+    assert result["critical_path_loss"] <= 0.6 * (1 + 1e-9)
+    assert set(result["diameters"]) == set(network.segments)
+    assert all(d in STANDARD_FLEX_DIAMETERS_IN for d in result["diameters"].values())
+    # the optimizer's own path sums agree with the network after apply
+    assert network.path_pressure_losses() == pytest.approx(result["path_losses"], rel=1e-9)
+    velocity = network.results()["velocity_fpm"]
+    assert velocity.max() <= 3000.0
+
+
+def test_repair_leaves_no_single_downsize_feasible():
+    network = _network(7, 30)
+    result = optimize_diameters(network, 0.5)
+    assert result["feasible"]
+    sizes = sorted(STANDARD_FLEX_DIAMETERS_IN)
+    for segment_id, d in result["diameters"].items():
+        smaller = [s for s in sizes if s < d]
+        if not smaller:
+            continue
+        trial = _network(7, 30)
+        for other, size in result["diameters"].items():
+            trial.update_segment(other, duct_diameter_in=size)
+        trial.update_segment(segment_id, duct_diameter_in=smaller[-1])
+        assert trial.critical_path()[1] > 0.5 * (1 + 1e-9)
+
+
+def test_non_monotone_cost_prefers_the_cheaper_larger_size():
+    network = DuctNetwork()
+    network.add_segment("run", None, 6.0, 20.0, terminal_cfm=100.0)
+    sizes = (6.0, 8.0)
+    # with 8 in. cheaper per foot, 6 in. is never worth choosing
+    result = optimize_diameters(network, 10.0, diameters=sizes, cost_per_ft={6.0: 3.0, 8.0: 2.0})
+    assert result["diameters"] == {"run": 8.0}
+    assert result["material"] == pytest.approx(40.0)
+    with pytest.raises(ValueError):
+        optimize_diameters(network, 10.0, diameters=sizes, cost_per_ft={6.0: 3.0})
+
+
+def test_velocity_violations_are_reported():
+    network = _network(3, 55)
+    result = optimize_diameters(network, 0.6, max_velocity_fpm=1200.0)
+    assert not result["feasible"]
+    assert result["velocity_violations"] == [0]
+    assert result["diameters"][0] == max(STANDARD_FLEX_DIAMETERS_IN)
+
+
+def test_infeasible_limit_is_reported_and_not_applied():
+    network = _network(3, 20)
+    before = {s.segment_id: s.duct_diameter_in for s in network.segments.values()}
+    result = optimize_diameters(network, 1e-4, apply=True)
+    assert not result["feasible"]
+    assert {s.segment_id: s.duct_diameter_in for s in network.segments.values()} == before
+
+
+def test_rate_options_is_one_row_per_segment():
+    network = _network(1, 12)
+    table = rate_options(network, (10.0, 6.0, 8.0))
+    assert table["diameters"].tolist() == [6.0, 8.0, 10.0]
+    assert table["pressure_loss"].shape == (12, 3)
+    # larger ducts lose less at the same flow
+    assert np.all(np.diff(table["pressure_loss"], axis=1) < 0)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import core.parallel as parallel
+from core.batch import calculate_flexible_duct_batch
+
+ROWS = 1000
+
+
+def _inputs(seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.choice([4.0, 6.0, 8.0, 10.0, 12.0], ROWS), rng.uniform(50, 900, ROWS), rng.uniform(2, 60, ROWS),
+        {"90": rng.integers(0, 4, ROWS), "45": rng.integers(0, 2, ROWS)},
+        rng.choice([0.0003, 0.003, 0.009], ROWS), rng.uniform(0, 30, ROWS), 1.1,
+    )
+
+
+def test_chunk_size_is_floored_and_capped():
+    assert parallel.parallel_chunk_size(10, 4) == parallel.MIN_PARALLEL_CHUNK_SIZE
+    assert parallel.parallel_chunk_size(10**8, 2) == parallel.MAX_PARALLEL_CHUNK_SIZE
+    assert parallel.parallel_chunk_size(4_000_000, 8) == 4_000_000 // (8 * parallel.CHUNKS_PER_WORKER)
+
+
+def test_sharded_result_equals_the_batch_kernel(monkeypatch):
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 2)
+    args = _inputs()
+    expected = calculate_flexible_duct_batch(*args, altitude_ft=2000.0)
+    with parallel.make_pool(2) as pool:
+        out = parallel.calculate_flexible_duct_parallel(*args, workers=2, chunk_size=128, executor=pool,
+                                                        altitude_ft=2000.0)
+    assert set(out) == set(expected) | {"f_converged"}
+    for name, values in expected.items():
+        np.testing.assert_array_equal(out[name], values, err_msg=name)
+
+
+def test_oversubscribed_or_small_calls_run_in_process(monkeypatch):
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a pool was started")
+
+    monkeypatch.setattr(parallel, "make_pool", no_pool)
+    args = _inputs(1)
+    expected = calculate_flexible_duct_batch(*args)
+    out = parallel.calculate_flexible_duct_parallel(*args, workers=8, chunk_size=10)
+    np.testing.assert_array_equal(out["total_pressure_loss"], expected["total_pressure_loss"])
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 4)
+    out = parallel.calculate_flexible_duct_parallel(*args, workers=4)
+    np.testing.assert_array_equal(out["total_pressure_loss"], expected["total_pressure_loss"])
+
+
+def test_bad_inputs_are_rejected(monkeypatch):
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 2)
+    with pytest.raises(ValueError):
+        parallel.calculate_flexible_duct_parallel(*_inputs(), workers=2, chunk_size=0)
+    args = list(_inputs())
+    args[2] = args[2][:10]
+    with pytest.raises(ValueError):
+        parallel.calculate_flexible_duct_parallel(*args, workers=2, chunk_size=100)
@@ -0,0 +1,123 @@
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from core.batch import calculate_flexible_duct_batch
+from core.project import (
+    HEADER_FILE, INPUT_COLUMNS, RESULT_COLUMNS, DuctProject, append_schedule, inputs_from_params, is_project,
+)
+
+SCHEDULE = """duct_diameter_in,air_flow_cfm,duct_length_ft,bend_90,fittings,compression_percent,altitude_ft,shape,width_in,height_in
+6,100,25,2,,10,,,,
+8,200,30,1,elbow_90_r1:2,,5000,,,
+x,200,30,,,,,,,
+,300,40,1,,,,rectangular,12,8
+10,400,50,,,5,,,,
+"""
+
+
+def _runs(n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return inputs_from_params({
+        "duct_diameter_in": rng.choice([4.0, 6.0, 8.0], n),
+        "air_flow_cfm": rng.uniform(50, 500, n),
+        "duct_length_ft": rng.uniform(5, 50, n),
+        "bend_counts": {"45": 0, "90": rng.integers(0, 3, n), "180": 0},
+        "roughness_value": 0.003,
+        "compression_percent": rng.uniform(0, 20, n),
+        "safety_factor": 1.1,
+        "altitude_ft": 0.0,
+        "air_temperature_f": 70.0,
+        "relative_humidity_pct": 0.0,
+    })
+
+
+def _expected(project, index):
+    rows = project.rows(index)
+    out = calculate_flexible_duct_batch(
+        rows["duct_diameter_in"], rows["air_flow_cfm"], rows["duct_length_ft"],
+        {"45": rows["bend_45"], "90": rows["bend_90"], "180": rows["bend_180"],
+         **{name[len("fitting_"):]: rows[name] for name in rows if name.startswith("fitting_")}},
+        rows["roughness_value"], rows["compression_percent"], rows["safety_factor"],
+        altitude_ft=rows["altitude_ft"], air_temperature_f=rows["air_temperature_f"],
+        relative_humidity_pct=rows["relative_humidity_pct"],
+    )
+    return rows, out
+
+
+def test_append_edit_reopen_round_trip(tmp_path):
+    path = str(tmp_path / "runs.ductproj")
+    with DuctProject.create(path, {"name": "test"}) as project:
+        assert project.add_runs(_runs()) == range(0, 20)
+        assert project.add_runs(_runs(5, seed=1), "colebrook") == range(20, 25)
+        project.edit_runs([3, 21], {"air_flow_cfm": 999.0})
+
+    assert is_project(path)
+    with DuctProject.open(path, read_only=True) as project:
+        assert len(project) == 25
+        assert project.metadata == {"name": "test"}
+        assert project.solver_names(project.column("friction_solver")[[0, 20]]) == ["swamee_jain", "colebrook"]
+        assert project.column("air_flow_cfm")[[3, 21]].tolist() == [999.0, 999.0]
+        rows, out = _expected(project, slice(0, 20))
+        for name in RESULT_COLUMNS:
+            np.testing.assert_array_equal(rows[name], out[name], err_msg=name)
+        with pytest.raises(ValueError):
+            project.add_runs(_runs(1))
+
+
+def test_schedule_append_keeps_round_rows_and_extra_fittings(tmp_path):
+    errors = []
+    with DuctProject.create(str(tmp_path / "p")) as project:
+        total, rejected = append_schedule(project, io.StringIO(SCHEDULE),
+                                          on_error=lambda line, message: errors.append(line))
+        assert (total, rejected) == (5, 2)
+        assert errors == [4, 5]
+        assert len(project) == 3
+        assert project.column("fitting_elbow_90_r1").tolist() == [0, 2, 0]
+        assert project.column("altitude_ft").tolist() == [0.0, 5000.0, 0.0]
+        rows, out = _expected(project, slice(None))
+        for name in RESULT_COLUMNS:
+            np.testing.assert_array_equal(rows[name], out[name], err_msg=name)
+
+
+def test_interrupted_append_leaves_the_project_as_it_was(tmp_path):
+    path = str(tmp_path / "p")
+    with DuctProject.create(path) as project:
+        project.add_runs(_runs(4))
+        before = project.rows(slice(None))
+    # Bytes written to a column without the header commit
+    with open(os.path.join(path, "air_flow_cfm.bin"), "ab") as f:
+        f.write(b"\xff" * 24)
+    with DuctProject.open(path) as project:
+        assert len(project) == 4
+        project.add_runs(_runs(2, seed=3))
+        rows = project.rows(slice(0, 4))
+        for name in INPUT_COLUMNS:
+            np.testing.assert_array_equal(rows[name], before[name])
+        assert project.column("air_flow_cfm")[4:].tolist() == _runs(2, seed=3)["air_flow_cfm"].tolist()
+
+
+def test_version_1_projects_read_as_standard_air(tmp_path):
+    path = str(tmp_path / "p")
+    with DuctProject.create(path) as project:
+        project.add_runs(_runs(3))
+    with open(os.path.join(path, HEADER_FILE), encoding="utf-8") as f:
+        header = json.load(f)
+    header["version"] = 1
+    for name in ("altitude_ft", "air_temperature_f", "relative_humidity_pct", "air_density"):
+        del header["columns"][name]
+    with open(os.path.join(path, HEADER_FILE), "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    with DuctProject.open(path, read_only=True) as project:
+        assert project.column("air_temperature_f").tolist() == [70.0] * 3
+    with DuctProject.open(path) as project:
+        assert project.header["version"] == 2
+        assert project.column("air_density").tolist() == [0.075] * 3
+
+
+def test_open_rejects_other_directories(tmp_path):
+    with pytest.raises(ValueError):
+        DuctProject.open(str(tmp_path))
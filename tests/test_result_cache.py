@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from core.batch import calculate_flexible_duct_batch
+from core.calculations import calculate_flexible_duct
+from core.network import DuctNetwork
+from core.result_cache import CACHED_COLUMNS, MARKER_FILE, ResultCache
+
+
+def _inputs(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.choice([4.0, 6.0, 8.0, 12.0], n),
+        rng.choice([100.0, 200.0, 400.0, 800.0], n),
+        rng.uniform(5, 60, n),
+        {"90": rng.integers(0, 3, n), "elbow_45_r1": rng.integers(0, 2, n)},
+        0.003,
+        rng.choice([0.0, 10.0], n),
+        1.1,
+    )
+
+
+def _assert_same(a, b):
+    assert a.keys() == b.keys()
+    for name in a:
+        np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+        assert a[name].dtype == b[name].dtype, name
+
+
+def test_hits_equal_the_kernel_across_reopen(tmp_path):
+    args = _inputs()
+    expected = calculate_flexible_duct_batch(*args)
+    with ResultCache(str(tmp_path)) as cache:
+        _assert_same(cache.calculate_batch(*args), expected)
+    with ResultCache(str(tmp_path)) as cache:
+        _assert_same(cache.calculate_batch(*args), expected)
+        stats = cache.stats()
+    assert stats["misses"] == 0 and stats["hits"] == len(args[0])
+    assert set(expected) == set(CACHED_COLUMNS)
+
+
+def test_only_new_rows_are_rated(tmp_path):
+    args = _inputs()
+    with ResultCache(str(tmp_path)) as cache:
+        cache.calculate_batch(*args)
+    changed = (args[0], args[1].copy()) + args[2:]
+    changed[1][:10] += 1.0
+    with ResultCache(str(tmp_path)) as cache:
+        _assert_same(cache.calculate_batch(*changed), calculate_flexible_duct_batch(*changed))
+        assert cache.misses == 10
+
+
+def test_air_conditions_are_part_of_the_key(tmp_path):
+    args = _inputs(50)
+    with ResultCache(str(tmp_path)) as cache:
+        cache.calculate_batch(*args)
+        cache.flush()
+        high = cache.calculate_batch(*args, altitude_ft=5000.0)
+        _assert_same(high, calculate_flexible_duct_batch(*args, altitude_ft=5000.0))
+        assert cache.hits == 0
+
+
+def test_scalar_hits_rebuild_the_details(tmp_path):
+    args = (8.0, 400.0, 30.0, {"90": 1}, 0.003, 5.0, 1.1)
+    velocity, dp, details = calculate_flexible_duct(*args)
+    with ResultCache(str(tmp_path)) as cache:
+        assert cache.calculate(*args) == (velocity, dp, details)
+    with ResultCache(str(tmp_path)) as cache:
+        assert cache.calculate(*args) == (velocity, dp, details)
+        assert cache.hits == 1
+
+
+def test_network_results_equal_the_uncached_network(tmp_path):
+    def build(cache=None):
+        network = DuctNetwork(result_cache=cache)
+        network.add_segment("trunk", None, 12.0, 30.0, {"90": 1})
+        network.add_segment("a", "trunk", 8.0, 20.0, {"90": 2}, terminal_cfm=300.0)
+        network.add_segment("b", "trunk", 6.0, 15.0, {}, terminal_cfm=150.0)
+        return network
+
+    expected = build().results()
+    for _ in range(2):
+        with ResultCache(str(tmp_path)) as cache:
+            results = build(cache).results()
+        for name in expected:
+            np.testing.assert_array_equal(results[name], expected[name])
+    assert cache.hits == 3
+    with pytest.raises(ValueError):
+        DuctNetwork("colebrook", result_cache=cache)
+
+
+def test_eviction_keeps_the_cache_bounded(tmp_path):
+    with ResultCache(str(tmp_path), max_entries=100) as cache:
+        cache.calculate_batch(*_inputs(300))
+    assert cache.stats()["entries"] == 100
+    assert cache.evictions > 0
+
+
+def test_stale_formula_directories_are_removed_and_others_kept(tmp_path):
+    stale = tmp_path / "0123456789abcdef"
+    stale.mkdir()
+    (stale / MARKER_FILE).write_text("0123456789abcdef")
+    unrelated = tmp_path / "notes"
+    unrelated.mkdir()
+    ResultCache(str(tmp_path))
+    assert not stale.exists() and unrelated.exists()
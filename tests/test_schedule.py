@@ -0,0 +1,167 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+import cli
+from core.calculations import calculate_flexible_duct
+from core.inputs import parse_duct_params
+from core.result_cache import ResultCache
+from core.schedule import (
+    OUTPUT_FIELDS, RESULT_FIELDS, iter_records, parse_chunk, rate_schedule, rate_schedule_columns, read_chunks,
+)
+from core.shapes import calculate_shaped_duct
+
+SCHEDULE = """duct_diameter_in,air_flow_cfm,duct_length_ft,bend_45,bend_90,bend_180,roughness,compression_percent,safety_factor_percent,fittings,altitude_ft,air_temperature_f,relative_humidity_pct,shape,width_in,height_in,notes
+6,100,25,1,2,0,Low (0.003),10,15,,,,,,,,a
+8,200,30,,,,,,,,5000,90,50,,,,
+-1,100,10,,,,,,,,,,,,,,
+x,100,10,,,,,,,,,,,,,,
+,100,10,,,,,,,,,,,,,,
+6,100,10,1.5,,,,,,,,,,,,,
+6,100,10,,,,0.02,,,,,,,,,,
+6,100,10,,,,bogus,,,,,,,,,,
+6,100,10,,,,,,-5,,,,,,,,
+6,100,10,,,,,,,,99999,,,,,,
+,300,40,,1,,,,,,,,,rectangular,12,8,
+,300,40,,1,,,5,,,,,,rectangular,12,8,
+,300,40,,1,,,,,,,,,flat_oval,8,12,
+,300,40,,1,,,,,,,,,triangle,8,12,
+10,400,50,,,,,,,"elbow_90_r1.5:2; 90:1",,,,,,,"quoted, note"
+10,400,50,,,,,,,"bogus:2",,,,,,,
+
+12,900,60,2,,,,,,,,,,round,,,"multi
+line"
+4,60,12,,,,,,,,,,,,,,
+"""
+
+
+def _rate(text, **kwargs):
+    out = io.StringIO()
+    errors = []
+    totals = rate_schedule(io.StringIO(text), out, on_error=lambda line, message: errors.append((line, message)),
+                           **kwargs)
+    return out.getvalue(), errors, totals
+
+
+def _expected():
+    # Row by row through the scalar functions, as the GUI rates one duct
+    rows = {}
+    for line, record in iter_records(io.StringIO(SCHEDULE), "csv"):
+        required = ("duct_diameter_in",) if record.get("shape", "round") in ("round", "") else ("width_in", "height_in")
+        missing = [name for name in required + ("air_flow_cfm", "duct_length_ft") if name not in record]
+        if missing:
+            rows[line] = f"Missing required field(s): {', '.join(missing)}."
+            continue
+        try:
+            params = parse_duct_params(record)
+        except (ValueError, KeyError) as e:
+            rows[line] = str(e)
+            continue
+        shape = params.pop("shape")
+        width, height = params.pop("width_in"), params.pop("height_in")
+        try:
+            if shape == "round":
+                rows[line] = calculate_flexible_duct(**params)[1]
+            else:
+                del params["duct_diameter_in"]
+                rows[line] = calculate_shaped_duct(shape, width, height, **params)[1]
+        except ValueError as e:
+            rows[line] = str(e)
+    return rows
+
+
+def test_schedule_matches_row_by_row_rating():
+    lines, errors, results = rate_schedule_columns(io.StringIO(SCHEDULE), chunk_size=4)
+    expected = _expected()
+    assert sorted(expected) == lines.tolist()
+    for i, line in enumerate(lines.tolist()):
+        if isinstance(expected[line], str):
+            assert errors[i] == expected[line]
+            assert np.isnan(results["total_pressure_loss"][i])
+        else:
+            assert not errors[i]
+            assert results["total_pressure_loss"][i] == pytest.approx(expected[line], rel=1e-12)
+
+
+@pytest.mark.parametrize("out_fmt", ["csv", "jsonl"])
+def test_output_does_not_depend_on_chunk_size(out_fmt):
+    reference = _rate(SCHEDULE, out_fmt=out_fmt)
+    for chunk_size in (1, 2, 3, 7):
+        assert _rate(SCHEDULE, out_fmt=out_fmt, chunk_size=chunk_size) == reference
+
+
+def test_csv_output_layout():
+    text, errors, (total, rejected) = _rate(SCHEDULE)
+    rows = text.splitlines()
+    assert rows[0] == ",".join(OUTPUT_FIELDS)
+    assert total == len(rows) - 1 == 18
+    assert rejected == len(errors) == 11
+    first = rows[1].split(",")
+    assert first[0] == "2" and first[-1] == ""
+    # Iteration count and convergence flag are integers
+    assert first[OUTPUT_FIELDS.index("f_iterations")] == "0"
+    assert first[OUTPUT_FIELDS.index("f_converged")] == "1"
+    assert float(first[OUTPUT_FIELDS.index("total_pressure_loss")]) == pytest.approx(_expected()[2], rel=1e-15)
+
+
+def test_jsonl_input_rates_like_csv():
+    records = [record for _, record in iter_records(io.StringIO(SCHEDULE), "csv")]
+    jsonl = "".join(json.dumps(record) + "\n" for record in records)
+    csv_text, _, _ = _rate(SCHEDULE, out_fmt="jsonl")
+    jsonl_text, _, _ = _rate(jsonl, in_fmt="jsonl", out_fmt="jsonl")
+    # Line numbers differ (no header, no multi-line cell); the results do not
+    strip = [{k: v for k, v in json.loads(row).items() if k != "line"} for row in csv_text.splitlines()]
+    assert strip == [{k: v for k, v in json.loads(row).items() if k != "line"} for row in jsonl_text.splitlines()]
+
+
+def test_parse_chunk_accepts_records_and_chunks_alike():
+    chunk = next(read_chunks(io.StringIO(SCHEDULE), "csv", 100))
+    pairs = list(iter_records(io.StringIO(SCHEDULE), "csv"))
+    lines_a, errors_a, columns_a, valid_a = parse_chunk(chunk)
+    lines_b, errors_b, columns_b, valid_b = parse_chunk(pairs)
+    assert lines_a == lines_b and errors_a == errors_b
+    assert np.array_equal(valid_a, valid_b)
+    assert columns_a.keys() == columns_b.keys()
+    for name in columns_a:
+        np.testing.assert_array_equal(columns_a[name], columns_b[name], err_msg=name)
+
+
+def test_result_cache_hits_give_identical_output(tmp_path):
+    reference = _rate(SCHEDULE, chunk_size=5)
+    with ResultCache(str(tmp_path)) as cache:
+        assert _rate(SCHEDULE, chunk_size=5, result_cache=cache) == reference
+    cold = cache.stats()  # stores are counted when the with block flushes
+    with ResultCache(str(tmp_path)) as cache:
+        # Another chunking of the same rows: every valid row is a hit
+        assert _rate(SCHEDULE, chunk_size=3, result_cache=cache) == reference
+    warm = cache.stats()
+    valid = reference[2][0] - reference[2][1]
+    assert cold["hits"] == 0 and cold["stores"] == valid
+    assert warm["hits"] == valid and warm["stores"] == 0
+
+
+def test_result_cache_misses_only_changed_rows(tmp_path):
+    edited = SCHEDULE.replace("4,60,12", "4,65,12")
+    with ResultCache(str(tmp_path)) as cache:
+        _rate(SCHEDULE, result_cache=cache)
+    with ResultCache(str(tmp_path)) as cache:
+        assert _rate(edited, result_cache=cache) == _rate(edited)
+        assert cache.stats()["misses"] == 1 + 11  # the edited row and the rejected ones
+
+
+def test_cli_writes_results_and_reports_rejected_rows(tmp_path, capsys):
+    source = tmp_path / "schedule.csv"
+    source.write_text(SCHEDULE, encoding="utf-8")
+    target = tmp_path / "results.jsonl"
+    # Exit status 1: some rows were rejected
+    assert cli.main([str(source), "-o", str(target)]) == 1
+    assert target.read_text(encoding="utf-8") == _rate(SCHEDULE, out_fmt="jsonl")[0]
+    err = capsys.readouterr().err
+    assert "line 5: Duct Diameter (in) must be a number." in err
+    assert "Rated 7 of 18 rows" in err
+
+
+def test_result_fields_cover_the_output():
+    assert OUTPUT_FIELDS == ("line",) + RESULT_FIELDS + ("error",)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from core.calculations import calculate_flexible_duct
+from core.inputs import parse_params
+from core.service import CalculationService
+from core.sweep import sweep_pressure_loss
+
+RECORD = {"duct_diameter_in": 8, "air_flow_cfm": 400, "duct_length_ft": 25, "bend_90": 2,
+          "compression_percent": 4}
+
+
+async def _request(port, method, path, body=None, content_type="application/json"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"" if body is None else body if isinstance(body, bytes) else json.dumps(body).encode()
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                  f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n\r\n").encode() + payload)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:])
+    if headers.get("transfer-encoding") == "chunked":
+        body, data = b"", data
+        while True:
+            size, _, data = data.partition(b"\r\n")
+            size = int(size, 16)
+            if not size:
+                break
+            body, data = body + data[:size], data[size + 2:]
+        data = body
+    return int(lines[0].split()[1]), headers, data
+
+
+def _serve(test, **options):
+    async def run():
+        service = CalculationService(**options)
+        server = await service.start("127.0.0.1", 0)
+        try:
+            return await test(service, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(run())
+
+
+def test_concurrent_calculations_match_the_scalar_function():
+    records = [dict(RECORD, air_flow_cfm=100 + 50 * i) for i in range(12)]
+
+    async def test(service, port):
+        replies = await asyncio.gather(*(_request(port, "POST", "/calculate", r) for r in records))
+        metrics = json.loads((await _request(port, "GET", "/metrics"))[2])
+        return replies, metrics
+
+    replies, metrics = _serve(test, max_batch=64, max_delay=0.05)
+    for record, (status, _, body) in zip(records, replies):
+        assert status == 200
+        velocity, dp, details = calculate_flexible_duct(**parse_params(record))
+        result = json.loads(body)
+        assert result["total_pressure_loss"] == pytest.approx(dp, rel=1e-12)
+        assert result["velocity_fpm"] == pytest.approx(velocity, rel=1e-12)
+    batching = metrics["micro_batching"]
+    assert batching["requests"] == 12 and batching["batches"] < 12
+    assert metrics["endpoints"]["/calculate"]["requests"] == 12
+
+
+def test_bad_requests_get_400_and_unknown_paths_404():
+    async def test(service, port):
+        return await asyncio.gather(
+            _request(port, "POST", "/calculate", dict(RECORD, duct_diameter_in="x")),
+            _request(port, "POST", "/calculate", b"{not json"),
+            _request(port, "POST", "/calculate", dict(RECORD, friction_solver="nope")),
+            _request(port, "GET", "/calculate"),
+            _request(port, "GET", "/nowhere"),
+            _request(port, "GET", "/health"),
+        )
+
+    statuses = [status for status, _, _ in _serve(test)]
+    assert statuses == [400, 400, 400, 405, 404, 200]
+
+
+def test_streamed_batch_keeps_row_order_and_errors():
+    rows = [dict(RECORD, duct_length_ft=5 + i) for i in range(10)]
+    rows[4] = dict(RECORD, air_flow_cfm=-1)
+
+    async def test(service, port):
+        as_json = await _request(port, "POST", "/batch", {"rows": rows})
+        as_jsonl = await _request(port, "POST", "/batch", "\n".join(json.dumps(r) for r in rows).encode(),
+                                  "application/x-ndjson")
+        return as_json, as_jsonl
+
+    as_json, as_jsonl = _serve(test, chunk_size=3)
+    assert as_json[1]["transfer-encoding"] == "chunked"
+    assert as_json[2] == as_jsonl[2]
+    lines = [json.loads(line) for line in as_json[2].decode().splitlines()]
+    assert [line["line"] for line in lines] == list(range(1, 11))
+    assert lines[4] == {"line": 5, "error": "Air Flow (CFM) must be non-negative."}
+    expected = calculate_flexible_duct(**parse_params(rows[9]))[1]
+    assert lines[9]["total_pressure_loss"] == pytest.approx(expected, rel=1e-12)
+
+
+def test_size_and_sweep():
+    sweep = {"base": RECORD, "x": {"name": "air_flow_cfm", "start": 100, "stop": 500, "steps": 3},
+             "y": {"name": "duct_length_ft", "start": 10, "stop": 30, "steps": 2}}
+
+    async def test(service, port):
+        return await asyncio.gather(
+            _request(port, "POST", "/size", dict(RECORD, max_velocity_fpm=900)),
+            _request(port, "POST", "/size", RECORD),
+            _request(port, "POST", "/sweep", sweep),
+        )
+
+    (size_status, _, size), (no_limit, _, _), (sweep_status, _, grid) = _serve(test)
+    assert size_status == 200 and json.loads(size)["velocity_fpm"] <= 900
+    assert no_limit == 400
+    assert sweep_status == 200
+    expected = sweep_pressure_loss(parse_params(RECORD), "air_flow_cfm", [100, 300, 500],
+                                   "duct_length_ft", [10, 30])
+    np.testing.assert_allclose(json.loads(grid)["total_pressure_loss"], expected, rtol=1e-12)
+
+
+def test_only_loopback_addresses_are_served():
+    with pytest.raises(ValueError):
+        asyncio.run(CalculationService().start("0.0.0.0", 0))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from core.batch import calculate_flexible_duct_batch
+from core.shapes import (
+    aspect_ratio, calculate_duct_batch, calculate_shaped_duct, huebscher_diameter, hydraulic_diameter,
+)
+
+
+def test_huebscher_diameter_of_a_rectangle():
+    a, b = 20.0, 10.0
+    expected = 1.30 * (a * b) ** 0.625 / (a + b) ** 0.25
+    assert huebscher_diameter("rectangular", a, b) == pytest.approx(expected)
+    assert hydraulic_diameter("rectangular", a, b) == pytest.approx(4 * a * b / (2 * (a + b)))
+
+
+def test_off_table_sizes_match_on_table_formula():
+    # 13 in is not a standard side, so it is evaluated rather than looked up
+    d = huebscher_diameter("rectangular", np.array([12.0, 13.0, 14.0]), 10.0)
+    assert d[0] < d[1] < d[2]
+
+
+def test_mixed_batch_rates_round_rows_like_the_kernel():
+    shape = np.array(["round", "rectangular", "flat_oval", "round"], dtype=object)
+    width = np.array([np.nan, 20.0, 20.0, np.nan])
+    height = np.array([np.nan, 10.0, 10.0, np.nan])
+    diameter = np.array([8.0, np.nan, np.nan, 10.0])
+    out = calculate_duct_batch(shape, width, height, diameter, 800.0, 40.0, {"90": 1}, 0.003, 0.0, 1.1)
+    plain = calculate_flexible_duct_batch(diameter, 800.0, 40.0, {"90": 1}, 0.003, 0.0, 1.1)
+    for i in (0, 3):
+        assert out["total_pressure_loss"][i] == plain["total_pressure_loss"][i]
+    assert out["aspect_ratio"][1] == aspect_ratio(20.0, 10.0)
+    # Actual section, not the round equivalent: velocity = Q / (w h)
+    assert out["velocity_fpm"][1] == pytest.approx(800.0 / (20 * 10 / 144))
+
+
+def test_single_shaped_duct_matches_the_batch():
+    velocity, dp, details = calculate_shaped_duct("flat_oval", 24.0, 8.0, 900.0, 50.0, {"90": 2}, 0.003, 1.1)
+    out = calculate_duct_batch("flat_oval", 24.0, 8.0, np.nan, 900.0, 50.0, {"90": 2}, 0.003, 0.0, 1.1)
+    assert (velocity, dp) == (out["velocity_fpm"][0], out["total_pressure_loss"][0])
+    assert details["Equivalent Diameter (in)"] == out["equivalent_diameter_in"][0]
+
+
+@pytest.mark.parametrize("shape, width, height", [
+    ("flat_oval", 8.0, 12.0),     # minor axis wider than the major one
+    ("rectangular", 90.0, 10.0),  # aspect ratio 9:1
+    ("rectangular", -4.0, 10.0),
+])
+def test_invalid_sections_are_rejected(shape, width, height):
+    with pytest.raises(ValueError):
+        calculate_duct_batch(shape, width, height, np.nan, 500.0, 20.0, {}, 0.003, 0.0, 1.1)
+
+
+def test_non_round_ducts_cannot_be_compressed():
+    with pytest.raises(ValueError):
+        calculate_duct_batch("rectangular", 12.0, 8.0, np.nan, 500.0, 20.0, {}, 0.003, 5.0, 1.1)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from core.calculations import calculate_flexible_duct
+from core.sweep import SweepGrid, axis_values, sweep_pressure_loss
+
+PARAMS = dict(duct_diameter_in=8.0, air_flow_cfm=400.0, duct_length_ft=25.0, bend_counts={"90": 2},
+              roughness_value=0.003, compression_percent=4.0, safety_factor=1.1)
+
+
+def test_grid_matches_single_points():
+    x = axis_values(100.0, 900.0, 5)
+    y = axis_values(6.0, 12.0, 4)
+    grid = sweep_pressure_loss(PARAMS, "air_flow_cfm", x, "duct_diameter_in", y)
+    assert grid.shape == (4, 5)
+    for i, d in enumerate(y):
+        for j, cfm in enumerate(x):
+            point = dict(PARAMS, air_flow_cfm=cfm, duct_diameter_in=d)
+            assert grid[i, j] == pytest.approx(calculate_flexible_duct(**point)[1], rel=1e-12)
+
+
+def test_shifted_or_extended_axes_only_compute_new_cells():
+    grid = SweepGrid()
+    y = axis_values(0.0, 20.0, 3)
+    grid.update(PARAMS, "duct_length_ft", axis_values(10.0, 50.0, 5), "compression_percent", y)
+    assert grid.last_computed_cells == 15
+    # one more step of 10 ft at the top
+    x = axis_values(10.0, 60.0, 6)
+    values = grid.update(PARAMS, "duct_length_ft", x, "compression_percent", y)
+    assert grid.last_computed_cells == 3
+    np.testing.assert_allclose(values, sweep_pressure_loss(PARAMS, "duct_length_ft", x, "compression_percent", y),
+                               rtol=1e-15)
+    values = grid.update(PARAMS, "duct_length_ft", x, "compression_percent", axis_values(0.0, 30.0, 4))
+    assert grid.last_computed_cells == 6
+    grid.update(dict(PARAMS, air_flow_cfm=500.0), "duct_length_ft", x, "compression_percent",
+                axis_values(0.0, 30.0, 4))
+    assert grid.last_computed_cells == 24
+
+
+def test_invalid_sweeps_are_rejected():
+    with pytest.raises(ValueError):
+        axis_values(0.0, 1.0, 1)
+    with pytest.raises(ValueError):
+        axis_values(-1.0, 1.0, 5)
+    with pytest.raises(ValueError):
+        sweep_pressure_loss(PARAMS, "air_flow_cfm", [1.0], "air_flow_cfm", [2.0])
+    with pytest.raises(ValueError):
+        sweep_pressure_loss(PARAMS, "safety_factor", [1.0], "air_flow_cfm", [2.0])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from core.calculations import calculate_flexible_duct
+from core.uncertainty import StreamingHistogram, check_distribution, run_monte_carlo, spread_distributions
+
+PARAMS = dict(duct_diameter_in=8.0, air_flow_cfm=400.0, duct_length_ft=25.0, bend_counts={"90": 2},
+              roughness_value=0.003, compression_percent=4.0, safety_factor=1.1)
+
+
+def test_runs_are_reproducible_for_the_same_seed():
+    dists = spread_distributions(PARAMS)
+    assert set(dists) == {"compression_percent", "roughness_value", "duct_length_ft", "bend_90"}
+    a = run_monte_carlo(PARAMS, dists, samples=5000, seed=3, chunk_size=1024)
+    b = run_monte_carlo(PARAMS, dists, samples=5000, seed=3, chunk_size=1024)
+    c = run_monte_carlo(PARAMS, dists, samples=5000, seed=4, chunk_size=1024)
+    assert a["percentiles"] == b["percentiles"] and a["mean"] == b["mean"]
+    assert a["mean"] != c["mean"]
+    assert a["deterministic"] == calculate_flexible_duct(**PARAMS)[1]
+    assert a["min"] <= a["percentiles"][50] <= a["percentiles"][90] <= a["percentiles"][99] <= a["max"]
+    assert a["invalid"] == 0 and a["histogram"].count == 5000
+
+
+def test_fixed_distributions_reproduce_the_deterministic_loss():
+    out = run_monte_carlo(PARAMS, {"duct_length_ft": ("fixed", 25.0)}, samples=100, chunk_size=30)
+    assert out["min"] == out["max"] == pytest.approx(out["deterministic"], rel=1e-12)
+    assert out["std"] == pytest.approx(0.0, abs=1e-15)
+
+
+def test_histogram_percentiles_are_within_a_bin_of_exact():
+    values = np.random.default_rng(0).lognormal(0.0, 1.0, 200_000)
+    hist = StreamingHistogram()
+    for chunk in np.array_split(values, 7):
+        hist.add(chunk)
+    hist.add(np.array([np.nan, np.inf]))
+    q = [1, 25, 50, 75, 99]
+    np.testing.assert_allclose(hist.percentile(q), np.percentile(values, q), rtol=2e-3)
+    assert hist.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert hist.std == pytest.approx(values.std(ddof=1), rel=1e-9)
+    assert hist.invalid == 2
+    assert hist.fraction_above(1.0) == pytest.approx(np.mean(values > 1.0), abs=1e-3)
+
+
+@pytest.mark.parametrize("name, spec", [
+    ("safety_factor", ("fixed", 1.0)),
+    ("duct_length_ft", ("beta", 1, 2)),
+    ("duct_length_ft", ("uniform", 2.0, 1.0)),
+    ("compression_percent", ("triangular", 1.0, 5.0, 3.0)),
+    ("duct_length_ft", ("integer", 1, 3)),
+])
+def test_bad_distributions_are_rejected(name, spec):
+    with pytest.raises(ValueError):
+        check_distribution(name, spec)
@@ -1,17 +1,33 @@
 # ui/app_root.py
 import tkinter as tk
-from tkinter import ttk, messagebox
-from ui.home_page import HomePage
-from ui.flexible_duct_page import FlexibleDuctPage
-from ui.credits_page import CreditsPage
-from core.calculations import calculate_flexible_duct
+from tkinter import ttk, messagebox, filedialog
+from ui.background import DebouncedRunner
+from core.calculations import calculate_flexible_duct, size_flexible_duct
+from core.friction import FRICTION_SOLVERS, DEFAULT_FRICTION_SOLVER
+from core.inputs import ROUGHNESS_MAP, DEFAULT_ROUGHNESS, parse_positive_float, parse_inputs
 from utils.resource_path import resource_path
+from utils.startup import StartupTimer
+import importlib
 import math
+import os
+import time
+
+# Page name -> module. Pages (and NumPy/PIL behind them) are imported and
+# built on first show_frame, so startup only pays for the home page.
+PAGES = {
+    "HomePage": "ui.home_page",
+    "FlexibleDuctPage": "ui.flexible_duct_page",
+    "RectangularDuctPage": "ui.rectangular_duct_page",
+    "SweepPage": "ui.sweep_page",
+    "UncertaintyPage": "ui.uncertainty_page",
+    "CreditsPage": "ui.credits_page",
+}
 
 
 class FlexibleDuctApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup: StartupTimer = None):
         super().__init__()
+        self.startup = startup or StartupTimer()
         self.title("HVAC Duct Calculator v1.4")
         self.geometry("900x650")
         self.minsize(800, 550)
@@ -21,6 +37,12 @@ class FlexibleDuctApp(tk.Tk):
         status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+        # Opt-in stage timings (Settings menu); None means not instrumented
+        self.instrument = None
+        self.instrument_var = tk.BooleanVar(value=False)
+        self.instrument_var.trace_add("write", self._on_instrument_toggled)
+        self._profile_next = False
+
         # Menu
         self.create_menu()
 
@@ -32,14 +54,19 @@ class FlexibleDuctApp(tk.Tk):
         self.bend_45_count_var = tk.StringVar(value="0")
         self.bend_90_count_var = tk.StringVar(value="0")
         self.bend_180_count_var = tk.StringVar(value="0")
+        self.fittings_var = tk.StringVar(value="")  # "id:count; ..." (core/fittings.py)
+
+        # Air conditions (core/air.py); the defaults are standard air
+        self.altitude_ft_var = tk.StringVar(value="0")
+        self.air_temperature_f_var = tk.StringVar(value="70")
+        self.relative_humidity_pct_var = tk.StringVar(value="0")
 
         self.roughness_choice_var = tk.StringVar()
-        self.roughness_map = {
-            "Low (0.003)": 0.003,
-            "Medium (0.009)": 0.009,
-            "High (0.015)": 0.015,
-        }
-        self.roughness_choice_var.set("Medium (0.009)")
+        self.roughness_map = dict(ROUGHNESS_MAP)
+        self.roughness_choice_var.set(DEFAULT_ROUGHNESS)
+
+        self.friction_solver_map = {label: key for key, label in FRICTION_SOLVERS.items()}
+        self.friction_solver_var = tk.StringVar(value=FRICTION_SOLVERS[DEFAULT_FRICTION_SOLVER])
 
         self.compression_percent_var = tk.DoubleVar(value=0.0)
         self.sf_enabled_var = tk.BooleanVar(value=False)
@@ -49,19 +76,39 @@ class FlexibleDuctApp(tk.Tk):
         self.result_air_velocity_var = tk.StringVar(value="—")
         self.last_inputs = None
         self.last_details = None
+        self.results_window = None
+        self.project = None
+        self.batch_runner = DebouncedRunner(self, delay_ms=0)
+
+        # Sizing limits (blank = not checked)
+        self.sizing_max_dp_var = tk.StringVar(value="")
+        self.sizing_max_rate_var = tk.StringVar(value="0.1")
+        self.sizing_max_velocity_var = tk.StringVar(value="")
+        self.sizing_result_var = tk.StringVar(value="—")
+
+        # Live recalculation (debounced, computed off the Tk thread)
+        self.live_calc_var = tk.BooleanVar(value=False)
+        self.live_runner = DebouncedRunner(self, delay_ms=120)
+        for var in (
+            self.duct_diameter_in_var, self.air_flow_cfm_var, self.duct_length_ft_var,
+            self.bend_45_count_var, self.bend_90_count_var, self.bend_180_count_var,
+            self.fittings_var, self.roughness_choice_var, self.compression_percent_var, self.sf_enabled_var,
+            self.safety_factor_var, self.friction_solver_var,
+            self.altitude_ft_var, self.air_temperature_f_var, self.relative_humidity_pct_var,
+        ):
+            var.trace_add("write", self._on_input_changed)
+        self.live_calc_var.trace_add("write", self._on_input_changed)
 
         # Pages container
         self.container = ttk.Frame(self)
         self.container.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Initialize all pages
+        # Pages are built on demand, see PAGES
         self.frames = {}
-        for Page in (HomePage, FlexibleDuctPage, CreditsPage):
-            frame = Page(self.container, self)
-            self.frames[Page.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.show_frame("HomePage")
+        self.startup.mark("window")
+        # Idle callbacks run in order, so this fires after the first redraw
+        self.after_idle(self.startup.mark, "first_paint")
 
     # -----------------------------
     # Menu methods
@@ -70,6 +117,14 @@ class FlexibleDuctApp(tk.Tk):
         menubar = tk.Menu(self)
         self.config(menu=menubar)
 
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="New Project...", command=self.new_project)
+        file_menu.add_command(label="Open Project...", command=self.open_project)
+        file_menu.add_command(label="Add Current Inputs to Project", command=self.add_to_project)
+        file_menu.add_separator()
+        file_menu.add_command(label="Rate Schedule...", command=self.open_schedule)
+        menubar.add_cascade(label="File", menu=file_menu)
+
         info_menu = tk.Menu(menubar, tearoff=0)
         info_menu.add_command(label="About", command=self.show_about)
         info_menu.add_command(label="Credits", command=self.show_credits)
@@ -77,6 +132,10 @@ class FlexibleDuctApp(tk.Tk):
 
         settings_menu = tk.Menu(menubar, tearoff=0)
         settings_menu.add_command(label="Preferences", command=self.show_settings)
+        settings_menu.add_separator()
+        settings_menu.add_checkbutton(label="Show Stage Timings", variable=self.instrument_var)
+        settings_menu.add_command(label="Profile Next Calculation", command=self.profile_next_calculation)
+        settings_menu.add_command(label="Export Timings...", command=self.export_timings)
         menubar.add_cascade(label="Settings", menu=settings_menu)
 
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -99,112 +158,310 @@ class FlexibleDuctApp(tk.Tk):
     def show_faq(self):
         messagebox.showinfo("FAQ", "Frequently Asked Questions will be added in a future update.")
 
+    def _build_page(self, page_name: str):
+        start = time.perf_counter()
+        Page = getattr(importlib.import_module(PAGES[page_name]), page_name)
+        frame = Page(self.container, self)
+        frame.grid(row=0, column=0, sticky="nsew")
+        self.frames[page_name] = frame
+        self.startup.record_page(page_name, time.perf_counter() - start)
+        return frame
+
     def show_frame(self, page_name: str):
-        self.frames[page_name].tkraise()
+        frame = self.frames.get(page_name) or self._build_page(page_name)
+        frame.tkraise()
         self.status_var.set(f"Viewing {page_name.replace('Page', '')}")
 
     # -----------------------------
     # Input & calculation helpers
     # -----------------------------
     def _parse_positive_float(self, value_str: str, field_name: str) -> float:
-        try:
-            value = float(value_str)
-        except ValueError:
-            raise ValueError(f"{field_name} must be a number.")
-        if value < 0:
-            raise ValueError(f"{field_name} must be non-negative.")
-        return value
+        return parse_positive_float(value_str, field_name)
 
     def gather_inputs(self):
-        duct_diameter_in = self._parse_positive_float(self.duct_diameter_in_var.get(), "Duct Diameter (in)")
-        air_flow_cfm = self._parse_positive_float(self.air_flow_cfm_var.get(), "Air Flow (CFM)")
-        duct_length_ft = self._parse_positive_float(self.duct_length_ft_var.get(), "Duct Length (ft)")
-        bend_45 = int(self.bend_45_count_var.get())
-        bend_90 = int(self.bend_90_count_var.get())
-        bend_180 = int(self.bend_180_count_var.get())
-        roughness_value = self.roughness_map[self.roughness_choice_var.get()]
-        compression_percent = float(self.compression_percent_var.get())
-        if self.sf_enabled_var.get():
-            sf_percent = self._parse_positive_float(self.safety_factor_var.get(), "Safety Factor (%)")
-        else:
-            sf_percent = 10.0
-        safety_factor = 1.0 + (sf_percent / 100.0)
-        inputs = {
-            "Duct Diameter (in)": duct_diameter_in,
-            "Air Flow (CFM)": air_flow_cfm,
-            "Duct Length (ft)": duct_length_ft,
-            "Bends": {"45": bend_45, "90": bend_90, "180": bend_180},
-            "Roughness": self.roughness_choice_var.get(),
-            "Compression (%)": compression_percent,
-            "Safety Factor (%)": sf_percent,
-        }
-        return inputs, {
-            "duct_diameter_in": duct_diameter_in,
-            "air_flow_cfm": air_flow_cfm,
-            "duct_length_ft": duct_length_ft,
-            "bend_counts": {"45": bend_45, "90": bend_90, "180": bend_180},
-            "roughness_value": roughness_value,
-            "compression_percent": compression_percent,
-            "safety_factor": safety_factor,
+        raw = {
+            "duct_diameter_in": self.duct_diameter_in_var.get(),
+            "air_flow_cfm": self.air_flow_cfm_var.get(),
+            "duct_length_ft": self.duct_length_ft_var.get(),
+            "bend_45": self.bend_45_count_var.get(),
+            "bend_90": self.bend_90_count_var.get(),
+            "bend_180": self.bend_180_count_var.get(),
+            "fittings": self.fittings_var.get(),
+            "roughness": self.roughness_choice_var.get(),
+            "compression_percent": self.compression_percent_var.get(),
+            "safety_factor_percent": self.safety_factor_var.get() if self.sf_enabled_var.get() else None,
+            "altitude_ft": self.altitude_ft_var.get(),
+            "air_temperature_f": self.air_temperature_f_var.get(),
+            "relative_humidity_pct": self.relative_humidity_pct_var.get(),
         }
+        return parse_inputs(raw, self.roughness_map)
+
+    def _calculation_job(self):
+        # Runs on the Tk thread: read every variable here, compute elsewhere
+        instrument = self.instrument
+        if instrument is None:
+            inputs, params = self.gather_inputs()
+        else:
+            with instrument.stage("parse"):
+                inputs, params = self.gather_inputs()
+        inputs["Friction Model"] = self.friction_solver_var.get()
+        solver = self.friction_solver_map[self.friction_solver_var.get()]
+        if self._profile_next and instrument is not None:
+            self._profile_next = False
+            return lambda: (inputs,) + instrument.profile_call(
+                calculate_flexible_duct, **params, friction_solver=solver, instrument=instrument
+            )
+        return lambda: (inputs,) + calculate_flexible_duct(**params, friction_solver=solver, instrument=instrument)
+
+    def _format_result(self, result):
+        inputs, v, dp, details = result
+        self.last_inputs = inputs
+        self.last_details = details
+        self.result_air_velocity_var.set(
+            "Invalid (zero area)" if math.isinf(v) else f"{v:,.1f} FPM"
+        )
+        self.result_pressure_loss_var.set(f"{dp:.4f} in. w.g.")
+        if details["Friction Status"] != "OK":
+            self.status_var.set(f"Calculated with friction warning: {details['Friction Status']}")
+        else:
+            self.status_var.set("Calculation completed successfully")
+
+    def _show_result(self, result):
+        if self.instrument is None:
+            self._format_result(result)
+            return
+        with self.instrument.stage("format"):
+            self._format_result(result)
+        self.instrument.count("calculations")
+        self.status_var.set(f"{self.status_var.get()} | {self.instrument.summary()}")
 
     def perform_calculation(self):
+        self.live_runner.cancel()
         try:
-            inputs, params = self.gather_inputs()
+            job = self._calculation_job()
             self.status_var.set("Calculating...")
             self.update_idletasks()
-            v, dp, details = calculate_flexible_duct(**params)
-            self.last_inputs = inputs
-            self.last_details = details
-            self.result_air_velocity_var.set(
-                "Invalid (zero area)" if math.isinf(v) else f"{v:,.1f} FPM"
-            )
-            self.result_pressure_loss_var.set(f"{dp:.4f} in. w.g.")
-            self.status_var.set("Calculation completed successfully")
+            self._show_result(job())
         except ValueError as e:
             messagebox.showerror("Invalid input", str(e))
             self.status_var.set("Error in calculation")
 
+    def _on_input_changed(self, *_):
+        if self.live_calc_var.get():
+            self.live_runner.submit(self._calculation_job, self._show_result, self._show_live_error)
+        else:
+            self.live_runner.cancel()
+
+    def _show_live_error(self, error):
+        # No dialogs while typing: half-entered values are expected
+        if isinstance(error, (ValueError, tk.TclError)):
+            self.status_var.set(f"Waiting for valid input: {error}")
+        elif isinstance(error, ZeroDivisionError):
+            self.status_var.set("Waiting for valid input: Duct Diameter (in) must be positive.")
+        else:
+            self.status_var.set(f"Error in calculation: {error}")
+
+    # -----------------------------
+    # Instrumentation
+    # -----------------------------
+    def _on_instrument_toggled(self, *_):
+        if self.instrument_var.get():
+            from core.instrument import Instrumentation
+            self.instrument = Instrumentation()
+            self.status_var.set("Stage timings on: run a calculation to see them")
+        else:
+            self.instrument = None
+            self.status_var.set("Stage timings off")
+
+    def profile_next_calculation(self):
+        if self.instrument is None:
+            self.instrument_var.set(True)
+        self._profile_next = True
+        self.status_var.set("The next calculation will run under cProfile (see Export Timings...)")
+
+    def export_timings(self):
+        if self.instrument is None or not self.instrument.stages:
+            messagebox.showinfo("No timings", "Enable Settings > Show Stage Timings and run a calculation first.")
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.instrument.to_json())
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e))
+            return
+        self.status_var.set(f"Timings exported to {path}")
+
+    def destroy(self):
+        self.live_runner.shutdown()
+        self.batch_runner.shutdown()
+        super().destroy()
+
+    def _parse_optional_limit(self, value_str: str, field_name: str):
+        value_str = value_str.strip()
+        return self._parse_positive_float(value_str, field_name) if value_str else None
+
+    def perform_sizing(self):
+        try:
+            max_dp = self._parse_optional_limit(self.sizing_max_dp_var.get(), "Max ΔP (in.w.g.)")
+            max_rate = self._parse_optional_limit(self.sizing_max_rate_var.get(), "Max Friction Rate (in.w.g./100 ft)")
+            max_velocity = self._parse_optional_limit(self.sizing_max_velocity_var.get(), "Max Velocity (FPM)")
+            if max_dp is None and max_rate is None and max_velocity is None:
+                raise ValueError("Enter at least one sizing limit.")
+            _, params = self.gather_inputs()
+            del params["duct_diameter_in"]
+            diameter, _, dp, _ = size_flexible_duct(
+                **params,
+                friction_solver=self.friction_solver_map[self.friction_solver_var.get()],
+                max_pressure_loss=max_dp,
+                max_friction_rate=max_rate,
+                max_velocity_fpm=max_velocity,
+            )
+        except ValueError as e:
+            messagebox.showerror("Invalid input", str(e))
+            self.status_var.set("Error in sizing")
+            return
+        if diameter is None:
+            self.sizing_result_var.set("No standard size passes")
+            self.status_var.set(f"Largest size still gives ΔP {dp:.4f} in. w.g.")
+            return
+        self.sizing_result_var.set(f'{diameter}" diameter')
+        self.duct_diameter_in_var.set(str(float(diameter)))
+        self.perform_calculation()
+        self.status_var.set(f'Sized to {diameter}" (smallest standard size within limits)')
+
     # -----------------------------
-    # Full results popup
+    # Results window
     # -----------------------------
+    def _results_window(self):
+        # One window for the whole session; closing it only hides it
+        if self.results_window is None or not self.results_window.winfo_exists():
+            from ui.results_table import ResultsWindow
+            self.results_window = ResultsWindow(self)
+        return self.results_window
+
     def show_full_results(self):
         if not self.last_details:
             messagebox.showinfo("No results", "Please run a calculation first.")
             return
-        popup = tk.Toplevel(self)
-        popup.title("Full Calculation Results")
-        popup.geometry("500x550")
-        frame = ttk.Frame(popup, padding=10)
-        frame.pack(fill="both", expand=True)
-        canvas = tk.Canvas(frame)
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.show_results_breakdown(self.last_inputs, self.last_details)
+
+    def show_results_breakdown(self, inputs: dict, details: dict):
+        sections, quantities, values = [], [], []
+        for section, items in (("Input", inputs), ("Calculated", details)):
+            for k, v in items.items():
+                sections.append(section)
+                quantities.append(k)
+                values.append(v)
+        self._results_window().show(
+            "Full Calculation Results",
+            [("section", "Section"), ("quantity", "Quantity"), ("value", "Value")],
+            {"section": sections, "quantity": quantities, "value": values},
+        )
+
+    def open_schedule(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Rate Schedule",
+            filetypes=[("Schedules", "*.csv *.jsonl *.ndjson"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        fmt = "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+        solver = self.friction_solver_map[self.friction_solver_var.get()]
+
+        def job():
+            from core.schedule import rate_schedule_columns
+            with open(path, newline="", encoding="utf-8") as f:
+                return rate_schedule_columns(f, fmt, friction_solver=solver)
+
+        self.status_var.set(f"Rating {os.path.basename(path)}...")
+        self.batch_runner.submit(lambda: job, lambda result: self._show_schedule(path, result),
+                                 self._show_schedule_error)
+
+    def _show_schedule(self, path, result):
+        from core.schedule import OUTPUT_FIELDS
+        lines, errors, results = result
+        data = dict(results, line=lines, error=errors)
+        self._results_window().show(
+            f"Schedule Results - {os.path.basename(path)}",
+            [(name, name) for name in OUTPUT_FIELDS],
+            data,
+        )
+        rejected = sum(1 for e in errors if e)
+        self.status_var.set(f"Rated {len(errors) - rejected:,} of {len(errors):,} rows ({rejected:,} rejected)")
+
+    # -----------------------------
+    # Projects
+    # -----------------------------
+    def new_project(self):
+        from core.project import DuctProject, PROJECT_SUFFIX
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="New Project",
+            defaultextension=PROJECT_SUFFIX,
+            filetypes=[("Duct projects", "*" + PROJECT_SUFFIX)],
+        )
+        if not path:
+            return
+        try:
+            self.project = DuctProject.create(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Project failed", str(e))
+            return
+        self.status_var.set(f"Created project {os.path.basename(path)}")
+
+    def open_project(self):
+        from core.project import DuctProject
+        path = filedialog.askdirectory(parent=self, title="Open Project", mustexist=True)
+        if not path:
+            return
+        start = time.perf_counter()
+        try:
+            self.project = DuctProject.open(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Project failed", str(e))
+            return
+        self.show_project()
+        self.status_var.set(
+            f"Opened {os.path.basename(path)}: {len(self.project):,} runs "
+            f"in {(time.perf_counter() - start) * 1e3:.0f} ms"
+        )
+
+    def show_project(self):
+        from core.batch import BATCH_COLUMNS
+        from core.project import RESULT_COLUMNS
+        # Columns are memory-mapped: the table only reads the rows on screen
+        keys = [name for name in self.project.input_columns if name != "friction_solver"] + list(RESULT_COLUMNS)
+        headings = dict(BATCH_COLUMNS, f_converged="Friction Converged")
+        self._results_window().show(
+            f"Project - {os.path.basename(self.project.path)}",
+            [(key, headings.get(key, key)) for key in keys],
+            {key: self.project.column(key) for key in keys},
         )
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        row = 0
-        ttk.Label(scrollable_frame, text="--- INPUTS ---", font=("Segoe UI", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky="w", pady=(0, 6))
-        row += 1
-        for k, v in self.last_inputs.items():
-            if k == "Bends":
-                bends = ", ".join(f"{ang}°: {cnt}" for ang, cnt in v.items())
-                ttk.Label(scrollable_frame, text=f"{k}:").grid(row=row, column=0, sticky="w")
-                ttk.Label(scrollable_frame, text=bends).grid(row=row, column=1, sticky="e")
-            else:
-                ttk.Label(scrollable_frame, text=f"{k}:").grid(row=row, column=0, sticky="w")
-                ttk.Label(scrollable_frame, text=str(v)).grid(row=row, column=1, sticky="e")
-            row += 1
-        ttk.Label(scrollable_frame, text="").grid(row=row, column=0)
-        row += 1
-        ttk.Label(scrollable_frame, text="--- CALCULATED ---", font=("Segoe UI", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky="w", pady=(6, 6))
-        row += 1
-        for k, v in self.last_details.items():
-            ttk.Label(scrollable_frame, text=f"{k}:").grid(row=row, column=0, sticky="w")
-            ttk.Label(scrollable_frame, text=f"{v:,.5g}").grid(row=row, column=1, sticky="e")
-            row += 1
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+
+    def add_to_project(self):
+        if self.project is None:
+            self.new_project()
+            if self.project is None:
+                return
+        try:
+            from core.project import inputs_from_params
+            _, params = self.gather_inputs()
+            rows = self.project.add_runs(inputs_from_params(params),
+                                         self.friction_solver_map[self.friction_solver_var.get()])
+        except ValueError as e:
+            messagebox.showerror("Invalid input", str(e))
+            return
+        except OSError as e:
+            messagebox.showerror("Project failed", str(e))
+            return
+        self.status_var.set(f"Added run {rows.start + 1:,} to {os.path.basename(self.project.path)}")
+
+    def _show_schedule_error(self, error):
+        messagebox.showerror("Schedule failed", str(error))
+        self.status_var.set("Error in schedule rating")
@@ -0,0 +1,85 @@
+# ui/background.py
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DebouncedRunner:
+    """
+    Debounced, coalescing background execution for Tk callbacks.
+
+    submit() may be called on every keystroke or slider step. Only after
+    delay_ms without another submit is prepare() called on the Tk thread
+    (where Tk variables may be read); it returns the callable to run on the
+    single worker thread. While a job is in flight, new submissions are
+    coalesced into one follow-up run, and results of jobs whose inputs
+    have since changed are discarded. on_result / on_error always run on the
+    Tk thread, delivered by polling with after().
+    """
+
+    def __init__(self, widget: tk.Misc, delay_ms: int = 150, poll_ms: int = 15):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._generation = 0
+        self._after_id = None
+        self._latest = None
+        self._inflight = None
+        self._rerun = False
+
+    def submit(self, prepare, on_result, on_error=None):
+        self._generation += 1
+        self._latest = (prepare, on_result, on_error)
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        """Drop any pending request and ignore the result of a running job."""
+        self._generation += 1
+        self._rerun = False
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def busy(self) -> bool:
+        return self._inflight is not None or self._after_id is not None
+
+    def _fire(self):
+        self._after_id = None
+        if self._inflight is not None:
+            self._rerun = True
+            return
+        prepare, on_result, on_error = self._latest
+        try:
+            job = prepare()
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            return
+        future = self._executor.submit(job)
+        self._inflight = (self._generation, future, on_result, on_error)
+        self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        generation, future, on_result, on_error = self._inflight
+        if not future.done():
+            self.widget.after(self.poll_ms, self._poll)
+            return
+        self._inflight = None
+        if generation != self._generation:
+            # Inputs changed while this job ran: drop it and run the latest
+            if self._rerun:
+                self._rerun = False
+                self._fire()
+            return
+        error = future.exception()
+        if error is None:
+            on_result(future.result())
+        elif on_error is not None:
+            on_error(error)
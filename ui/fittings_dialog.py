@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from core.fittings import FLEX_BEND_IDS, default_catalog, format_fittings, parse_fittings
+
+_KIND_TEXT = {"leq": "Leq (ft)", "k": "K"}
+
+
+class FittingsDialog(tk.Toplevel):
+    """
+    Pick fitting counts from the catalog for the duct on the calculator
+    page. Values are shown at diameter (the round equivalent for other
+    shapes), by default the one entered on the flexible duct page; the
+    flexible duct bends keep their own spinboxes and are not listed here.
+    OK writes the counts back to fittings_var as "id:count; ...".
+    """
+
+    def __init__(self, page, fittings_var: tk.StringVar, diameter: float = None):
+        super().__init__(page)
+        self.title("Fittings Catalog")
+        self.geometry("620x460")
+        self.transient(page.winfo_toplevel())
+        self.fittings_var = fittings_var
+        self.catalog = default_catalog()
+        self.count_var = tk.StringVar(value="0")
+        try:
+            self.counts = parse_fittings(fittings_var.get(), self.catalog)
+        except ValueError as e:
+            messagebox.showwarning("Fittings", f"{e}\nStarting from an empty list.", parent=self)
+            self.counts = {}
+        if diameter is None:
+            try:
+                diameter = float(page.controller.duct_diameter_in_var.get())
+            except ValueError:
+                diameter = None
+        self.diameter = diameter if diameter and diameter > 0 else None
+
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+        at = f" at {self.diameter:g} in." if self.diameter else ""
+        ttk.Label(frame, text=f"Select a fitting and set its count. Values{at}").grid(
+            row=0, column=0, columnspan=2, sticky="w", pady=(0, 8))
+
+        self.tree = ttk.Treeview(frame, columns=("kind", "value", "count"), selectmode="browse")
+        self.tree.heading("#0", text="Fitting")
+        self.tree.heading("kind", text="Type")
+        self.tree.heading("value", text="Value")
+        self.tree.heading("count", text="Count")
+        self.tree.column("#0", width=300)
+        for column, width in (("kind", 80), ("value", 80), ("count", 60)):
+            self.tree.column(column, width=width, anchor="e")
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        scroll.grid(row=1, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._fill_tree()
+
+        edit_frame = ttk.Frame(frame)
+        edit_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(8, 0))
+        ttk.Label(edit_frame, text="Count:").grid(row=0, column=0, sticky="w")
+        spin = tk.Spinbox(edit_frame, from_=0, to=1000, textvariable=self.count_var, width=8)
+        spin.grid(row=0, column=1, padx=(5, 5))
+        spin.bind("<Return>", lambda e: self.set_count())
+        ttk.Button(edit_frame, text="Set", command=self.set_count).grid(row=0, column=2)
+        ttk.Button(edit_frame, text="Clear All", command=self.clear_all).grid(row=0, column=3, padx=(5, 0))
+        edit_frame.columnconfigure(4, weight=1)
+        ttk.Button(edit_frame, text="OK", command=self.apply, width=10).grid(row=0, column=5, padx=(5, 0))
+        ttk.Button(edit_frame, text="Cancel", command=self.destroy, width=10).grid(row=0, column=6, padx=(5, 0))
+
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+        self.grab_set()
+
+    def _fill_tree(self):
+        for category, fitting_ids in self.catalog.by_category().items():
+            fitting_ids = [f for f in fitting_ids if f not in FLEX_BEND_IDS]
+            if not fitting_ids:
+                continue
+            parent = self.tree.insert("", "end", text=category, open=True)
+            for fitting_id in fitting_ids:
+                kind = self.catalog.kinds[fitting_id]
+                value = f"{self.catalog.value(fitting_id, self.diameter)[1]:.3g}" if self.diameter else "—"
+                self.tree.insert(parent, "end", iid=fitting_id, text=self.catalog.labels[fitting_id],
+                                 values=(_KIND_TEXT[kind], value, self.counts.get(fitting_id, 0)))
+
+    def _selected_fitting(self):
+        selection = self.tree.selection()
+        return selection[0] if selection and selection[0] in self.catalog else None
+
+    def _on_select(self, event=None):
+        fitting_id = self._selected_fitting()
+        if fitting_id is not None:
+            self.count_var.set(str(self.counts.get(fitting_id, 0)))
+
+    def set_count(self):
+        fitting_id = self._selected_fitting()
+        if fitting_id is None:
+            return
+        try:
+            count = int(self.count_var.get())
+            if count < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid input", "Count must be a non-negative whole number.", parent=self)
+            return
+        self.counts[fitting_id] = count
+        self.tree.set(fitting_id, "count", count)
+
+    def clear_all(self):
+        for fitting_id in list(self.counts):
+            self.counts[fitting_id] = 0
+            if self.tree.exists(fitting_id):
+                self.tree.set(fitting_id, "count", 0)
+        self.count_var.set("0")
+
+    def apply(self):
+        self.fittings_var.set(format_fittings(self.counts))
+        self.destroy()
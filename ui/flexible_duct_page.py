@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from core.friction import FRICTION_SOLVERS, DEFAULT_FRICTION_SOLVER
 
 
 class FlexibleDuctPage(ttk.Frame):
@@ -53,20 +54,30 @@ class FlexibleDuctPage(ttk.Frame):
             ttk.Label(bend_frame, text=txt).grid(row=0, column=j*2, sticky="w")
             tk.Spinbox(bend_frame, from_=0, to=1000, textvariable=var, width=8).grid(row=0, column=j*2+1, padx=(2, 10))
 
+        # Other fittings ("id:count; ..."), picked from the catalog dialog
+        ttk.Label(left_frame, text="Fittings:").grid(row=4, column=0, sticky="w", pady=5)
+        fittings_frame = ttk.Frame(left_frame)
+        fittings_frame.grid(row=4, column=1, sticky="ew", pady=5, padx=(5, 0))
+        ttk.Entry(fittings_frame, textvariable=self.controller.fittings_var, width=20)\
+            .grid(row=0, column=0, sticky="ew")
+        ttk.Button(fittings_frame, text="Catalog...", command=self.open_fittings_catalog)\
+            .grid(row=0, column=1, padx=(5, 0))
+        fittings_frame.columnconfigure(0, weight=1)
+
         # Roughness
-        ttk.Label(left_frame, text="Duct Roughness:").grid(row=4, column=0, sticky="w", pady=5)
+        ttk.Label(left_frame, text="Duct Roughness:").grid(row=5, column=0, sticky="w", pady=5)
         ttk.Combobox(
             left_frame,
             textvariable=self.controller.roughness_choice_var,
             values=list(self.controller.roughness_map.keys()),
             state="readonly",
             width=20
-        ).grid(row=4, column=1, sticky="w", pady=5, padx=(5, 0))
+        ).grid(row=5, column=1, sticky="w", pady=5, padx=(5, 0))
 
         # Compression
-        ttk.Label(left_frame, text="Compression (%):").grid(row=5, column=0, sticky="w", pady=5)
+        ttk.Label(left_frame, text="Compression (%):").grid(row=6, column=0, sticky="w", pady=5)
         comp_frame = ttk.Frame(left_frame)
-        comp_frame.grid(row=5, column=1, sticky="ew", pady=5, padx=(5, 0))
+        comp_frame.grid(row=6, column=1, sticky="ew", pady=5, padx=(5, 0))
         ttk.Entry(comp_frame, textvariable=self.controller.compression_percent_var, width=8).grid(row=0, column=0)
         ttk.Scale(
             comp_frame,
@@ -78,24 +89,52 @@ class FlexibleDuctPage(ttk.Frame):
         comp_frame.columnconfigure(1, weight=1)
 
         # Safety Factor
-        ttk.Label(left_frame, text="Safety Factor (%):").grid(row=6, column=0, sticky="w", pady=5)
+        ttk.Label(left_frame, text="Safety Factor (%):").grid(row=7, column=0, sticky="w", pady=5)
         sf_frame = ttk.Frame(left_frame)
-        sf_frame.grid(row=6, column=1, sticky="ew", pady=5, padx=(5, 0))
+        sf_frame.grid(row=7, column=1, sticky="ew", pady=5, padx=(5, 0))
         self.sf_entry = ttk.Entry(sf_frame, textvariable=self.controller.safety_factor_var, width=10, state="disabled")
         self.sf_entry.grid(row=0, column=0, sticky="w")
         ttk.Checkbutton(sf_frame, text="Enable custom SF", variable=self.controller.sf_enabled_var,
                         command=self.toggle_sf).grid(row=0, column=1, sticky="w", padx=(5, 0))
         sf_frame.columnconfigure(1, weight=1)
 
+        # Friction model
+        ttk.Label(left_frame, text="Friction Model:").grid(row=8, column=0, sticky="w", pady=5)
+        ttk.Combobox(
+            left_frame,
+            textvariable=self.controller.friction_solver_var,
+            values=list(self.controller.friction_solver_map.keys()),
+            state="readonly",
+            width=28
+        ).grid(row=8, column=1, sticky="w", pady=5, padx=(5, 0))
+
+        # Air conditions (standard air: 0 ft, 70 °F, 0 % RH)
+        ttk.Label(left_frame, text="Air Conditions:").grid(row=9, column=0, sticky="w", pady=5)
+        air_frame = ttk.Frame(left_frame)
+        air_frame.grid(row=9, column=1, sticky="w", pady=5, padx=(5, 0))
+        for j, (txt, var) in enumerate([
+            ("Alt (ft)", self.controller.altitude_ft_var),
+            ("Temp (°F)", self.controller.air_temperature_f_var),
+            ("RH (%)", self.controller.relative_humidity_pct_var),
+        ]):
+            ttk.Label(air_frame, text=txt).grid(row=0, column=j*2, sticky="w")
+            ttk.Entry(air_frame, textvariable=var, width=7).grid(row=0, column=j*2+1, padx=(2, 10))
+
         # Buttons
         button_frame = ttk.Frame(left_frame)
-        button_frame.grid(row=7, column=0, columnspan=2, pady=15)
+        button_frame.grid(row=10, column=0, columnspan=2, pady=15)
         ttk.Button(button_frame, text="Calculate", command=self.controller.perform_calculation, width=15)\
             .grid(row=0, column=0, padx=5)
         ttk.Button(button_frame, text="Reset Inputs", command=self._reset_inputs, width=15)\
             .grid(row=0, column=1, padx=5)
-        ttk.Button(button_frame, text="Back to Home", command=lambda: self.controller.show_frame("HomePage"))\
+        ttk.Checkbutton(button_frame, text="Live update", variable=self.controller.live_calc_var)\
             .grid(row=1, column=0, columnspan=2, pady=(10, 0))
+        ttk.Button(button_frame, text="Parametric Sweep", command=lambda: self.controller.show_frame("SweepPage"),
+                   width=15).grid(row=2, column=0, padx=5, pady=(10, 0))
+        ttk.Button(button_frame, text="Uncertainty", command=lambda: self.controller.show_frame("UncertaintyPage"),
+                   width=15).grid(row=2, column=1, padx=5, pady=(10, 0))
+        ttk.Button(button_frame, text="Back to Home", command=lambda: self.controller.show_frame("HomePage"),
+                   width=15).grid(row=3, column=0, columnspan=2, pady=(10, 0))
 
         # Results
         ttk.Label(right_frame, text="Air Velocity:").grid(row=0, column=0, sticky="w", pady=8)
@@ -108,6 +147,27 @@ class FlexibleDuctPage(ttk.Frame):
             .grid(row=2, column=0, columnspan=2, pady=20)
         right_frame.columnconfigure(1, weight=1)
 
+        # Sizing
+        sizing_frame = ttk.LabelFrame(right_frame, text="Size Duct (leave blank to skip a limit)", padding="10")
+        sizing_frame.grid(row=3, column=0, columnspan=2, sticky="ew")
+        limits = [
+            ("Max ΔP (in.w.g.):", self.controller.sizing_max_dp_var),
+            ("Max Friction Rate (in.w.g./100 ft):", self.controller.sizing_max_rate_var),
+            ("Max Velocity (FPM):", self.controller.sizing_max_velocity_var),
+        ]
+        for i, (label, var) in enumerate(limits):
+            ttk.Label(sizing_frame, text=label).grid(row=i, column=0, sticky="w", pady=3)
+            ttk.Entry(sizing_frame, textvariable=var, width=10).grid(row=i, column=1, sticky="ew", pady=3, padx=(5, 0))
+        ttk.Button(sizing_frame, text="Find Minimum Diameter", command=self.controller.perform_sizing, width=22)\
+            .grid(row=3, column=0, pady=(10, 0), sticky="w")
+        ttk.Entry(sizing_frame, textvariable=self.controller.sizing_result_var, state="readonly", width=24)\
+            .grid(row=3, column=1, pady=(10, 0), sticky="ew", padx=(5, 0))
+        sizing_frame.columnconfigure(1, weight=1)
+
+    def open_fittings_catalog(self):
+        from ui.fittings_dialog import FittingsDialog
+        FittingsDialog(self, self.controller.fittings_var)
+
     def toggle_sf(self):
         if self.controller.sf_enabled_var.get():
             self.sf_entry.configure(state="normal")
@@ -121,10 +181,16 @@ class FlexibleDuctPage(ttk.Frame):
         self.controller.bend_45_count_var.set("0")
         self.controller.bend_90_count_var.set("0")
         self.controller.bend_180_count_var.set("0")
+        self.controller.fittings_var.set("")
         self.controller.roughness_choice_var.set("Medium (0.009)")
         self.controller.compression_percent_var.set(0.0)
         self.controller.safety_factor_var.set("10")
         self.controller.sf_enabled_var.set(False)
+        self.controller.friction_solver_var.set(FRICTION_SOLVERS[DEFAULT_FRICTION_SOLVER])
+        self.controller.altitude_ft_var.set("0")
+        self.controller.air_temperature_f_var.set("70")
+        self.controller.relative_humidity_pct_var.set("0")
         self.controller.result_air_velocity_var.set("—")
         self.controller.result_pressure_loss_var.set("—")
+        self.controller.sizing_result_var.set("—")
         self.controller.status_var.set("Inputs reset to default values")
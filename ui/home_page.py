@@ -1,7 +1,6 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-from utils.resources import resource_path
+from tkinter import ttk
+from utils.thumbnails import load_thumbnail
 
 
 class HomePage(ttk.Frame):
@@ -33,10 +32,7 @@ class HomePage(ttk.Frame):
         flex_frame = ttk.LabelFrame(options_frame, text="Flexible Duct Calculator", padding="10")
         flex_frame.grid(row=0, column=0, padx=20, pady=10, sticky="nsew")
         try:
-            flex_img_path = resource_path("flexduct.png")
-            flex_img = Image.open(flex_img_path)
-            flex_img = flex_img.resize((120, 120), Image.Resampling.LANCZOS)
-            self.flex_photo = ImageTk.PhotoImage(flex_img)
+            self.flex_photo = load_thumbnail("flexduct.png", master=self)
             ttk.Label(flex_frame, image=self.flex_photo).pack(pady=(0, 10))
         except Exception as e:
             print(f"Error loading flexduct.png: {e}")
@@ -49,14 +45,11 @@ class HomePage(ttk.Frame):
             width=20
         ).pack(pady=5)
 
-        # Rectangular Duct Calculator (Placeholder)
+        # Rectangular Duct Calculator (rectangular and flat oval)
         rect_frame = ttk.LabelFrame(options_frame, text="Rectangular Duct Calculator", padding="10")
         rect_frame.grid(row=0, column=1, padx=20, pady=10, sticky="nsew")
         try:
-            rect_img_path = resource_path("recduct.png")
-            rect_img = Image.open(rect_img_path)
-            rect_img = rect_img.resize((120, 120), Image.Resampling.LANCZOS)
-            self.rect_photo = ImageTk.PhotoImage(rect_img)
+            self.rect_photo = load_thumbnail("recduct.png", master=self)
             ttk.Label(rect_frame, image=self.rect_photo).pack(pady=(0, 10))
         except Exception as e:
             print(f"Error loading recduct.png: {e}")
@@ -64,12 +57,9 @@ class HomePage(ttk.Frame):
 
         ttk.Button(
             rect_frame,
-            text="Coming Soon",
-            command=lambda: messagebox.showinfo(
-                "Placeholder", "Rectangular Duct Calculator will be added later."
-            ),
-            width=20,
-            state="disabled"
+            text="Open Calculator",
+            command=lambda: self.controller.show_frame("RectangularDuctPage"),
+            width=20
         ).pack(pady=5)
 
         options_frame.columnconfigure(0, weight=1)
@@ -0,0 +1,245 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from core.inputs import ROUGHNESS_MAP, parse_duct_inputs
+from core.shapes import (
+    DEFAULT_EQUIVALENT_METHOD, EQUIVALENT_METHODS, RECOMMENDED_ASPECT_RATIO, SHAPES, STANDARD_SIDES_IN,
+    calculate_shaped_duct, huebscher_diameter,
+)
+
+_DEFAULT_SHAPE = "rectangular"
+# Closest preset to galvanized sheet metal
+_DEFAULT_ROUGHNESS = "Low (0.003)"
+
+
+class RectangularDuctPage(ttk.Frame):
+    """
+    Rectangular and flat oval duct calculator. The duct is rated by the
+    same batch kernel as flexible duct through its round equivalent
+    (core/shapes.py); the friction model and air conditions are shared
+    with the Flexible Duct Calculator page.
+    """
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.shape_map = {label: name for name, label in SHAPES.items() if name != "round"}
+        self.method_map = {label: key for key, label in EQUIVALENT_METHODS.items()}
+
+        self.shape_var = tk.StringVar(value=SHAPES[_DEFAULT_SHAPE])
+        self.width_in_var = tk.StringVar(value="12")
+        self.height_in_var = tk.StringVar(value="8")
+        self.air_flow_cfm_var = tk.StringVar(value="1000")
+        self.duct_length_ft_var = tk.StringVar(value="10")
+        self.fittings_var = tk.StringVar(value="")
+        self.roughness_choice_var = tk.StringVar(value=_DEFAULT_ROUGHNESS)
+        self.sf_enabled_var = tk.BooleanVar(value=False)
+        self.safety_factor_var = tk.StringVar(value="10")  # %
+        self.method_var = tk.StringVar(value=EQUIVALENT_METHODS[DEFAULT_EQUIVALENT_METHOD])
+
+        self.result_air_velocity_var = tk.StringVar(value="—")
+        self.result_pressure_loss_var = tk.StringVar(value="—")
+        self.result_equivalent_var = tk.StringVar(value="—")
+        self.result_aspect_ratio_var = tk.StringVar(value="—")
+        self.last_inputs = None
+        self.last_details = None
+        self.build_ui()
+
+    def build_ui(self):
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill="both", expand=True)
+
+        ttk.Label(
+            main_frame,
+            text="Rectangular Duct Calculator",
+            font=("Segoe UI", 16, "bold")
+        ).grid(row=0, column=0, columnspan=2, pady=(0, 15))
+
+        left_frame = ttk.LabelFrame(main_frame, text="Input Parameters", padding="10")
+        left_frame.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        right_frame = ttk.LabelFrame(main_frame, text="Results", padding="10")
+        right_frame.grid(row=1, column=1, sticky="nsew", padx=(10, 0))
+
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        left_frame.columnconfigure(1, weight=1)
+        right_frame.columnconfigure(1, weight=1)
+
+        # Shape and size; standard sides are offered, any size can be typed
+        ttk.Label(left_frame, text="Shape:").grid(row=0, column=0, sticky="w", pady=5)
+        ttk.Combobox(left_frame, textvariable=self.shape_var, values=list(self.shape_map),
+                     state="readonly", width=20).grid(row=0, column=1, sticky="w", pady=5, padx=(5, 0))
+
+        ttk.Label(left_frame, text="Width x Height (in):").grid(row=1, column=0, sticky="w", pady=5)
+        size_frame = ttk.Frame(left_frame)
+        size_frame.grid(row=1, column=1, sticky="w", pady=5, padx=(5, 0))
+        sides = [str(side) for side in STANDARD_SIDES_IN]
+        ttk.Combobox(size_frame, textvariable=self.width_in_var, values=sides, width=7).grid(row=0, column=0)
+        ttk.Label(size_frame, text="x").grid(row=0, column=1, padx=5)
+        ttk.Combobox(size_frame, textvariable=self.height_in_var, values=sides, width=7).grid(row=0, column=2)
+        ttk.Label(left_frame, text="Flat oval: width is the major axis.", foreground="gray")\
+            .grid(row=2, column=1, sticky="w", padx=(5, 0))
+
+        labels_entries = [
+            ("Air Flow (CFM):", self.air_flow_cfm_var),
+            ("Duct Length (ft):", self.duct_length_ft_var),
+        ]
+        for i, (label, var) in enumerate(labels_entries, start=3):
+            ttk.Label(left_frame, text=label).grid(row=i, column=0, sticky="w", pady=5)
+            ttk.Entry(left_frame, textvariable=var, width=15).grid(row=i, column=1, sticky="ew", pady=5, padx=(5, 0))
+
+        # Fittings ("id:count; ..."), picked from the catalog dialog
+        ttk.Label(left_frame, text="Fittings:").grid(row=5, column=0, sticky="w", pady=5)
+        fittings_frame = ttk.Frame(left_frame)
+        fittings_frame.grid(row=5, column=1, sticky="ew", pady=5, padx=(5, 0))
+        ttk.Entry(fittings_frame, textvariable=self.fittings_var, width=20).grid(row=0, column=0, sticky="ew")
+        ttk.Button(fittings_frame, text="Catalog...", command=self.open_fittings_catalog)\
+            .grid(row=0, column=1, padx=(5, 0))
+        fittings_frame.columnconfigure(0, weight=1)
+
+        # Roughness
+        ttk.Label(left_frame, text="Duct Roughness:").grid(row=6, column=0, sticky="w", pady=5)
+        ttk.Combobox(left_frame, textvariable=self.roughness_choice_var, values=list(ROUGHNESS_MAP),
+                     state="readonly", width=20).grid(row=6, column=1, sticky="w", pady=5, padx=(5, 0))
+
+        # Safety Factor
+        ttk.Label(left_frame, text="Safety Factor (%):").grid(row=7, column=0, sticky="w", pady=5)
+        sf_frame = ttk.Frame(left_frame)
+        sf_frame.grid(row=7, column=1, sticky="ew", pady=5, padx=(5, 0))
+        self.sf_entry = ttk.Entry(sf_frame, textvariable=self.safety_factor_var, width=10, state="disabled")
+        self.sf_entry.grid(row=0, column=0, sticky="w")
+        ttk.Checkbutton(sf_frame, text="Enable custom SF", variable=self.sf_enabled_var,
+                        command=self.toggle_sf).grid(row=0, column=1, sticky="w", padx=(5, 0))
+
+        # Round equivalent used for friction
+        ttk.Label(left_frame, text="Diameter Method:").grid(row=8, column=0, sticky="w", pady=5)
+        ttk.Combobox(left_frame, textvariable=self.method_var, values=list(self.method_map),
+                     state="readonly", width=28).grid(row=8, column=1, sticky="w", pady=5, padx=(5, 0))
+
+        # Shared with the flexible duct page
+        ttk.Label(left_frame, text="Friction Model:").grid(row=9, column=0, sticky="w", pady=5)
+        ttk.Combobox(left_frame, textvariable=self.controller.friction_solver_var,
+                     values=list(self.controller.friction_solver_map), state="readonly", width=28)\
+            .grid(row=9, column=1, sticky="w", pady=5, padx=(5, 0))
+
+        ttk.Label(left_frame, text="Air Conditions:").grid(row=10, column=0, sticky="w", pady=5)
+        air_frame = ttk.Frame(left_frame)
+        air_frame.grid(row=10, column=1, sticky="w", pady=5, padx=(5, 0))
+        for j, (txt, var) in enumerate([
+            ("Alt (ft)", self.controller.altitude_ft_var),
+            ("Temp (°F)", self.controller.air_temperature_f_var),
+            ("RH (%)", self.controller.relative_humidity_pct_var),
+        ]):
+            ttk.Label(air_frame, text=txt).grid(row=0, column=j*2, sticky="w")
+            ttk.Entry(air_frame, textvariable=var, width=7).grid(row=0, column=j*2+1, padx=(2, 10))
+
+        # Buttons
+        button_frame = ttk.Frame(left_frame)
+        button_frame.grid(row=11, column=0, columnspan=2, pady=15)
+        ttk.Button(button_frame, text="Calculate", command=self.perform_calculation, width=15)\
+            .grid(row=0, column=0, padx=5)
+        ttk.Button(button_frame, text="Reset Inputs", command=self._reset_inputs, width=15)\
+            .grid(row=0, column=1, padx=5)
+        ttk.Button(button_frame, text="Back to Home", command=lambda: self.controller.show_frame("HomePage"),
+                   width=15).grid(row=1, column=0, columnspan=2, pady=(10, 0))
+
+        # Results
+        readouts = [
+            ("Air Velocity:", self.result_air_velocity_var),
+            ("Total Pressure Loss:", self.result_pressure_loss_var),
+            ("Round Equivalent:", self.result_equivalent_var),
+            ("Aspect Ratio:", self.result_aspect_ratio_var),
+        ]
+        for i, (label, var) in enumerate(readouts):
+            ttk.Label(right_frame, text=label).grid(row=i, column=0, sticky="w", pady=8)
+            ttk.Entry(right_frame, textvariable=var, state="readonly")\
+                .grid(row=i, column=1, sticky="ew", pady=8, padx=(5, 0))
+        ttk.Button(right_frame, text="See Full Results", command=self.show_full_results, width=20)\
+            .grid(row=len(readouts), column=0, columnspan=2, pady=20)
+
+    def _gather_inputs(self):
+        raw = {
+            "shape": self.shape_map[self.shape_var.get()],
+            "width_in": self.width_in_var.get(),
+            "height_in": self.height_in_var.get(),
+            "air_flow_cfm": self.air_flow_cfm_var.get(),
+            "duct_length_ft": self.duct_length_ft_var.get(),
+            "fittings": self.fittings_var.get(),
+            "roughness": self.roughness_choice_var.get(),
+            "safety_factor_percent": self.safety_factor_var.get() if self.sf_enabled_var.get() else None,
+            "altitude_ft": self.controller.altitude_ft_var.get(),
+            "air_temperature_f": self.controller.air_temperature_f_var.get(),
+            "relative_humidity_pct": self.controller.relative_humidity_pct_var.get(),
+        }
+        inputs, params = parse_duct_inputs(raw)
+        inputs["Diameter Method"] = self.method_var.get()
+        inputs["Friction Model"] = self.controller.friction_solver_var.get()
+        return inputs, params
+
+    def perform_calculation(self):
+        try:
+            inputs, params = self._gather_inputs()
+            velocity, dp, details = calculate_shaped_duct(
+                **params,
+                method=self.method_map[self.method_var.get()],
+                friction_solver=self.controller.friction_solver_map[self.controller.friction_solver_var.get()],
+            )
+        except ValueError as e:
+            messagebox.showerror("Invalid input", str(e))
+            self.controller.status_var.set("Error in calculation")
+            return
+        self.last_inputs = inputs
+        self.last_details = details
+        ratio = details["Aspect Ratio"]
+        self.result_air_velocity_var.set(f"{velocity:,.1f} FPM")
+        self.result_pressure_loss_var.set(f"{dp:.4f} in. w.g.")
+        self.result_equivalent_var.set(
+            f'{details["Equivalent Diameter (in)"]:.2f}" (Dh {details["Hydraulic Diameter (in)"]:.2f}")')
+        self.result_aspect_ratio_var.set(f"{ratio:.2f}:1")
+        if details["Friction Status"] != "OK":
+            self.controller.status_var.set(f"Calculated with friction warning: {details['Friction Status']}")
+        elif ratio > RECOMMENDED_ASPECT_RATIO:
+            self.controller.status_var.set(
+                f"Calculated; aspect ratio {ratio:.1f}:1 is above the recommended {RECOMMENDED_ASPECT_RATIO:g}:1")
+        else:
+            self.controller.status_var.set("Calculation completed successfully")
+
+    def show_full_results(self):
+        if not self.last_details:
+            messagebox.showinfo("No results", "Please run a calculation first.")
+            return
+        self.controller.show_results_breakdown(self.last_inputs, self.last_details)
+
+    def open_fittings_catalog(self):
+        from ui.fittings_dialog import FittingsDialog
+        try:
+            diameter = float(huebscher_diameter(self.shape_map[self.shape_var.get()],
+                                                float(self.width_in_var.get()), float(self.height_in_var.get())))
+        except ValueError:
+            diameter = None
+        FittingsDialog(self, self.fittings_var, diameter=diameter)
+
+    def toggle_sf(self):
+        if self.sf_enabled_var.get():
+            self.sf_entry.configure(state="normal")
+        else:
+            self.sf_entry.configure(state="disabled")
+
+    def _reset_inputs(self):
+        self.shape_var.set(SHAPES[_DEFAULT_SHAPE])
+        self.width_in_var.set("12")
+        self.height_in_var.set("8")
+        self.air_flow_cfm_var.set("1000")
+        self.duct_length_ft_var.set("10")
+        self.fittings_var.set("")
+        self.roughness_choice_var.set(_DEFAULT_ROUGHNESS)
+        self.safety_factor_var.set("10")
+        self.sf_enabled_var.set(False)
+        self.toggle_sf()
+        self.method_var.set(EQUIVALENT_METHODS[DEFAULT_EQUIVALENT_METHOD])
+        for var in (self.result_air_velocity_var, self.result_pressure_loss_var,
+                    self.result_equivalent_var, self.result_aspect_ratio_var):
+            var.set("—")
+        self.controller.status_var.set("Inputs reset to default values")
@@ -0,0 +1,434 @@
+import csv
+import math
+import operator
+import re
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+import numpy as np
+
+_COMPARISONS = {
+    ">=": operator.ge, "<=": operator.le, "!=": operator.ne,
+    ">": operator.gt, "<": operator.lt, "=": operator.eq,
+}
+_FILTER_PATTERN = re.compile(r"^\s*(>=|<=|!=|>|<|=)?\s*([-+0-9.eE]+|nan|inf)\s*$")
+_RANGE_PATTERN = re.compile(r"^\s*([-+0-9.eE]+)\s*\.\.\s*([-+0-9.eE]+)\s*$")
+_DEFAULT_ROW_HEIGHT = 20
+
+
+def _format(value) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return ""
+        return f"{value:,.5g}" if math.isfinite(value) else str(value)
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items())
+    return str(value)
+
+
+def _raw(value) -> str:
+    # Copy/export keeps full precision, without thousands separators
+    if isinstance(value, (float, np.floating)) and math.isnan(value):
+        return ""
+    if isinstance(value, dict):
+        return _format(value)
+    return str(value.item() if isinstance(value, np.generic) else value)
+
+
+def _as_column(values):
+    """NumPy array for numeric columns, plain list for anything else."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values.astype(np.int8) if values.dtype.kind == "b" else values
+    values = list(values)
+    if values and all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=np.float64)
+    return values
+
+
+class VirtualTable(ttk.Frame):
+    """
+    ttk.Treeview that only ever holds the rows currently on screen.
+
+    Data lives in columns (NumPy arrays or lists); filtering and sorting
+    produce an index array (the view) and scrolling refills the window of
+    Treeview items from it, so 100k+ rows cost no more widgets than 20.
+    Selection is tracked as a boolean mask over all rows, so it survives
+    scrolling, sorting and filtering.
+    """
+
+    def __init__(self, parent, on_view_changed=None):
+        super().__init__(parent)
+        self.on_view_changed = on_view_changed
+        self.keys = []
+        self.headings = {}
+        self.data = {}
+        self.n_rows = 0
+        self._view = np.empty(0, dtype=np.intp)
+        self._mask = np.zeros(0, dtype=bool)
+        self._top = 0
+        self._window = 1
+        self._anchor = None
+        self._refilling = False
+        self._sort_key = None
+        self._sort_descending = False
+        row_height = ttk.Style(self).lookup("Treeview", "rowheight")
+        self._row_height = int(row_height) if str(row_height).isdigit() else _DEFAULT_ROW_HEIGHT
+
+        self.tree = ttk.Treeview(self, show="headings", selectmode="extended")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Shift-Button-1>", self._on_shift_click)
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self._scroll(-1) or "break")
+        self.tree.bind("<Button-5>", lambda e: self._scroll(1) or "break")
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "page-up"), ("<Next>", "page-down")):
+            self.tree.bind(key, lambda e, step=step: self._on_key(step))
+        self.tree.bind("<Home>", lambda e: self._scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self._scroll_to(len(self._view)) or "break")
+        self.tree.bind("<Control-a>", lambda e: self.select_all() or "break")
+
+    # -----------------------------
+    # Data
+    # -----------------------------
+    def set_data(self, columns, data: dict):
+        """columns: [(key, heading), ...]; data: {key: sequence}, equal lengths."""
+        self.keys = [key for key, _ in columns]
+        self.headings = dict(columns)
+        self.data = {key: _as_column(data[key]) for key in self.keys}
+        self.n_rows = len(self.data[self.keys[0]]) if self.keys else 0
+        self._view = np.arange(self.n_rows)
+        self._mask = np.zeros(self.n_rows, dtype=bool)
+        self._top = 0
+        self._anchor = None
+        self._sort_key = None
+        self.tree.configure(columns=self.keys)
+        for key in self.keys:
+            self.tree.heading(key, text=self.headings[key], command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=110, minwidth=60, stretch=True,
+                             anchor="e" if isinstance(self.data[key], np.ndarray) else "w")
+        self._refill()
+
+    def set_filter(self, key: str, text: str):
+        """
+        Keep only rows whose column matches text. Numeric columns accept a
+        comparison (">0.5", "<= 2", "!= 0", "3") or a range ("1..2");
+        other columns match a case-insensitive substring. Empty text clears
+        the filter. Raises ValueError for a malformed numeric filter.
+        """
+        rows = np.arange(self.n_rows)
+        text = text.strip()
+        if text:
+            column = self.data[key]
+            if isinstance(column, np.ndarray):
+                keep = self._numeric_match(column, text)
+            else:
+                needle = text.lower()
+                keep = np.fromiter((needle in _format(v).lower() for v in column), dtype=bool, count=self.n_rows)
+            rows = rows[keep]
+        self._view = rows
+        if self._sort_key is not None:
+            self._apply_sort()
+        self._top = 0
+        self._anchor = None
+        self._refill()
+
+    @staticmethod
+    def _numeric_match(column: np.ndarray, text: str) -> np.ndarray:
+        span = _RANGE_PATTERN.match(text)
+        if span:
+            lo, hi = sorted((float(span.group(1)), float(span.group(2))))
+            return (column >= lo) & (column <= hi)
+        match = _FILTER_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Cannot filter numbers by '{text}'. Use e.g. >0.5, <=2, 1..2 or 3.")
+        op, value = match.group(1) or "=", float(match.group(2))
+        if math.isnan(value):
+            found = np.isnan(column)
+            return ~found if op == "!=" else found
+        if op in ("=", "!="):
+            found = np.isclose(column, value, rtol=1e-9, atol=0.0)
+            return ~found if op == "!=" else found
+        with np.errstate(invalid="ignore"):
+            return _COMPARISONS[op](column, value)
+
+    def sort_by(self, key: str):
+        if self._sort_key == key:
+            self._sort_descending = not self._sort_descending
+        else:
+            self._sort_key, self._sort_descending = key, False
+        self._apply_sort()
+        for k in self.keys:
+            arrow = (" ▼" if self._sort_descending else " ▲") if k == key else ""
+            self.tree.heading(k, text=self.headings[k] + arrow)
+        self._top = 0
+        self._anchor = None
+        self._refill()
+
+    def _apply_sort(self):
+        column = self.data[self._sort_key]
+        if isinstance(column, np.ndarray):
+            values = column[self._view]
+            order = np.argsort(-values if self._sort_descending else values, kind="stable")
+            # NaN (blank) rows always go last
+            order = np.concatenate((order[~np.isnan(values[order])], order[np.isnan(values[order])]))
+        else:
+            order = sorted(range(len(self._view)), key=lambda i: _sort_value(column[self._view[i]]),
+                           reverse=self._sort_descending)
+        self._view = self._view[np.asarray(order, dtype=np.intp)]
+
+    # -----------------------------
+    # Windowed materialization
+    # -----------------------------
+    def _on_resize(self, event):
+        window = max(1, event.height // self._row_height - 1)
+        if window != self._window:
+            self._window = window
+            self._refill()
+
+    def _refill(self):
+        self._refilling = True
+        try:
+            self.tree.delete(*self.tree.get_children())
+            self._top = max(0, min(self._top, len(self._view) - self._window))
+            rows = self._view[self._top:self._top + self._window].tolist()
+            columns = [self.data[key] for key in self.keys]
+            for row in rows:
+                self.tree.insert("", "end", iid=str(row), values=[_format(c[row]) for c in columns])
+            self.tree.selection_set([str(row) for row in rows if self._mask[row]])
+        finally:
+            self._refilling = False
+        total = len(self._view)
+        if total:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + self._window) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.on_view_changed is not None:
+            self.on_view_changed()
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(int(top), len(self._view) - self._window))
+        if top != self._top:
+            self._top = top
+            self._refill()
+
+    def _scroll(self, units: int):
+        self._scroll_to(self._top + units)
+
+    def _yview(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * len(self._view))
+        elif unit == "pages":
+            self._scroll(int(value) * self._window)
+        else:
+            self._scroll(int(value))
+
+    def _on_key(self, step):
+        if step in ("page-up", "page-down"):
+            self._scroll(self._window if step == "page-down" else -self._window)
+            return "break"
+        focus = self.tree.focus()
+        if not focus:
+            return None
+        position = self._top + self.tree.index(focus)
+        target = position + step
+        if not 0 <= target < len(self._view):
+            return "break"
+        if not self._top <= target < self._top + self._window:
+            # Moving off the window: scroll it and keep the cursor on the row
+            self._scroll(step)
+        row = self._view[target]
+        self._mask[:] = False
+        self._mask[row] = True
+        self._anchor = target
+        self._refill()
+        self.tree.focus(str(row))
+        return "break"
+
+    # -----------------------------
+    # Selection
+    # -----------------------------
+    def _on_click(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        if not event.state & 0x0004:  # no Control: a plain click replaces the selection
+            self._mask[:] = False
+        self._anchor = self._top + self.tree.index(item)
+
+    def _on_shift_click(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return "break"
+        position = self._top + self.tree.index(item)
+        anchor = self._anchor if self._anchor is not None else position
+        lo, hi = sorted((anchor, position))
+        self._mask[:] = False
+        self._mask[self._view[lo:hi + 1]] = True
+        self._refill()
+        return "break"
+
+    def _on_select(self, event):
+        if self._refilling:
+            return
+        window = self._view[self._top:self._top + self._window]
+        self._mask[window] = False
+        selected = [int(iid) for iid in self.tree.selection()]
+        self._mask[selected] = True
+        if self.on_view_changed is not None:
+            self.on_view_changed()
+
+    def select_all(self):
+        self._mask[self._view] = True
+        self._refill()
+
+    def selected_rows(self) -> np.ndarray:
+        """Selected row indices in view (filtered, sorted) order."""
+        return self._view[self._mask[self._view]]
+
+    def visible_rows(self) -> np.ndarray:
+        """Row indices left by the filter, in sorted order."""
+        return self._view
+
+    @property
+    def visible_count(self) -> int:
+        return len(self._view)
+
+    # -----------------------------
+    # Copy / export
+    # -----------------------------
+    def _iter_rows(self, rows):
+        columns = [self.data[key] for key in self.keys]
+        for row in rows.tolist():
+            yield [_raw(c[row]) for c in columns]
+
+    def copy_rows(self, rows) -> int:
+        """Copy rows to the clipboard as tab-separated text with a header."""
+        lines = ["\t".join(self.headings[key] for key in self.keys)]
+        lines.extend("\t".join(values) for values in self._iter_rows(rows))
+        self.clipboard_clear()
+        self.clipboard_append("\n".join(lines))
+        return len(rows)
+
+    def export_rows(self, path: str, rows) -> int:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([self.headings[key] for key in self.keys])
+            writer.writerows(self._iter_rows(rows))
+        return len(rows)
+
+
+def _sort_value(value):
+    # Numbers before text so mixed breakdown columns still sort sensibly
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return (0, float(value), "")
+    return (1, 0.0, _format(value).lower())
+
+
+class ResultsWindow(tk.Toplevel):
+    """
+    The one results window of the application. show() swaps its contents;
+    closing only hides it so the next show() reuses the same widgets.
+    """
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.geometry("760x520")
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.filter_column_var = tk.StringVar()
+        self.filter_text_var = tk.StringVar()
+        self.count_var = tk.StringVar(value="")
+        self._column_map = {}
+
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+
+        filter_frame = ttk.Frame(frame)
+        filter_frame.grid(row=0, column=0, sticky="ew", pady=(0, 8))
+        ttk.Label(filter_frame, text="Filter:").grid(row=0, column=0, sticky="w")
+        self.filter_column = ttk.Combobox(filter_frame, textvariable=self.filter_column_var,
+                                          state="readonly", width=22)
+        self.filter_column.grid(row=0, column=1, padx=(5, 5))
+        entry = ttk.Entry(filter_frame, textvariable=self.filter_text_var, width=24)
+        entry.grid(row=0, column=2, sticky="ew")
+        entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Button(filter_frame, text="Apply", command=self.apply_filter).grid(row=0, column=3, padx=(5, 0))
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).grid(row=0, column=4, padx=(5, 0))
+        filter_frame.columnconfigure(2, weight=1)
+
+        self.table = VirtualTable(frame, on_view_changed=self._update_count)
+        self.table.grid(row=1, column=0, sticky="nsew")
+
+        bottom = ttk.Frame(frame)
+        bottom.grid(row=2, column=0, sticky="ew", pady=(8, 0))
+        ttk.Label(bottom, textvariable=self.count_var).grid(row=0, column=0, sticky="w")
+        ttk.Button(bottom, text="Copy Selection", command=self.copy_selection).grid(row=0, column=1, padx=5)
+        ttk.Button(bottom, text="Export CSV...", command=self.export_selection).grid(row=0, column=2, padx=5)
+        ttk.Button(bottom, text="Close", command=self.withdraw).grid(row=0, column=3, padx=(5, 0))
+        bottom.columnconfigure(0, weight=1)
+
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+        self.bind("<Control-c>", lambda e: self.copy_selection())
+
+    def show(self, title: str, columns, data: dict):
+        self.title(title)
+        self._column_map = {heading: key for key, heading in columns}
+        self.filter_column.configure(values=list(self._column_map))
+        self.filter_column_var.set(columns[0][1] if columns else "")
+        self.filter_text_var.set("")
+        self.table.set_data(columns, data)
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+
+    def apply_filter(self):
+        key = self._column_map.get(self.filter_column_var.get())
+        if key is None:
+            return
+        try:
+            self.table.set_filter(key, self.filter_text_var.get())
+        except ValueError as e:
+            messagebox.showerror("Invalid filter", str(e), parent=self)
+
+    def clear_filter(self):
+        self.filter_text_var.set("")
+        self.apply_filter()
+
+    def _update_count(self):
+        selected = len(self.table.selected_rows())
+        shown = self.table.visible_count
+        text = f"{shown:,} of {self.table.n_rows:,} rows"
+        self.count_var.set(f"{text}, {selected:,} selected" if selected else text)
+
+    def _rows_for_output(self):
+        # Selected rows if any, otherwise everything the filter shows
+        rows = self.table.selected_rows()
+        return rows if len(rows) else self.table.visible_rows()
+
+    def copy_selection(self):
+        copied = self.table.copy_rows(self._rows_for_output())
+        self.count_var.set(f"Copied {copied:,} rows to the clipboard")
+
+    def export_selection(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            exported = self.table.export_rows(path, self._rows_for_output())
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e), parent=self)
+            return
+        self.count_var.set(f"Exported {exported:,} rows to {path}")
@@ -0,0 +1,269 @@
+import math
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+import numpy as np
+
+from core.sweep import SWEEP_PARAMETERS, SweepGrid, axis_values
+from ui.background import DebouncedRunner
+
+# Viridis-like colour ramp, expanded to a 256-entry lookup table
+_RAMP = np.array([(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)], dtype=np.float64)
+_LUT = np.stack(
+    [np.interp(np.linspace(0, 1, 256), np.linspace(0, 1, len(_RAMP)), _RAMP[:, c]) for c in range(3)],
+    axis=1,
+).astype(np.uint8)
+_INVALID_RGB = np.array((160, 160, 160), dtype=np.uint8)
+_CURVE_COUNT = 8
+
+_MARGIN_LEFT, _MARGIN_RIGHT, _MARGIN_TOP, _MARGIN_BOTTOM = 60, 80, 10, 40
+
+
+def _heatmap_ppm(levels: np.ndarray, width: int, height: int) -> bytes:
+    """
+    Rasterize a (ny, nx) array of colour levels in [0, 1] (nan = invalid)
+    to a width × height binary PPM, nearest-neighbour, y increasing upward.
+    """
+    ny, nx = levels.shape
+    cols = np.arange(width) * nx // width
+    rows = (height - 1 - np.arange(height)) * ny // height
+    codes = np.nan_to_num(levels, nan=-1.0)
+    codes = np.where(codes < 0, -1, np.clip(codes * 255, 0, 255)).astype(np.int16)
+    picked = codes[rows[:, None], cols[None, :]]
+    rgb = _LUT[np.clip(picked, 0, 255)]
+    rgb[picked < 0] = _INVALID_RGB
+    return b"P6 %d %d 255\n" % (width, height) + rgb.tobytes()
+
+
+class SweepPage(ttk.Frame):
+    """
+    ΔP over a 2-D grid of two inputs; every other input comes from the
+    Flexible Duct Calculator page. The grid is evaluated off the Tk thread
+    and drawn as one pre-rasterized image (or a family of curves), so
+    redraws never create per-cell canvas items.
+    """
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.grid_result = SweepGrid()
+        self.runner = DebouncedRunner(self, delay_ms=0)
+        self._image = None
+        self._plot = None  # (x_values, y_values, values, x_name, y_name) last drawn
+
+        labels = list(SWEEP_PARAMETERS.values())
+        self.param_map = {label: key for key, label in SWEEP_PARAMETERS.items()}
+        self.x_param_var = tk.StringVar(value=SWEEP_PARAMETERS["air_flow_cfm"])
+        self.x_from_var = tk.StringVar(value="100")
+        self.x_to_var = tk.StringVar(value="2000")
+        self.x_steps_var = tk.StringVar(value="200")
+        self.y_param_var = tk.StringVar(value=SWEEP_PARAMETERS["duct_diameter_in"])
+        self.y_from_var = tk.StringVar(value="4")
+        self.y_to_var = tk.StringVar(value="24")
+        self.y_steps_var = tk.StringVar(value="200")
+        self.mode_var = tk.StringVar(value="heatmap")
+        self.readout_var = tk.StringVar(value="Move the pointer over the plot to read values")
+        self.build_ui(labels)
+
+    def build_ui(self, labels):
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill="both", expand=True)
+
+        ttk.Label(
+            main_frame,
+            text="Parametric Sweep",
+            font=("Segoe UI", 16, "bold")
+        ).grid(row=0, column=0, columnspan=2, pady=(0, 15))
+
+        left_frame = ttk.LabelFrame(main_frame, text="Sweep Setup", padding="10")
+        left_frame.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        right_frame = ttk.LabelFrame(main_frame, text="Total ΔP (in.w.g.)", padding="10")
+        right_frame.grid(row=1, column=1, sticky="nsew", padx=(10, 0))
+
+        main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        row = 0
+        for axis, param_var, from_var, to_var, steps_var in (
+            ("X axis", self.x_param_var, self.x_from_var, self.x_to_var, self.x_steps_var),
+            ("Y axis", self.y_param_var, self.y_from_var, self.y_to_var, self.y_steps_var),
+        ):
+            ttk.Label(left_frame, text=f"{axis}:").grid(row=row, column=0, sticky="w", pady=5)
+            ttk.Combobox(left_frame, textvariable=param_var, values=labels, state="readonly", width=20)\
+                .grid(row=row, column=1, sticky="w", pady=5, padx=(5, 0))
+            row += 1
+            range_frame = ttk.Frame(left_frame)
+            range_frame.grid(row=row, column=0, columnspan=2, sticky="w", pady=(0, 10))
+            for j, (txt, var) in enumerate((("From:", from_var), ("To:", to_var), ("Steps:", steps_var))):
+                ttk.Label(range_frame, text=txt).grid(row=0, column=j*2, sticky="w")
+                entry = ttk.Entry(range_frame, textvariable=var, width=7)
+                entry.grid(row=0, column=j*2+1, padx=(2, 8))
+                entry.bind("<Return>", lambda e: self.run_sweep())
+            row += 1
+
+        ttk.Label(left_frame, text="Display:").grid(row=row, column=0, sticky="w", pady=5)
+        mode_frame = ttk.Frame(left_frame)
+        mode_frame.grid(row=row, column=1, sticky="w", pady=5, padx=(5, 0))
+        for j, (txt, value) in enumerate((("Heatmap", "heatmap"), ("Curves", "curves"))):
+            ttk.Radiobutton(mode_frame, text=txt, value=value, variable=self.mode_var, command=self.redraw)\
+                .grid(row=0, column=j, padx=(0, 10))
+        row += 1
+
+        ttk.Label(
+            left_frame,
+            text="All other inputs are taken from\nthe Flexible Duct Calculator.",
+            foreground="gray"
+        ).grid(row=row, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        row += 1
+
+        button_frame = ttk.Frame(left_frame)
+        button_frame.grid(row=row, column=0, columnspan=2, pady=15)
+        ttk.Button(button_frame, text="Run Sweep", command=self.run_sweep, width=15)\
+            .grid(row=0, column=0, padx=5)
+        ttk.Button(button_frame, text="Back to Calculator",
+                   command=lambda: self.controller.show_frame("FlexibleDuctPage"), width=18)\
+            .grid(row=0, column=1, padx=5)
+
+        self.canvas = tk.Canvas(right_frame, background="white", highlightthickness=0, width=480, height=360)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        ttk.Label(right_frame, textvariable=self.readout_var).grid(row=1, column=0, sticky="w", pady=(8, 0))
+        right_frame.columnconfigure(0, weight=1)
+        right_frame.rowconfigure(0, weight=1)
+        # Resizing only re-rasterizes the cached grid, it never recomputes
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Motion>", self._on_motion)
+
+    # -----------------------------
+    # Computation
+    # -----------------------------
+    def _axis(self, param_var, from_var, to_var, steps_var, axis: str):
+        parse = self.controller._parse_positive_float
+        start = parse(from_var.get(), f"{axis} From")
+        stop = parse(to_var.get(), f"{axis} To")
+        try:
+            steps = int(steps_var.get())
+        except ValueError:
+            raise ValueError(f"{axis} Steps must be a whole number.")
+        return self.param_map[param_var.get()], axis_values(start, stop, steps)
+
+    def _sweep_job(self):
+        # Runs on the Tk thread: read every variable here, compute elsewhere
+        x_name, x_values = self._axis(self.x_param_var, self.x_from_var, self.x_to_var, self.x_steps_var, "X")
+        y_name, y_values = self._axis(self.y_param_var, self.y_from_var, self.y_to_var, self.y_steps_var, "Y")
+        if x_name == y_name:
+            raise ValueError("Choose two different sweep parameters.")
+        _, params = self.controller.gather_inputs()
+        solver = self.controller.friction_solver_map[self.controller.friction_solver_var.get()]
+
+        def job():
+            values = self.grid_result.update(params, x_name, x_values, y_name, y_values, solver)
+            return x_values, y_values, values, x_name, y_name, self.grid_result.last_computed_cells
+        return job
+
+    def run_sweep(self):
+        self.controller.status_var.set("Running sweep...")
+        self.runner.submit(self._sweep_job, self._show_sweep, self._show_error)
+
+    def _show_sweep(self, result):
+        *plot, computed = result
+        self._plot = tuple(plot)
+        self.redraw()
+        cells = plot[2].size
+        self.controller.status_var.set(
+            f"Sweep completed: {cells:,} points ({computed:,} computed, {cells - computed:,} reused)"
+        )
+
+    def _show_error(self, error):
+        if isinstance(error, (ValueError, tk.TclError)):
+            messagebox.showerror("Invalid input", str(error))
+        else:
+            messagebox.showerror("Sweep failed", str(error))
+        self.controller.status_var.set("Error in sweep")
+
+    def destroy(self):
+        self.runner.shutdown()
+        super().destroy()
+
+    # -----------------------------
+    # Drawing
+    # -----------------------------
+    def _plot_box(self):
+        width = max(self.canvas.winfo_width() - _MARGIN_LEFT - _MARGIN_RIGHT, 10)
+        height = max(self.canvas.winfo_height() - _MARGIN_TOP - _MARGIN_BOTTOM, 10)
+        return _MARGIN_LEFT, _MARGIN_TOP, width, height
+
+    @staticmethod
+    def _log_levels(values: np.ndarray):
+        # ΔP spans decades across a typical sweep, so colour by log10(ΔP)
+        valid = np.isfinite(values) & (values > 0)
+        if not valid.any():
+            return np.full(values.shape, np.nan), 0.0, 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logs = np.where(valid, np.log10(np.where(valid, values, 1.0)), np.nan)
+        lo, hi = float(np.nanmin(logs)), float(np.nanmax(logs))
+        span = hi - lo if hi > lo else 1.0
+        return (logs - lo) / span, lo, hi
+
+    def redraw(self):
+        self.canvas.delete("all")
+        if self._plot is None:
+            return
+        x_values, y_values, values, x_name, y_name = self._plot
+        left, top, width, height = self._plot_box()
+        levels, lo, hi = self._log_levels(values)
+
+        if self.mode_var.get() == "heatmap":
+            self._image = tk.PhotoImage(data=_heatmap_ppm(levels, width, height), format="PPM")
+            self.canvas.create_image(left, top, image=self._image, anchor="nw")
+            self._draw_colorbar(left + width + 15, top, height, lo, hi)
+            y_label, y_ticks = SWEEP_PARAMETERS[y_name], (y_values[0], y_values[-1])
+        else:
+            self._image = None
+            picks = np.unique(np.linspace(0, y_values.size - 1, min(_CURVE_COUNT, y_values.size)).astype(int))
+            xs = left + np.arange(x_values.size) * (width - 1) / max(x_values.size - 1, 1)
+            for k, i in enumerate(picks):
+                level = levels[i]
+                ys = top + (1.0 - np.nan_to_num(level, nan=0.0)) * (height - 1)
+                color = "#%02x%02x%02x" % tuple(_LUT[int(255 * k / max(len(picks) - 1, 1))])
+                coords = np.column_stack((xs, ys))[np.isfinite(level)].ravel().tolist()
+                if len(coords) >= 4:
+                    self.canvas.create_line(*coords, fill=color, width=2)
+                    self.canvas.create_text(left + width + 5, coords[-1], anchor="w", fill=color,
+                                            text=f"{y_values[i]:g}", font=("Segoe UI", 8))
+            y_label, y_ticks = "ΔP (log scale)", (10 ** lo, 10 ** hi)
+
+        self.canvas.create_rectangle(left, top, left + width, top + height, outline="black")
+        self.canvas.create_text(left, top + height + 4, anchor="n", text=f"{x_values[0]:g}")
+        self.canvas.create_text(left + width, top + height + 4, anchor="n", text=f"{x_values[-1]:g}")
+        self.canvas.create_text(left + width / 2, top + height + 22, anchor="n", text=SWEEP_PARAMETERS[x_name])
+        self.canvas.create_text(left - 4, top + height, anchor="e", text=f"{y_ticks[0]:.3g}")
+        self.canvas.create_text(left - 4, top, anchor="ne", text=f"{y_ticks[1]:.3g}")
+        self.canvas.create_text(12, top + height / 2, angle=90, text=y_label)
+
+    def _draw_colorbar(self, x, top, height, lo, hi):
+        bar = np.linspace(0.0, 1.0, 64)[:, None]
+        self._colorbar = tk.PhotoImage(data=_heatmap_ppm(bar, 12, height), format="PPM")
+        self.canvas.create_image(x, top, image=self._colorbar, anchor="nw")
+        self.canvas.create_rectangle(x, top, x + 12, top + height, outline="black")
+        self.canvas.create_text(x + 16, top, anchor="nw", text=f"{10 ** hi:.3g}", font=("Segoe UI", 8))
+        self.canvas.create_text(x + 16, top + height, anchor="sw", text=f"{10 ** lo:.3g}", font=("Segoe UI", 8))
+
+    def _on_motion(self, event):
+        if self._plot is None:
+            return
+        x_values, y_values, values, x_name, y_name = self._plot
+        left, top, width, height = self._plot_box()
+        u, v = (event.x - left) / width, (event.y - top) / height
+        if not (0 <= u < 1 and 0 <= v < 1):
+            return
+        i = int(u * x_values.size)
+        if self.mode_var.get() == "heatmap":
+            j = int((1.0 - v) * y_values.size)
+            dp = values[j, i]
+            text = "invalid" if not math.isfinite(dp) else f"{dp:.4f} in.w.g."
+            self.readout_var.set(
+                f"{SWEEP_PARAMETERS[x_name]} = {x_values[i]:g}, "
+                f"{SWEEP_PARAMETERS[y_name]} = {y_values[j]:g}: ΔP {text}"
+            )
+        else:
+            self.readout_var.set(f"{SWEEP_PARAMETERS[x_name]} = {x_values[i]:g}")
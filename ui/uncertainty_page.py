@@ -0,0 +1,218 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+import numpy as np
+
+from core.uncertainty import (
+    DEFAULT_PERCENTILES, MAX_MONTE_CARLO_SAMPLES, run_monte_carlo, spread_distributions,
+)
+from ui.background import DebouncedRunner
+
+_MARGIN_LEFT, _MARGIN_RIGHT, _MARGIN_TOP, _MARGIN_BOTTOM = 50, 20, 10, 40
+_BAR_COLOR = "#3b528b"
+# Marker line colours: deterministic, then one per reported percentile
+_DETERMINISTIC_COLOR = "black"
+_PERCENTILE_COLORS = ("#21918c", "#e09f3e", "#c0392b")
+_HISTOGRAM_BINS = 40
+
+
+class UncertaintyPage(ttk.Frame):
+    """
+    Monte Carlo ΔP for the duct on the Flexible Duct Calculator page, with
+    compression, roughness, length and bend counts drawn around the entered
+    values. Samples are rated without the safety factor so the spread can
+    be compared with the flat safety-factor padding.
+    """
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.runner = DebouncedRunner(self, delay_ms=0)
+        self._result = None
+
+        self.compression_spread_var = tk.StringVar(value="5")
+        self.roughness_spread_var = tk.StringVar(value="30")
+        self.length_spread_var = tk.StringVar(value="10")
+        self.bend_spread_var = tk.StringVar(value="1")
+        self.samples_var = tk.StringVar(value="100000")
+        self.seed_var = tk.StringVar(value="1")
+        self.deterministic_var = tk.StringVar(value="—")
+        self.percentile_vars = {q: tk.StringVar(value="—") for q in DEFAULT_PERCENTILES}
+        self.summary_var = tk.StringVar(value="")
+        self.build_ui()
+
+    def build_ui(self):
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill="both", expand=True)
+
+        ttk.Label(
+            main_frame,
+            text="Uncertainty Analysis",
+            font=("Segoe UI", 16, "bold")
+        ).grid(row=0, column=0, columnspan=2, pady=(0, 15))
+
+        left_frame = ttk.LabelFrame(main_frame, text="Installed Conditions", padding="10")
+        left_frame.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        right_frame = ttk.LabelFrame(main_frame, text="Total ΔP Distribution (in.w.g.)", padding="10")
+        right_frame.grid(row=1, column=1, sticky="nsew", padx=(10, 0))
+
+        main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        fields = [
+            ("Compression ± (points):", self.compression_spread_var),
+            ("Roughness ± (%):", self.roughness_spread_var),
+            ("Length ± (%):", self.length_spread_var),
+            ("Bends ± (per type):", self.bend_spread_var),
+            ("Samples:", self.samples_var),
+            ("Random Seed:", self.seed_var),
+        ]
+        for i, (label, var) in enumerate(fields):
+            ttk.Label(left_frame, text=label).grid(row=i, column=0, sticky="w", pady=5)
+            entry = ttk.Entry(left_frame, textvariable=var, width=12)
+            entry.grid(row=i, column=1, sticky="ew", pady=5, padx=(5, 0))
+            entry.bind("<Return>", lambda e: self.run_analysis())
+        row = len(fields)
+
+        ttk.Label(
+            left_frame,
+            text="Compression and roughness are triangular,\nlength uniform and bends uniform whole\n"
+                 "numbers around the calculator inputs.\nThe safety factor is not applied to samples.",
+            foreground="gray"
+        ).grid(row=row, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        row += 1
+
+        results_frame = ttk.Frame(left_frame)
+        results_frame.grid(row=row, column=0, columnspan=2, sticky="ew", pady=(15, 0))
+        readouts = [("Deterministic:", self.deterministic_var)]
+        readouts += [(f"P{q}:", var) for q, var in self.percentile_vars.items()]
+        for i, (label, var) in enumerate(readouts):
+            ttk.Label(results_frame, text=label).grid(row=i, column=0, sticky="w", pady=3)
+            ttk.Entry(results_frame, textvariable=var, state="readonly", width=24)\
+                .grid(row=i, column=1, sticky="ew", pady=3, padx=(5, 0))
+        results_frame.columnconfigure(1, weight=1)
+        row += 1
+
+        button_frame = ttk.Frame(left_frame)
+        button_frame.grid(row=row, column=0, columnspan=2, pady=15)
+        ttk.Button(button_frame, text="Run Analysis", command=self.run_analysis, width=15)\
+            .grid(row=0, column=0, padx=5)
+        ttk.Button(button_frame, text="Back to Calculator",
+                   command=lambda: self.controller.show_frame("FlexibleDuctPage"), width=18)\
+            .grid(row=0, column=1, padx=5)
+
+        self.canvas = tk.Canvas(right_frame, background="white", highlightthickness=0, width=420, height=320)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        ttk.Label(right_frame, textvariable=self.summary_var).grid(row=1, column=0, sticky="w", pady=(8, 0))
+        right_frame.columnconfigure(0, weight=1)
+        right_frame.rowconfigure(0, weight=1)
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+
+    # -----------------------------
+    # Computation
+    # -----------------------------
+    def _parse_int(self, value_str: str, field_name: str) -> int:
+        try:
+            return int(value_str)
+        except ValueError:
+            raise ValueError(f"{field_name} must be a whole number.")
+
+    def _analysis_job(self):
+        # Runs on the Tk thread: read every variable here, compute elsewhere
+        parse = self.controller._parse_positive_float
+        compression = parse(self.compression_spread_var.get(), "Compression ±")
+        roughness_pct = parse(self.roughness_spread_var.get(), "Roughness ±")
+        length_pct = parse(self.length_spread_var.get(), "Length ±")
+        bends = self._parse_int(self.bend_spread_var.get(), "Bends ±")
+        samples = self._parse_int(self.samples_var.get(), "Samples")
+        seed = self._parse_int(self.seed_var.get(), "Random Seed")
+        if bends < 0 or seed < 0:
+            raise ValueError("Bends ± and Random Seed must be non-negative.")
+        if not 1 <= samples <= MAX_MONTE_CARLO_SAMPLES:
+            raise ValueError(f"Samples must be between 1 and {MAX_MONTE_CARLO_SAMPLES:,}.")
+        _, params = self.controller.gather_inputs()
+        safety_factor = params["safety_factor"]
+        params["safety_factor"] = 1.0
+        distributions = spread_distributions(params, compression, roughness_pct, length_pct, bends)
+        solver = self.controller.friction_solver_map[self.controller.friction_solver_var.get()]
+
+        def job():
+            result = run_monte_carlo(params, distributions, samples, seed, friction_solver=solver)
+            return result, safety_factor
+        return job
+
+    def run_analysis(self):
+        self.controller.status_var.set("Running uncertainty analysis...")
+        self.runner.submit(self._analysis_job, self._show_result, self._show_error)
+
+    def _show_result(self, result):
+        self._result, safety_factor = result
+        r = self._result
+        det = r["deterministic"]
+        self.deterministic_var.set(f"{det:.4f} ({det * safety_factor:.4f} with SF)")
+        for q, var in self.percentile_vars.items():
+            var.set(f"{r['percentiles'][q]:.4f} in. w.g.")
+        self.summary_var.set(
+            f"Mean {r['mean']:.4f} · Std {r['std']:.4f} · "
+            f"{r['fraction_above_deterministic']:.0%} of samples above the deterministic ΔP"
+        )
+        self.redraw()
+        invalid = f", {r['invalid']:,} invalid" if r["invalid"] else ""
+        self.controller.status_var.set(
+            f"Uncertainty analysis completed: {r['samples']:,} samples, seed {r['seed']}{invalid}"
+        )
+
+    def _show_error(self, error):
+        if isinstance(error, (ValueError, tk.TclError)):
+            messagebox.showerror("Invalid input", str(error))
+        else:
+            messagebox.showerror("Uncertainty analysis failed", str(error))
+        self.controller.status_var.set("Error in uncertainty analysis")
+
+    def destroy(self):
+        self.runner.shutdown()
+        super().destroy()
+
+    # -----------------------------
+    # Drawing
+    # -----------------------------
+    def redraw(self):
+        self.canvas.delete("all")
+        if self._result is None:
+            return
+        r = self._result
+        edges, shares = r["histogram"].display_histogram(_HISTOGRAM_BINS)
+        if not edges.size:
+            return
+        left, top = _MARGIN_LEFT, _MARGIN_TOP
+        width = max(self.canvas.winfo_width() - _MARGIN_LEFT - _MARGIN_RIGHT, 10)
+        height = max(self.canvas.winfo_height() - _MARGIN_TOP - _MARGIN_BOTTOM, 10)
+
+        markers = [("Det.", r["deterministic"], _DETERMINISTIC_COLOR)]
+        markers += [(f"P{q}", v, c) for (q, v), c in zip(r["percentiles"].items(), _PERCENTILE_COLORS)]
+        lo = min(edges[0], *(v for _, v, _ in markers))
+        hi = max(edges[-1], *(v for _, v, _ in markers))
+        span = hi - lo if hi > lo else 1.0
+
+        def x_of(value):
+            return left + (value - lo) / span * width
+
+        # Bars are drawn as density (share / bin width) so uneven log bins look right
+        density = shares / np.diff(edges)
+        peak = density.max() if density.max() > 0 else 1.0
+        for x0, x1, d in zip(edges[:-1], edges[1:], density):
+            y = top + height * (1.0 - d / peak)
+            self.canvas.create_rectangle(x_of(x0), y, x_of(x1), top + height, fill=_BAR_COLOR, outline="white")
+
+        for i, (label, value, color) in enumerate(markers):
+            x = x_of(value)
+            self.canvas.create_line(x, top, x, top + height, fill=color, width=2, dash=(4, 2) if i == 0 else None)
+            # Labels are stacked so nearby markers stay readable
+            self.canvas.create_text(x + 3, top + 2 + 12 * i, anchor="nw", text=label, fill=color,
+                                    font=("Segoe UI", 8))
+
+        self.canvas.create_rectangle(left, top, left + width, top + height, outline="black")
+        self.canvas.create_text(left, top + height + 4, anchor="n", text=f"{lo:.3g}")
+        self.canvas.create_text(left + width, top + height + 4, anchor="n", text=f"{hi:.3g}")
+        self.canvas.create_text(left + width / 2, top + height + 22, anchor="n", text="Total ΔP (in.w.g.)")
+        self.canvas.create_text(12, top + height / 2, angle=90, text="Relative frequency")
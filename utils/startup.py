@@ -0,0 +1,38 @@
+# utils/startup.py
+# Cold-start timing: imports, per-page build time and time to first paint,
+# all measured from one reference point (normally the top of app.py).
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self, start: float = None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+        self.pages = {}
+
+    def mark(self, name: str):
+        """Record the time since start for a named milestone (first call wins)."""
+        self.marks.setdefault(name, time.perf_counter() - self.start)
+
+    def record_page(self, page_name: str, seconds: float):
+        self.pages[page_name] = seconds
+
+    def report(self) -> dict:
+        return {
+            "imports_s": self.marks.get("imports"),
+            "window_s": self.marks.get("window"),
+            "first_paint_s": self.marks.get("first_paint"),
+            "page_build_s": dict(self.pages),
+        }
+
+    def format(self) -> str:
+        rows = [("imports", self.marks.get("imports")), ("main window", self.marks.get("window"))]
+        rows += [(f"build {name}", seconds) for name, seconds in self.pages.items()]
+        rows.append(("first paint", self.marks.get("first_paint")))
+        lines = ["Startup timing (s):"]
+        lines += [f"  {label:<28}{'—' if value is None else f'{value:.3f}'}" for label, value in rows]
+        return "\n".join(lines)
+
+    def print_report(self, stream=None):
+        print(self.format(), file=stream or sys.stderr)
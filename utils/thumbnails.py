@@ -0,0 +1,41 @@
+# utils/thumbnails.py
+# Pre-resized card images for the home page. Tk loads PNG natively, so the
+# GUI only imports PIL when a pre-resized file is missing.
+#
+#   python -m utils.thumbnails   (regenerate after changing a source image)
+import os
+import tkinter as tk
+
+from utils.resource_path import resource_path
+
+THUMBNAIL_SIZE = (120, 120)
+THUMBNAIL_DIR = os.path.join("assets", "thumbnails")
+SOURCE_IMAGES = ("flexduct.png", "recduct.png")
+
+
+def thumbnail_name(image_name: str, size=THUMBNAIL_SIZE) -> str:
+    stem, ext = os.path.splitext(os.path.basename(image_name))
+    return os.path.join(THUMBNAIL_DIR, f"{stem}_{size[0]}x{size[1]}{ext}")
+
+
+def load_thumbnail(image_name: str, size=THUMBNAIL_SIZE, master=None):
+    """PhotoImage of image_name at size, from the pre-resized asset if present."""
+    path = resource_path(thumbnail_name(image_name, size))
+    if os.path.exists(path):
+        return tk.PhotoImage(master=master, file=path)
+    from PIL import Image, ImageTk
+    image = Image.open(resource_path(image_name)).resize(size, Image.Resampling.LANCZOS)
+    return ImageTk.PhotoImage(image, master=master)
+
+
+def build_thumbnails(image_names=SOURCE_IMAGES, size=THUMBNAIL_SIZE):
+    from PIL import Image
+    os.makedirs(resource_path(THUMBNAIL_DIR), exist_ok=True)
+    for name in image_names:
+        target = resource_path(thumbnail_name(name, size))
+        Image.open(resource_path(name)).resize(size, Image.Resampling.LANCZOS).save(target, optimize=True)
+        print(f"{name} -> {target}")
+
+
+if __name__ == "__main__":
+    build_thumbnails()